@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+import uuid
+from collections import namedtuple
+from dataclasses import dataclass
+from typing import Dict, List
+
+from blocks_to_items.block_store import PaperBlockStore
+from blocks_to_items.models import Block
+
+# Holds `papers` block stores at once (a run_many batch), built from rows shaped like
+# the Astra driver's: every row carries its own copy of the id/section/type strings.
+#   dict      legacy layout: plain @dataclass blocks + by-id / by-section / position dicts
+#   slots     same layout with the slotted, interned Block
+#   columnar  PaperBlockStore parallel arrays
+
+Row = namedtuple("Row", "block_id section_id type text block_index")
+_WORDS = "protein assay sample buffer lysate incubated western blot p53 kinase mM 37 °C".split()
+
+
+@dataclass
+class _DictBlock:
+    block_id: str
+    section_id: str
+    type: str
+    text: str
+    block_index: int
+
+
+def _copy(s: str) -> str:
+    return (s + " ")[:-1]
+
+
+def _rows(rng: random.Random, blocks: int, sections: int, text_chars: int) -> List[Row]:
+    section_ids = [str(uuid.UUID(int=rng.getrandbits(128))) for _ in range(sections)]
+    per_section = max(1, blocks // sections)
+    rows = []
+    for i in range(blocks):
+        rows.append(
+            Row(
+                str(uuid.UUID(int=rng.getrandbits(128))),
+                _copy(section_ids[min(i // per_section, sections - 1)]),
+                _copy(rng.choice(("text", "text", "text", "table", "figure"))),
+                " ".join(rng.choices(_WORDS, k=max(1, text_chars // 7))),
+                i % per_section + 1,
+            )
+        )
+    rng.shuffle(rows)
+    return rows
+
+
+def _dict_store(rows: List[Row], block_cls) -> Dict[str, object]:
+    make = block_cls.from_row if hasattr(block_cls, "from_row") else lambda r: block_cls(*r)
+    blocks = {}
+    by_section: Dict[str, list] = {}
+    for r in rows:
+        b = make(r)
+        blocks[b.block_id] = b
+        by_section.setdefault(b.section_id, []).append(b)
+    position = {}
+    for blist in by_section.values():
+        blist.sort(key=lambda b: b.block_index)
+        for i, b in enumerate(blist):
+            position[b.block_id] = i
+    return {"blocks": blocks, "by_section": by_section, "position": position}
+
+
+def _run_mode(mode: str, papers: int, blocks: int, sections: int, text_chars: int, *, trace: bool) -> None:
+    rng = random.Random(0)
+    stores = []
+    retained = 0
+    elapsed = 0.0
+    for p in range(papers):
+        if trace:
+            tracemalloc.start()
+        rows = _rows(rng, blocks, sections, text_chars)
+        start = time.perf_counter()
+        if mode == "dict":
+            store = _dict_store(rows, _DictBlock)
+        elif mode == "slots":
+            store = _dict_store(rows, Block)
+        else:
+            store = PaperBlockStore.from_rows(f"paper-{p}", rows)
+        elapsed += time.perf_counter() - start
+        del rows  # the driver rows go away once the store is built
+        if trace:
+            # heap still held by this paper's store, strings taken over from the rows included
+            retained += tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+        stores.append(store)
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(
+        json.dumps(
+            {
+                "mode": mode,
+                "blocks": papers * blocks,
+                "seconds": elapsed,
+                "retained_mb": retained / (1024 * 1024),
+                "peak_rss_mb": peak_kb / 1024.0,
+            }
+        )
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="RSS of per-paper block stores: dict/dataclass vs slotted vs columnar.")
+    parser.add_argument("--papers", type=int, default=8)
+    parser.add_argument("--blocks", type=int, default=5000, help="blocks per paper")
+    parser.add_argument("--sections", type=int, default=40, help="sections per paper")
+    parser.add_argument("--text-chars", type=int, default=300)
+    parser.add_argument("--mode", choices=["dict", "slots", "columnar"], help=argparse.SUPPRESS)
+    parser.add_argument("--trace", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        _run_mode(args.mode, args.papers, args.blocks, args.sections, args.text_chars, trace=args.trace)
+        return
+
+    # Each mode runs in fresh interpreters so ru_maxrss is not shared; retained heap is
+    # measured in a second run because tracemalloc itself inflates RSS.
+    for mode in ("dict", "slots", "columnar"):
+        runs = []
+        for trace in (False, True):
+            cmd = [
+                sys.executable,
+                "-m",
+                "benchmarks.block_store_rss",
+                "--mode",
+                mode,
+                "--papers",
+                str(args.papers),
+                "--blocks",
+                str(args.blocks),
+                "--sections",
+                str(args.sections),
+                "--text-chars",
+                str(args.text_chars),
+            ]
+            res = subprocess.run(cmd + (["--trace"] if trace else []), check=True, capture_output=True, text=True)
+            runs.append(json.loads(res.stdout.strip().splitlines()[-1]))
+        data = dict(runs[0], retained_mb=runs[1]["retained_mb"])
+        print(
+            f"[bench] mode={data['mode']:<8} blocks={data['blocks']} retained={data['retained_mb']:.1f}MB "
+            f"peak_rss={data['peak_rss_mb']:.1f}MB build={data['seconds']:.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
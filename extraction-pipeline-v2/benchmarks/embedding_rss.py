@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import random
+import resource
+import subprocess
+import sys
+import time
+from typing import List
+
+import numpy as np
+
+from structure_to_blocks.embedder import _decode_embedding
+
+# Simulates the embedder's response handling for one paper: vectors arrive in
+# batches of `batch_size` either as JSON float lists (legacy path, kept as
+# List[List[float]]) or as base64 float32 (decoded into one float32 matrix).
+
+
+def _batch_payloads(rng: random.Random, batch: int, dim: int, *, as_base64: bool) -> List[object]:
+    out: List[object] = []
+    for _ in range(batch):
+        vec = np.array([rng.uniform(-1.0, 1.0) for _ in range(dim)], dtype=np.float32)
+        if as_base64:
+            out.append(base64.b64encode(vec.astype("<f4").tobytes()).decode("ascii"))
+        else:
+            out.append(json.loads(json.dumps(vec.tolist())))
+    return out
+
+
+def _run_mode(mode: str, blocks: int, dim: int, batch_size: int) -> None:
+    rng = random.Random(0)
+    start = time.perf_counter()
+    if mode == "list":
+        out_list: List[List[float]] = []
+        for i in range(0, blocks, batch_size):
+            n = min(batch_size, blocks - i)
+            out_list.extend([list(e) for e in _batch_payloads(rng, n, dim, as_base64=False)])
+        rows = len(out_list)
+    else:
+        out = np.empty((blocks, dim), dtype=np.float32)
+        for i in range(0, blocks, batch_size):
+            n = min(batch_size, blocks - i)
+            for j, e in enumerate(_batch_payloads(rng, n, dim, as_base64=True)):
+                out[i + j] = _decode_embedding(e)
+        rows = out.shape[0]
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"mode": mode, "rows": rows, "seconds": elapsed, "peak_rss_mb": peak_kb / 1024.0}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Peak RSS of embedding results: List[List[float]] vs float32 matrix.")
+    parser.add_argument("--blocks", type=int, default=5000)
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--mode", choices=["list", "numpy"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        _run_mode(args.mode, args.blocks, args.dim, args.batch_size)
+        return
+
+    # Each mode runs in a fresh interpreter so ru_maxrss is not shared.
+    for mode in ("list", "numpy"):
+        res = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.embedding_rss",
+                "--mode",
+                mode,
+                "--blocks",
+                str(args.blocks),
+                "--dim",
+                str(args.dim),
+                "--batch-size",
+                str(args.batch_size),
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        data = json.loads(res.stdout.strip().splitlines()[-1])
+        print(
+            f"[bench] mode={data['mode']:<5} rows={data['rows']} "
+            f"peak_rss={data['peak_rss_mb']:.1f}MB time={data['seconds']:.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
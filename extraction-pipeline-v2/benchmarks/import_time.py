@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# name -> (module imported before main() runs, package for `python -m <pkg> --help`).
+# The *.core entries are what a worker pays once it actually starts a run.
+ENTRY_POINTS: Dict[str, Tuple[str, Optional[str]]] = {
+    "structure_to_blocks": ("structure_to_blocks.__main__", "structure_to_blocks"),
+    "blocks_to_items": ("blocks_to_items.__main__", "blocks_to_items"),
+    "pdf_to_infra": ("pdf_to_infra.api", None),
+    "orchestrator": ("orchestrator.__main__", "orchestrator"),
+    "structure_to_blocks.core": ("structure_to_blocks.core", None),
+    "blocks_to_items.core": ("blocks_to_items.core", None),
+}
+
+
+def _parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    # "import time:  self [us] | cumulative | imported package", nesting shown by indentation
+    rows: List[Tuple[str, int, int]] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line.split(":", 1)[1].split("|", 2)
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def _measure(module: str) -> Dict[str, object]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        tail = proc.stderr.strip().splitlines()[-1:] or ["?"]
+        return {"error": tail[0]}
+    rows = _parse_importtime(proc.stderr)
+    by_package: Dict[str, int] = {}
+    for name, self_us, _ in rows:
+        top = name.split(".", 1)[0]
+        by_package[top] = by_package.get(top, 0) + self_us
+    return {
+        "total_ms": sum(self_us for _, self_us, _ in rows) / 1000.0,
+        "modules": len(rows),
+        "packages_ms": {k: v / 1000.0 for k, v in sorted(by_package.items(), key=lambda kv: -kv[1])},
+    }
+
+
+def _help_wall(pkg: str) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-m", pkg, "--help"], cwd=ROOT, capture_output=True)
+    return (time.perf_counter() - start) * 1000.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import time of each pipeline entry point (python -X importtime).")
+    parser.add_argument("--entry", nargs="*", choices=sorted(ENTRY_POINTS), help="Entry points to measure (default all)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per entry point; the fastest is reported")
+    parser.add_argument("--top", type=int, default=8, help="Heaviest packages to list")
+    parser.add_argument("--out", help="Write the report as JSON (use as a later --baseline)")
+    parser.add_argument("--baseline", help="Previous --out report to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Allowed slowdown vs baseline (fraction)")
+    args = parser.parse_args()
+
+    baseline: Dict[str, Dict[str, object]] = {}
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+
+    report: Dict[str, Dict[str, object]] = {}
+    regressions: List[str] = []
+    for pkg in args.entry or list(ENTRY_POINTS):
+        module, cli = ENTRY_POINTS[pkg]
+        runs = [_measure(module) for _ in range(max(1, args.repeat))]
+        if any("error" in r for r in runs):
+            print(f"[bench] {pkg} import failed: {runs[0].get('error')}")
+            continue
+        best = min(runs, key=lambda r: r["total_ms"])
+        report[pkg] = best
+
+        line = f"[bench] {pkg} import_ms={best['total_ms']:.1f} modules={best['modules']}"
+        if cli:
+            best["help_wall_ms"] = min(_help_wall(cli) for _ in range(max(1, args.repeat)))
+            line += f" help_wall_ms={best['help_wall_ms']:.1f}"
+        prev = baseline.get(pkg)
+        if prev:
+            ratio = best["total_ms"] / max(1e-6, float(prev["total_ms"]))
+            line += f" baseline_ms={float(prev['total_ms']):.1f} change={(ratio - 1) * 100:+.1f}%"
+            if ratio > 1 + args.max_regression:
+                regressions.append(pkg)
+        print(line)
+        heaviest = list(best["packages_ms"].items())[: args.top]
+        print("        " + " ".join(f"{name}={ms:.1f}" for name, ms in heaviest))
+
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if regressions:
+        print(f"[bench] import time regressions: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
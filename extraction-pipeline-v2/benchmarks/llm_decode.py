@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from blocks_to_items import schemas
+from blocks_to_items.postprocess import ItemPostProcessor
+
+_EVIDENCE_RE = re.compile(r"^b_[0-9a-f]+$|^b_\d+$|^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$")
+_KINDS = ["experiment", "method", "claim", "dataset", "resource", "negative_result"]
+
+
+def _field(rng: random.Random) -> Dict[str, Any]:
+    ids = [str(uuid.UUID(int=rng.getrandbits(128))) for _ in range(rng.randint(0, 3))]
+    if rng.random() < 0.1:
+        ids.append("Figure 2 shows")  # raw text the validator must drop
+    return {"value": f"value {rng.randint(0, 999)}", "evidence": ids, "confidence": round(rng.random(), 2)}
+
+
+def _item_response(rng: random.Random) -> str:
+    if rng.random() < 0.05:
+        return json.dumps({"drop": True, "drop_reason": "no support"})
+    f = lambda: _field(rng)  # noqa: E731
+    item = {
+        "item_id": f"i_{rng.randint(1, 9)}",
+        "item_kind": rng.choice(_KINDS),
+        "label": f(),
+        "summary": f(),
+        "entities": {k: [f() for _ in range(rng.randint(0, 3))] for k in ("samples", "assays", "proteins_or_targets")},
+        "design": {"design_type": "comparison", "comparisons": [{"a": f(), "b": f()}], "variables": []},
+        "protocol": {"steps": [{"text": f(), "parameters": [{"name": f(), "value": f(), "unit": f()}]} for _ in range(3)]},
+        "results": {
+            "metrics": [{"name": f(), "value": f(), "unit": f(), "direction": "up", "conditions": f()} for _ in range(2)],
+            "takeaway": f(),
+        },
+        "grounding": {
+            "evidence_block_ids": [str(uuid.UUID(int=rng.getrandbits(128))) for _ in range(rng.randint(0, 4))],
+            "source_section_ids": [],
+            "anchors": ["anchor"],
+            "coverage_level": "L3_results",
+        },
+        "confidence_overall": round(rng.random(), 2),
+    }
+    return json.dumps(item, ensure_ascii=False)
+
+
+def _candidate_response(rng: random.Random) -> str:
+    items = [
+        {
+            "item_id": f"i_{i}",
+            "proposed_item_kind": rng.choice(_KINDS),
+            "label": f"label {rng.randint(0, 999)}",
+            "summary": "one or two sentences grounded in the section blocks " * 2,
+            "anchors": ["western blot", "p53"],
+            "predicted_source_sections": ["SECTION_ID"],
+            "evidence_block_ids": ["b_1", "b_2"],
+            "evidence_hints": ["short hint", "another"],
+            "confidence": str(round(rng.random(), 2)) if rng.random() < 0.2 else round(rng.random(), 2),
+        }
+        for i in range(rng.randint(1, 8))
+    ]
+    return json.dumps({"items": items}, ensure_ascii=False)
+
+
+def _load_cache(root: Path) -> Tuple[List[str], List[str]]:
+    items: List[str] = []
+    candidates: List[str] = []
+    for path in root.rglob("*.json"):
+        try:
+            content = json.loads(path.read_text(encoding="utf-8")).get("content") or ""
+        except (OSError, ValueError):
+            continue
+        (items if '"grounding"' in content or '"drop"' in content else candidates).append(content)
+    return items, candidates
+
+
+# --- dict path (json.loads + recursive walk + path probes), as before typed decoding ---
+
+
+def _dict_enforce(item: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+    def walk(obj: Any) -> Any:
+        if isinstance(obj, dict):
+            if "value" in obj and "evidence" in obj and "confidence" in obj:
+                ev = obj.get("evidence") or []
+                obj["evidence"] = [e for e in ev if isinstance(e, str) and _EVIDENCE_RE.match(e)] if isinstance(ev, list) else []
+                return obj
+            for k, v in list(obj.items()):
+                obj[k] = walk(v)
+            return obj
+        if isinstance(obj, list):
+            return [walk(v) for v in obj]
+        return obj
+
+    cleaned = walk(item)
+    grounding = cleaned.get("grounding") if isinstance(cleaned, dict) else None
+    ev_ids = grounding.get("evidence_block_ids") if isinstance(grounding, dict) else []
+    return cleaned, not ev_ids
+
+
+def _has_ev(field: object) -> bool:
+    return isinstance(field, dict) and bool(field.get("evidence"))
+
+
+def _dict_path(raw: str) -> int:
+    data = json.loads(raw)
+    if not isinstance(data, dict) or data.get("drop") is True:
+        return 0
+    cleaned, drop = _dict_enforce(data)
+    if drop:
+        return 0
+    kind = cleaned.get("item_kind") or "claim"
+    label = _has_ev(cleaned.get("label"))
+    steps = ((cleaned.get("protocol") or {}).get("steps")) or []
+    results = cleaned.get("results") or {}
+    has_results = any(isinstance(m, dict) and _has_ev(m.get("name")) for m in results.get("metrics") or []) or _has_ev(
+        results.get("takeaway")
+    )
+    if not label or (kind == "method" and not any(isinstance(s, dict) and _has_ev(s.get("text")) for s in steps)):
+        return 0
+    cleaned.setdefault("grounding", {})["coverage_level"] = "L3_results" if has_results else "L2_design"
+    return 1
+
+
+def _dict_candidates(raw: str) -> int:
+    data = json.loads(raw)
+    if isinstance(data, dict):
+        data = data.get("items") or []
+    n = 0
+    for d in data:
+        if isinstance(d, dict):
+            _ = (d.get("label"), d.get("summary"), d.get("evidence_hints") or [], d.get("anchors") or [])
+            _ = float(d.get("confidence") or 0.0)
+            n += 1
+    return n
+
+
+def _typed_path(post: ItemPostProcessor) -> Callable[[str], int]:
+    def run(raw: str) -> int:
+        item = schemas.decode(raw, schemas.ExtractedItem)
+        return len(post.normalize_and_filter([item])) if item is not None else 0
+
+    return run
+
+
+def _typed_candidates(raw: str) -> int:
+    return len(schemas.decode(raw, schemas.CandidateOut, many=True) or [])
+
+
+def _time(fn: Callable[[str], int], responses: List[str], repeat: int) -> Tuple[float, int]:
+    best = float("inf")
+    kept = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        kept = sum(fn(r) for r in responses)
+        best = min(best, time.perf_counter() - start)
+    return best, kept
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Decode + validate throughput for recorded LLM responses.")
+    parser.add_argument("--items", type=int, default=20000, help="synthetic stage B item responses")
+    parser.add_argument("--candidates", type=int, default=5000, help="synthetic stage A candidate responses")
+    parser.add_argument("--cache-dir", help="use raw completions recorded by --llm-cache rw instead")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.cache_dir:
+        items, candidates = _load_cache(Path(args.cache_dir))
+    else:
+        rng = random.Random(0)
+        items = [_item_response(rng) for _ in range(args.items)]
+        candidates = [_candidate_response(rng) for _ in range(args.candidates)]
+    mb = sum(len(r) for r in items + candidates) / 1e6
+    print(f"[bench] item_responses={len(items)} candidate_responses={len(candidates)} size={mb:.1f}MB")
+
+    post = ItemPostProcessor()
+    for name, fn, responses in (
+        ("items      dict ", _dict_path, items),
+        ("items      typed", _typed_path(post), items),
+        ("candidates dict ", _dict_candidates, candidates),
+        ("candidates typed", _typed_candidates, candidates),
+    ):
+        if not responses:
+            continue
+        seconds, kept = _time(fn, responses, args.repeat)
+        print(f"[bench] {name}: {seconds * 1000:.0f} ms  {len(responses) / seconds:,.0f} responses/s  kept={kept}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import time
+from typing import Callable, List
+
+from blocks_to_items.candidate_generator import _SIGNAL_CUES, _section_context, _signal_score
+from blocks_to_items.models import Block
+
+_WORDS = (
+    "the protein levels were measured and quantified after cells were incubated treated washed "
+    "centrifuged sample buffer assay result figure table fig. n = p < mean ± standard deviation "
+    "stable peptide digested enriched compared increase decrease significant lysate antibody"
+).split()
+
+
+def _synthetic_paper(blocks: int, per_section: int, seed: int) -> List[List[Block]]:
+    rng = random.Random(seed)
+    out: List[Block] = []
+    for i in range(blocks):
+        words = []
+        for _ in range(rng.randint(20, 160)):
+            r = rng.random()
+            if r < 0.08:
+                words.append(str(rng.randint(1, 500)))
+            elif r < 0.12:
+                words.append(f"{rng.uniform(0, 100):.2f}")
+            else:
+                words.append(rng.choice(_WORDS))
+        out.append(Block(f"b{i}", f"s{i // per_section}", "text", " ".join(words), i % per_section))
+    return [out[i : i + per_section] for i in range(0, len(out), per_section)]
+
+
+def _baseline_score(b: Block) -> int:
+    text = (b.text or "").lower()
+    score = 0
+    for cue in _SIGNAL_CUES:
+        if cue in text:
+            score += 1
+    score += len(re.findall(r"\b\d+(\.\d+)?\b", text)) // 5
+    return score
+
+
+_ALT_RE = re.compile(
+    "(?=(" + "|".join(re.escape(c) for c in sorted(set(_SIGNAL_CUES), key=len, reverse=True)) + "))"
+    r"|\b\d+(?:\.\d+)?\b"
+)
+
+
+def _alternation_score(b: Block) -> int:
+    # single pass: zero-width cue matches (overlaps allowed) + number matches
+    seen = set()
+    numbers = 0
+    for m in _ALT_RE.finditer((b.text or "").lower()):
+        if m.group(1) is None:
+            numbers += 1
+        else:
+            seen.add(m.group(1))
+    return len(seen) + numbers // 5
+
+
+def _baseline_context(blocks: List[Block], score: Callable[[Block], int]) -> List[str]:
+    scored = sorted(blocks, key=score, reverse=True)
+    return [b.block_id for b in scored[:3] if score(b) > 0]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="_signal_score / _section_context cost on a synthetic paper.")
+    parser.add_argument("--blocks", type=int, default=10000)
+    parser.add_argument("--per-section", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    sections = _synthetic_paper(args.blocks, args.per_section, seed=0)
+    flat = [b for sec in sections for b in sec]
+    if any(_baseline_score(b) != _signal_score(b) or _baseline_score(b) != _alternation_score(b) for b in flat):
+        raise SystemExit("score mismatch")
+
+    runs = {
+        "baseline (cue scans + re.findall, scored in sort and top-3)": lambda: [
+            _baseline_context(sec, _baseline_score) for sec in sections
+        ],
+        "alternation (one regex pass for cues + numbers)": lambda: [
+            _baseline_context(sec, _alternation_score) for sec in sections
+        ],
+        "current (_section_context)": lambda: [_section_context(sec, []) for sec in sections],
+    }
+    print(f"[bench] blocks={len(flat)} sections={len(sections)} cues={len(_SIGNAL_CUES)}")
+    for name, fn in runs.items():
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+        print(f"[bench] {name}: {best * 1000:.1f} ms ({best / len(flat) * 1e6:.1f} us/block)")
+
+
+if __name__ == "__main__":
+    main()
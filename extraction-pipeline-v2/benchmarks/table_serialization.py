@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import time
+
+from pdf_to_infra.utils.csv import rows_to_csv_bytes
+from structure_to_blocks.tables import parse_table_csv, table_text_chunks
+
+# Rough BPE stand-in: words and each punctuation mark count as one token.
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def _tokens(text: str) -> int:
+    return len(_TOKEN_RE.findall(text))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Embedding text size of table CSVs vs header+rows serialization.")
+    parser.add_argument("--tables", type=int, default=200)
+    parser.add_argument("--rows", type=int, default=150)
+    parser.add_argument("--cols", type=int, default=8)
+    parser.add_argument("--max-chars", type=int, default=1200)
+    parser.add_argument("--rows-per-chunk", type=int, default=20)
+    parser.add_argument("--model-max-chars", type=int, default=8000, help="chars the embedding model keeps")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    csv_tokens = ser_tokens = kept_rows = total_rows = chunks = 0
+    start = time.perf_counter()
+    for _ in range(args.tables):
+        header = [f"Condition {c}" for c in range(args.cols)]
+        rows = [header] + [
+            [f"{rng.uniform(0, 100):.2f}" if c else f"sample-{r}" for c in range(args.cols)] for r in range(args.rows)
+        ]
+        csv_text = rows_to_csv_bytes(rows).decode("utf-8")
+        csv_tokens += _tokens(csv_text)
+        # rows that survive model truncation when the whole CSV is embedded as one input
+        total_rows += args.rows
+        kept_rows += max(0, csv_text[: args.model_max_chars].count("\n"))
+
+        parts = table_text_chunks(csv_text, args.max_chars, args.rows_per_chunk)
+        chunks += len(parts)
+        ser_tokens += sum(_tokens(p) for p in parts)
+        assert sum(len(p.splitlines()) - 1 for p in parts) == len(parse_table_csv(csv_text)) - 1
+
+    elapsed = time.perf_counter() - start
+    print(f"[bench] tables={args.tables} rows/table={args.rows} cols={args.cols} seconds={elapsed:.2f}")
+    print(f"[bench] csv        tokens={csv_tokens} rows_embedded={kept_rows}/{total_rows}")
+    print(f"[bench] serialized tokens={ser_tokens} rows_embedded={total_rows}/{total_rows} chunks={chunks}")
+    print(f"[bench] tokens saved={(1 - ser_tokens / max(1, csv_tokens)) * 100:.1f}% (header repeated per chunk)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,12 @@
 from __future__ import annotations
 
-from .core import BlocksToItems
-
 __all__ = ["BlocksToItems"]
+
+
+def __getattr__(name: str):
+    # Resolved on first access so `python -m blocks_to_items --help` does not import core.
+    if name == "BlocksToItems":
+        from .core import BlocksToItems
+
+        return BlocksToItems
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,17 +1,58 @@
 from __future__ import annotations
 
 import argparse
+from dataclasses import replace
 
-from blocks_to_items.core import BlocksToItems
 from .env import load_env
 load_env()
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Run items extraction on blocks/sections.")
-    parser.add_argument("--paper-id", required=True, help="paper hash id")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--paper-id", help="paper hash id")
+    target.add_argument(
+        "--paper-ids-file",
+        help="file with one paper hash id per line (# comments allowed); papers share clients and the LLM budget",
+    )
+    parser.add_argument(
+        "--llm-cache",
+        choices=["off", "rw", "replay"],
+        default="off",
+        help="LLM response cache: rw reads+writes, replay never calls the model (LLM_CACHE_DIR)",
+    )
+    parser.add_argument(
+        "--merge-mode",
+        choices=["exact", "embedding"],
+        default="exact",
+        help="candidate merge: exact label+kind, or also cluster near-duplicates by embedding similarity",
+    )
     args = parser.parse_args()
 
-    BlocksToItems().run(args.paper_id)
+    from blocks_to_items.config import BlocksToItemsConfig
+    from blocks_to_items.core import BlocksToItems
+
+    config = BlocksToItemsConfig()
+    config = replace(
+        config,
+        llm_cache=replace(config.llm_cache, mode=args.llm_cache),
+        merge=replace(config.merge, mode=args.merge_mode),
+    )
+    runner = BlocksToItems(config)
+    try:
+        if args.paper_ids_file:
+            results = runner.run_many(_read_paper_ids(args.paper_ids_file))
+            if any("error" in r for r in results.values()):
+                raise SystemExit(1)
+        else:
+            runner.run(args.paper_id)
+    finally:
+        runner.close()
+
+
+def _read_paper_ids(path: str) -> list[str]:
+    with open(path, encoding="utf-8") as f:
+        lines = (line.split("#", 1)[0].strip() for line in f)
+        return [line for line in lines if line]
 
 
 if __name__ == "__main__":
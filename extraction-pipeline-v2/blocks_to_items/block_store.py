@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .models import Block, intern_id
+
+_NO_INDEX = -1
+
+
+@dataclass
+class PaperBlockStore:
+    # Columnar: one row per block in parallel arrays, rows sorted by (section, block_index)
+    # so a section is a contiguous row range. Block objects are only built for the few
+    # blocks a caller asks for; bulk consumers (BM25, signal scoring) read the columns.
+    paper_id: str
+    block_ids: List[str] = field(default_factory=list)
+    section_ids: List[Optional[str]] = field(default_factory=list)
+    types: List[Optional[str]] = field(default_factory=list)
+    texts: List[Optional[str]] = field(default_factory=list)
+    block_indexes: array = field(default_factory=lambda: array("i"))
+    _rows: Dict[str, int] = field(default_factory=dict)
+    _sections: Dict[str, Tuple[int, int]] = field(default_factory=dict)
+
+    @classmethod
+    def from_rows(cls, paper_id: str, rows: Iterable[Any]) -> "PaperBlockStore":
+        # rows: driver rows or Blocks (block_id, section_id, type, text, block_index attributes)
+        order: Dict[Optional[str], List[Any]] = {}
+        for r in rows:
+            order.setdefault(intern_id(r.section_id) or None, []).append(r)
+        store = cls(paper_id=paper_id)
+        # blocks without a section go last and belong to no range
+        no_section = order.pop(None, [])
+        for section_id, srows in order.items():
+            srows.sort(key=lambda r: (r.block_index is None, r.block_index or 0))
+            start = len(store.block_ids)
+            for r in srows:
+                store._append(r, section_id)
+            store._sections[section_id] = (start, len(store.block_ids))
+        for r in no_section:
+            store._append(r, intern_id(r.section_id))
+        return store
+
+    @classmethod
+    def from_blocks(cls, paper_id: str, blocks: Iterable[Block]) -> "PaperBlockStore":
+        return cls.from_rows(paper_id, blocks)
+
+    def _append(self, r: Any, section_id: Optional[str]) -> None:
+        block_id = intern_id(r.block_id)
+        if block_id in self._rows:
+            return
+        self._rows[block_id] = len(self.block_ids)
+        self.block_ids.append(block_id)
+        self.section_ids.append(section_id)
+        self.types.append(intern_id(r.type))
+        self.texts.append(r.text)
+        self.block_indexes.append(_NO_INDEX if r.block_index is None else r.block_index)
+
+    def __len__(self) -> int:
+        return len(self.block_ids)
+
+    @property
+    def section_count(self) -> int:
+        return len(self._sections)
+
+    def get(self, block_id: str) -> Optional[Block]:
+        row = self._rows.get(block_id)
+        return None if row is None else self._block(row)
+
+    def get_many(self, block_ids: Iterable[str]) -> List[Block]:
+        out: List[Block] = []
+        seen = set()
+        for block_id in block_ids:
+            row = self._rows.get(block_id)
+            if row is None or block_id in seen:
+                continue
+            seen.add(block_id)
+            out.append(self._block(row))
+        return out
+
+    def section(self, section_id: str) -> List[Block]:
+        start, end = self._sections.get(section_id, (0, 0))
+        return [self._block(row) for row in range(start, end)]
+
+    def neighbors(self, block_id: str, window: int = 1) -> List[Block]:
+        row = self._rows.get(block_id)
+        span = self._sections.get(self.section_ids[row]) if row is not None else None
+        if span is None:
+            return []
+        lo, hi = max(span[0], row - window), min(span[1], row + window + 1)
+        return [self._block(j) for j in range(lo, hi) if j != row]
+
+    def __iter__(self) -> Iterator[Block]:
+        return (self._block(row) for row in range(len(self.block_ids)))
+
+    def _block(self, row: int) -> Block:
+        index = self.block_indexes[row]
+        return Block(
+            self.block_ids[row],
+            self.section_ids[row],
+            self.types[row],
+            self.texts[row],
+            None if index == _NO_INDEX else index,
+        )
@@ -1,19 +1,22 @@
 from __future__ import annotations
 
 import hashlib
-import json
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
-from typing import Dict, List
-
-from storage.astra.client import AstraClientFactory
-from storage.qdrant.client import QdrantClientFactory
+from typing import Dict, List, Optional, Tuple
 
+from .block_store import PaperBlockStore
+from .clients import SharedClients, astra_session, qdrant_client
 from .config import BlocksToItemsConfig
+from .cue_cache import CueVectorCache
 from .embedder import Embedder
 from .llm_client import LLMClient
-from .models import Block, Candidate, Section
-from .prompts import section_items_prompt
+from .models import Block, Candidate, Section, intern_id
+from .prompt_budget import SectionPromptBuilder
+from .schemas import CandidateOut
+from .vector_index import PaperVectorIndex
 
 _SIGNAL_CUES = [
     # measurement & quantification
@@ -60,6 +63,10 @@ _SIGNAL_CUES = [
     "table",
 ]
 
+# Left boundary checked after the first digit so the scan can jump straight to digits;
+# same matches as r"\b\d+(\.\d+)?\b".
+_NUMBER_RE = re.compile(r"\d(?<!\w\d)\d*(?:\.\d+)?\b")
+
 _QUERY_CUES = [
     # protein measurement & quantification
     "protein quantification measurement abundance levels",
@@ -93,93 +100,190 @@ class SectionCandidateGenerator:
     llm: LLMClient
     config: BlocksToItemsConfig
     embedder: Embedder
+    clients: Optional[SharedClients] = None
+
+    def __post_init__(self) -> None:
+        self.cue_cache = CueVectorCache(self.embedder, self.config.retrieval)
+        self.prompt_builder = SectionPromptBuilder(self.config.prompt_budget)
+        # Warm from disk at startup; embedding only happens on a cache miss.
+        self.cue_cache.load(_QUERY_CUES)
 
-    def generate(self, paper_id: str, sections: List[Section]) -> List[Candidate]:
+    def generate(
+        self,
+        paper_id: str,
+        sections: List[Section],
+        index: Optional[PaperVectorIndex] = None,
+        block_store: Optional[PaperBlockStore] = None,
+    ) -> List[Candidate]:
         section_map: Dict[str, Section] = {s.section_id: s for s in sections}
 
         print("[candidate_generator] retrieval-first candidate discovery")
-        hits_by_section = self._retrieve_seed_blocks()
+        hits_by_section = self._retrieve_seed_blocks(paper_id, index)
         print(f"[candidate_generator] seed_sections={len(hits_by_section)}")
 
-        out: List[Candidate] = []
+        jobs: List[Tuple[str, List[Block], str]] = []
         for section_id, block_ids in hits_by_section.items():
             if section_id not in section_map:
                 continue
-            sec_blocks = self._fetch_blocks_by_ids(paper_id, block_ids)
+            if block_store is not None:
+                sec_blocks = block_store.get_many(block_ids)
+            else:
+                sec_blocks = self._fetch_blocks_by_ids(paper_id, block_ids)
             if not sec_blocks:
                 continue
             s = section_map.get(section_id, Section(section_id=section_id, title="", summary=None))
             glimpse = _section_context(sec_blocks, block_ids)
             if not glimpse:
                 continue
-            payload_blocks = [
-                {"block_id": b.block_id, "type": b.type, "text": b.text}
-                for b in glimpse
-            ]
-            print(f"[candidate_generator] section_id={section_id} num_blocks={len(glimpse)}")
-            prompt = section_items_prompt(
-                section_id=section_id,
-                section_title=s.title or "",
-                blocks_json=json.dumps(payload_blocks, ensure_ascii=False),
+            prompt, stats = self.prompt_builder.build(
+                self.config.openai.model_candidates, section_id, s.title or "", glimpse
             )
-            data = self.llm.chat_json(
-                model=self.config.openai.model_candidates,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.2,
+            print(
+                f"[candidate_generator] section_id={section_id} num_blocks={stats.blocks_out}/{stats.blocks_in} "
+                f"truncated={stats.truncated} prompt_tokens={stats.prompt_tokens} "
+                f"tokenizer={self.prompt_builder.counter.name}"
             )
-            print(f"[candidate_generator] llm_response={data}")
-            items = _ensure_list(data)
-            for d in items:
-                if not isinstance(d, dict):
-                    continue
+            if not stats.blocks_out:
+                # an empty BLOCKS_JSON can only yield nothing or ungrounded candidates
+                print(f"[candidate_generator] section_id={section_id} skipped: no block fits the prompt budget")
+                continue
+            # only the blocks that reached the model are kept as candidate sources
+            kept = set(stats.block_ids)
+            jobs.append((section_id, [b for b in glimpse if b.block_id in kept], prompt))
+
+        results = self._run_section_prompts(jobs)
+        out: List[Candidate] = []
+        for section_id, glimpse, _ in jobs:
+            for d in results[section_id] or []:
                 cand = Candidate(
                     candidate_id=_candidate_id(section_id, d),
-                    section_id=section_id,
-                    label=d.get("label"),
-                    summary=d.get("summary"),
-                    evidence_hints=d.get("evidence_hints") or [],
-                    proposed_item_kind=d.get("proposed_item_kind"),
-                    anchors=d.get("anchors") or [],
+                    section_id=intern_id(section_id),
+                    label=d.label,
+                    summary=d.summary,
+                    evidence_hints=d.evidence_hints,
+                    proposed_item_kind=intern_id(d.proposed_item_kind),
+                    anchors=d.anchors,
                     source_block_ids=[b.block_id for b in glimpse],
-                    confidence=float(d.get("confidence") or 0.0),
+                    confidence=d.confidence,
                 )
                 out.append(cand)
         return out
 
-    def _retrieve_seed_blocks(self) -> Dict[str, List[str]]:
-        client = QdrantClientFactory().create()
-        top_k = min(6, self.config.retrieval.top_k)
-        hits: Dict[str, Dict[str, float]] = {}
-
-        for q in _QUERY_CUES:
-            vector = self.embedder.embed([q])[0]
-            res = client.query_points(
-                collection_name=self.config.storage.qdrant_blocks,
-                query=vector,
-                limit=top_k,
-                with_payload=True,
-            )
-            for p in res.points:
-                payload = p.payload or {}
-                block_id = payload.get("block_id")
-                section_id = payload.get("section_id")
-                if not block_id or not section_id:
-                    continue
-                hits.setdefault(section_id, {})
-                hits[section_id][block_id] = max(hits[section_id].get(block_id, 0.0), p.score or 0.0)
+    def _run_section_prompts(self, jobs: List[Tuple[str, List[Block], str]]) -> Dict[str, Optional[List[CandidateOut]]]:
+        # Up to max_concurrent_requests prompts in flight; callers consume results in
+        # job order, so candidate order does not depend on completion order.
+        if not jobs:
+            return {}
+        workers = max(1, min(self.config.openai.max_concurrent_requests, len(jobs)))
+        start = time.perf_counter()
+        results: Dict[str, Optional[List[CandidateOut]]] = {}
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="section-llm")
+        futures = {pool.submit(self._section_prompt, section_id, prompt): section_id for section_id, _, prompt in jobs}
+        try:
+            for fut in as_completed(futures):
+                results[futures[fut]] = fut.result()
+        except BaseException:
+            # fatal: drop queued sections, let in-flight calls finish, re-raise
+            pool.shutdown(wait=False, cancel_futures=True)
+            print(f"[candidate_generator] aborted sections done={len(results)}/{len(jobs)}")
+            raise
+        pool.shutdown()
+        print(
+            f"[candidate_generator] sections={len(jobs)} concurrency={workers} "
+            f"seconds={time.perf_counter() - start:.2f}"
+        )
+        return results
+
+    def _section_prompt(self, section_id: str, prompt: str) -> Optional[List[CandidateOut]]:
+        t0 = time.perf_counter()
+        data = self.llm.chat_typed(
+            model=self.config.openai.model_candidates,
+            messages=[{"role": "user", "content": prompt}],
+            type_=CandidateOut,
+            temperature=0.2,
+            many=True,
+        )
+        print(f"[candidate_generator] section_id={section_id} seconds={time.perf_counter() - t0:.2f}")
+        print(f"[candidate_generator] llm_response={data}")
+        return data
+
+    def _retrieve_seed_blocks(
+        self, paper_id: str, index: Optional[PaperVectorIndex] = None
+    ) -> Dict[str, List[str]]:
+        from qdrant_client.models import FieldCondition, Filter, MatchValue
 
+        cue_vectors = self.cue_cache.vectors(_QUERY_CUES)
+        if index is not None and len(index):
+            return self._seed_blocks_local(index, cue_vectors)
+
+        client = qdrant_client(self.clients)
+        # paper_id is a keyword payload index on blocks, so the filter keeps the
+        # search inside this paper's points regardless of collection size.
+        flt = Filter(must=[FieldCondition(key="paper_id", match=MatchValue(value=paper_id))])
+        if self.config.retrieval.seed_group_by_section:
+            return self._seed_blocks_grouped(client, cue_vectors, flt)
+        return self._seed_blocks_batched(client, cue_vectors, flt)
+
+    def _seed_blocks_local(self, index: PaperVectorIndex, cue_vectors) -> Dict[str, List[str]]:
+        cfg = self.config.retrieval
+        top_k = min(cfg.seed_top_k, cfg.top_k)
+        hits = [(h.block_id, h.section_id, h.score) for res in index.search_many(cue_vectors, limit=top_k) for h in res]
+        return _group_seed_hits(hits, cfg.seed_blocks_per_section)
+
+    def _seed_blocks_batched(self, client, cue_vectors, flt) -> Dict[str, List[str]]:
+        from qdrant_client.models import QueryRequest
+
+        cfg = self.config.retrieval
+        top_k = min(cfg.seed_top_k, cfg.top_k)
+        requests = [
+            QueryRequest(query=v.tolist(), filter=flt, limit=top_k, with_payload=["block_id", "section_id"])
+            for v in cue_vectors
+        ]
+        responses = client.query_batch_points(
+            collection_name=self.config.storage.qdrant_blocks,
+            requests=requests,
+        )
+        hits = [
+            ((p.payload or {}).get("block_id"), (p.payload or {}).get("section_id"), p.score or 0.0)
+            for res in responses
+            for p in res.points
+        ]
+        return _group_seed_hits(hits, cfg.seed_blocks_per_section)
+
+    def _seed_blocks_grouped(self, client, cue_vectors, flt) -> Dict[str, List[str]]:
+        from qdrant_client.models import Fusion, FusionQuery, Prefetch
+
+        # One prefetch per cue, fused with RRF and grouped by section server-side,
+        # so Qdrant returns the per-section top blocks directly.
+        cfg = self.config.retrieval
+        top_k = min(cfg.seed_top_k, cfg.top_k)
+        res = client.query_points_groups(
+            collection_name=self.config.storage.qdrant_blocks,
+            prefetch=[Prefetch(query=v.tolist(), filter=flt, limit=top_k) for v in cue_vectors],
+            query=FusionQuery(fusion=Fusion.RRF),
+            group_by="section_id",
+            group_size=cfg.seed_blocks_per_section,
+            limit=cfg.seed_max_sections,
+            query_filter=flt,
+            with_payload=["block_id"],
+        )
         out: Dict[str, List[str]] = {}
-        for section_id, block_scores in hits.items():
-            ordered = sorted(block_scores.items(), key=lambda kv: kv[1], reverse=True)
-            out[section_id] = [bid for bid, _ in ordered[:8]]
+        for group in res.groups:
+            block_ids: List[str] = []
+            for p in group.hits:
+                block_id = (p.payload or {}).get("block_id")
+                # chunked blocks have several points; keep the best-ranked one
+                if block_id and block_id not in block_ids:
+                    block_ids.append(block_id)
+            if block_ids:
+                out[str(group.id)] = block_ids
         return out
 
     def _fetch_blocks_by_ids(self, paper_id: str, block_ids: List[str]) -> List[Block]:
         if not block_ids:
             return []
-        cluster, session = AstraClientFactory().create()
         blocks: List[Block] = []
-        try:
+        with astra_session(self.clients) as session:
             for chunk in _chunk(block_ids, 50):
                 placeholders = ", ".join(["%s"] * len(chunk))
                 query = (
@@ -189,32 +293,27 @@ class SectionCandidateGenerator:
                 params = [paper_id] + list(chunk)
                 rows = session.execute(query, params)
                 for r in rows:
-                    blocks.append(
-                        Block(
-                            block_id=r.block_id,
-                            section_id=r.section_id,
-                            type=r.type,
-                            text=r.text,
-                            block_index=r.block_index,
-                        )
-                    )
-        finally:
-            cluster.shutdown()
+                    blocks.append(Block.from_row(r))
         return blocks
 
 
-def _ensure_list(data: object) -> list:
-    if isinstance(data, list):
-        return data
-    if isinstance(data, dict):
-        items = data.get("items")
-        if isinstance(items, list):
-            return items
-    return []
+def _group_seed_hits(hits, per_section: int) -> Dict[str, List[str]]:
+    scores: Dict[str, Dict[str, float]] = {}
+    for block_id, section_id, score in hits:
+        if not block_id or not section_id:
+            continue
+        scores.setdefault(section_id, {})
+        scores[section_id][block_id] = max(scores[section_id].get(block_id, 0.0), score)
+
+    out: Dict[str, List[str]] = {}
+    for section_id, block_scores in scores.items():
+        ordered = sorted(block_scores.items(), key=lambda kv: kv[1], reverse=True)
+        out[section_id] = [bid for bid, _ in ordered[:per_section]]
+    return out
 
 
-def _candidate_id(section_id: str, d: dict) -> str:
-    raw = f"{section_id}::{d.get('label')}::{d.get('summary')}"
+def _candidate_id(section_id: str, d: CandidateOut) -> str:
+    raw = f"{section_id}::{d.label}::{d.summary}"
     return "cand_" + hashlib.sha1(raw.encode("utf-8")).hexdigest()[:12]
 
 
@@ -228,9 +327,10 @@ def _section_context(blocks: List[Block], hit_block_ids: List[str]) -> List[Bloc
     hits = [b for b in blocks_sorted if b.block_id in hit_set]
     hits = hits[:6]
 
-    # add a couple of high-signal blocks as context
-    scored = sorted(blocks_sorted, key=_signal_score, reverse=True)
-    signal = [b for b in scored[:3] if _signal_score(b) > 0]
+    # add a couple of high-signal blocks as context (each block scored once)
+    scores = {b.block_id: _signal_score(b) for b in blocks_sorted}
+    scored = sorted(blocks_sorted, key=lambda b: scores[b.block_id], reverse=True)
+    signal = [b for b in scored[:3] if scores[b.block_id] > 0]
 
     out: List[Block] = []
     seen = set()
@@ -244,11 +344,10 @@ def _section_context(blocks: List[Block], hit_block_ids: List[str]) -> List[Bloc
 
 def _signal_score(b: Block) -> int:
     text = (b.text or "").lower()
-    score = 0
-    for cue in _SIGNAL_CUES:
-        if cue in text:
-            score += 1
-    score += len(re.findall(r"\b\d+(\.\d+)?\b", text)) // 5
+    # Per-cue `in` tests are C-level scans and beat one alternation regex over all cues
+    # in CPython (benchmarks/signal_score.py), so only the number pattern is a regex.
+    score = sum(1 for cue in _SIGNAL_CUES if cue in text)
+    score += len(_NUMBER_RE.findall(text)) // 5
     return score
 
 
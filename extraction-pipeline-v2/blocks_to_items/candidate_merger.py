@@ -1,10 +1,14 @@
 from __future__ import annotations
 
 import json
+import time
 from dataclasses import dataclass
-from typing import List
+from typing import Dict, List, Optional, Set, Tuple
 
-from .config import BlocksToItemsConfig
+import numpy as np
+
+from .config import BlocksToItemsConfig, MergeConfig
+from .embedder import Embedder
 from .llm_client import LLMClient
 from .models import Candidate
 from .prompts import merge_prompt
@@ -14,48 +18,31 @@ from .prompts import merge_prompt
 class CandidateMerger:
     llm: LLMClient
     config: BlocksToItemsConfig
+    embedder: Optional[Embedder] = None
 
     def merge(self, candidates: List[Candidate]) -> List[Candidate]:
         if not candidates:
             return []
-        return _deterministic_merge(candidates)
+        start = time.perf_counter()
+        total = len(candidates)
+        merged = _deterministic_merge(candidates)
+        exact = len(merged)
+        cfg = self.config.merge
+        if cfg.mode == "embedding" and self.embedder is not None and len(merged) > 1:
+            merged = _embedding_merge(merged, self.embedder, cfg)
+        # every surviving candidate costs one retrieval + one extraction call in stage B
+        saved = total - len(merged)
+        print(
+            f"[candidate_merger] mode={cfg.mode} candidates={total} exact={exact} merged={len(merged)} "
+            f"llm_calls_saved={saved} ({saved / total * 100:.0f}%) seconds={time.perf_counter() - start:.2f}"
+        )
+        return merged
 
     def _merge_batch(self, candidates: List[Candidate]) -> List[Candidate]:
         # LLM merge removed; kept for interface compatibility.
         return _deterministic_merge(candidates)
 
 
-def _ensure_list(data: object) -> list:
-    if isinstance(data, list):
-        return data
-    if isinstance(data, dict):
-        items = data.get("items")
-        if isinstance(items, list):
-            return items
-    return []
-
-
-def _to_candidates(items: list) -> List[Candidate]:
-    out: List[Candidate] = []
-    for d in items:
-        if not isinstance(d, dict):
-            continue
-        out.append(
-            Candidate(
-                candidate_id=d.get("candidate_id") or d.get("item_id") or "cand_unknown",
-                section_id=(d.get("section_id") if d.get("section_id") else None),
-                label=d.get("label"),
-                summary=d.get("summary"),
-                evidence_hints=d.get("evidence_hints") or [],
-                proposed_item_kind=d.get("proposed_item_kind"),
-                anchors=d.get("anchors") or [],
-                source_block_ids=d.get("source_block_ids") or [],
-                confidence=float(d.get("confidence") or 0.0),
-            )
-        )
-    return out
-
-
 def _deterministic_merge(candidates: List[Candidate]) -> List[Candidate]:
     seen = {}
     out: List[Candidate] = []
@@ -70,3 +57,78 @@ def _deterministic_merge(candidates: List[Candidate]) -> List[Candidate]:
         seen[key] = c
         out.append(c)
     return out
+
+
+def _embedding_merge(candidates: List[Candidate], embedder: Embedder, cfg: MergeConfig) -> List[Candidate]:
+    texts = [" ".join([str(c.label or ""), str(c.summary or "")]).strip() for c in candidates]
+    idx = [i for i, t in enumerate(texts) if t]
+    if len(idx) < 2:
+        return candidates
+    vectors = np.asarray(embedder.embed([texts[i] for i in idx]), dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = vectors / np.where(norms == 0, 1.0, norms)
+
+    kinds = [(candidates[i].proposed_item_kind or "").lower() for i in idx]
+    if len(idx) >= cfg.lsh_min_candidates:
+        pairs = _lsh_pairs(vectors, cfg)
+    else:
+        pairs = _dense_pairs(vectors, cfg.similarity_threshold)
+
+    parent = list(range(len(candidates)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for a, b in pairs:
+        if cfg.same_kind_only and kinds[a] != kinds[b]:
+            continue
+        ra, rb = find(idx[a]), find(idx[b])
+        if ra != rb:
+            parent[max(ra, rb)] = min(ra, rb)
+
+    clusters: Dict[int, List[Candidate]] = {}
+    for i, c in enumerate(candidates):
+        clusters.setdefault(find(i), []).append(c)
+    # clusters keep the position of their first member
+    return [_merge_cluster(members) for _, members in sorted(clusters.items())]
+
+
+def _dense_pairs(vectors: np.ndarray, threshold: float) -> List[Tuple[int, int]]:
+    sim = vectors @ vectors.T
+    a, b = np.nonzero(np.triu(sim >= threshold, k=1))
+    return list(zip(a.tolist(), b.tolist()))
+
+
+def _lsh_pairs(vectors: np.ndarray, cfg: MergeConfig) -> Set[Tuple[int, int]]:
+    # Random-hyperplane LSH: rows sharing a signature in any table are compared exactly.
+    rng = np.random.default_rng(0)
+    weights = 1 << np.arange(cfg.lsh_bits, dtype=np.int64)
+    pairs: Set[Tuple[int, int]] = set()
+    for _ in range(cfg.lsh_tables):
+        planes = rng.standard_normal((vectors.shape[1], cfg.lsh_bits)).astype(np.float32)
+        sigs = ((vectors @ planes) > 0).astype(np.int64) @ weights
+        order = np.argsort(sigs, kind="stable")
+        bounds = np.flatnonzero(np.diff(sigs[order])) + 1
+        for bucket in np.split(order, bounds):
+            if len(bucket) < 2:
+                continue
+            for a, b in _dense_pairs(vectors[bucket], cfg.similarity_threshold):
+                i, j = int(bucket[a]), int(bucket[b])
+                pairs.add((min(i, j), max(i, j)))
+    return pairs
+
+
+def _merge_cluster(members: List[Candidate]) -> Candidate:
+    if len(members) == 1:
+        return members[0]
+    # like the exact merge, the first member survives (its section scopes stage B retrieval);
+    # lists are unioned in order and the best confidence is kept
+    rep = members[0]
+    rep.confidence = max(c.confidence for c in members)
+    rep.anchors = list(dict.fromkeys(a for c in members for a in c.anchors))
+    rep.evidence_hints = list(dict.fromkeys(h for c in members for h in c.evidence_hints))
+    rep.source_block_ids = list(dict.fromkeys(b for c in members for b in c.source_block_ids))
+    return rep
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Iterator, Optional
+
+from storage.astra.client import AstraClientFactory
+from storage.qdrant.client import QdrantClientFactory
+
+if TYPE_CHECKING:
+    from qdrant_client import QdrantClient
+
+
+class SharedClients:
+    # One Astra session and one Qdrant client for every paper a BlocksToItems instance
+    # runs; both are thread-safe, created on first use and closed by BlocksToItems.close().
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._astra: Optional[tuple] = None
+        self._qdrant: Optional[QdrantClient] = None
+
+    def astra(self) -> Any:
+        with self._lock:
+            if self._astra is None:
+                self._astra = AstraClientFactory().create()
+            return self._astra[1]
+
+    def qdrant(self) -> QdrantClient:
+        with self._lock:
+            if self._qdrant is None:
+                self._qdrant = QdrantClientFactory().create()
+            return self._qdrant
+
+    def close(self) -> None:
+        with self._lock:
+            if self._astra is not None:
+                self._astra[0].shutdown()
+            if self._qdrant is not None:
+                self._qdrant.close()
+            self._astra = self._qdrant = None
+
+
+@contextmanager
+def astra_session(clients: Optional[SharedClients]) -> Iterator[Any]:
+    # Shared session when one is given, otherwise a connection for this call only.
+    if clients is not None:
+        yield clients.astra()
+        return
+    cluster, session = AstraClientFactory().create()
+    try:
+        yield session
+    finally:
+        cluster.shutdown()
+
+
+def qdrant_client(clients: Optional[SharedClients]) -> QdrantClient:
+    if clients is not None:
+        return clients.qdrant()
+    return QdrantClientFactory().create()
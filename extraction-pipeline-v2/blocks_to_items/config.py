@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
+from typing import Tuple
 
 
 @dataclass(frozen=True)
@@ -10,9 +11,25 @@ class OpenAIConfig:
     base_url_default: str = "https://api.openai.com/v1"
     model_candidates: str = "hosted_vllm/Llama-3.1-70B-Instruct"
     model_extract: str = "hosted_vllm/Llama-3.1-70B-Instruct"
+    max_concurrent_requests: int = 4
+    # process-wide cap on in-flight completions, shared by every paper and stage
+    max_inflight_requests: int = 12
+    json_mode: bool = True
     timeout_sec: int = None
 
 
+@dataclass(frozen=True)
+class PromptBudgetConfig:
+    # Stage A section prompts: BLOCKS_JSON is cut to fit max_prompt_tokens (per-model overrides
+    # as (model, tokens) pairs); each block gets at most block_max_tokens of text.
+    max_prompt_tokens: int = 6000
+    model_max_prompt_tokens: Tuple[Tuple[str, int], ...] = ()
+    block_max_tokens: int = 700
+    block_min_tokens: int = 48
+    tokenizer_encoding: str = "cl100k_base"
+    chars_per_token: float = 3.5
+
+
 @dataclass(frozen=True)
 class EmbeddingConfig:
     api_key_env: str = "OPENROUTER_API_KEY"
@@ -20,12 +37,55 @@ class EmbeddingConfig:
     base_url_default: str = "https://openrouter.ai/api/v1"
     model: str = "baai/bge-m3"
     batch_size: int = 16
+    encoding_format: str = "base64"
     timeout_sec: int = None
 
 
 @dataclass(frozen=True)
 class RetrievalConfig:
     top_k: int = 12
+    seed_top_k: int = 6
+    seed_blocks_per_section: int = 8
+    seed_group_by_section: bool = False
+    seed_max_sections: int = 24
+    local_index: bool = True
+    lexical: bool = True
+    lexical_max_terms: int = 4
+    rrf_k: int = 60
+    bm25_k1: float = 1.5
+    bm25_b: float = 0.75
+    cue_cache_dir_env: str = "CUE_CACHE_DIR"
+    cue_cache_dir_default: str = ".cache/blocks_to_items"
+
+
+@dataclass(frozen=True)
+class MergeConfig:
+    # "exact": label+kind match only; "embedding" (opt-in): also cluster near-duplicates by cosine.
+    mode: str = "exact"
+    similarity_threshold: float = 0.88
+    same_kind_only: bool = True
+    # above this many candidates, pairs come from random-hyperplane LSH buckets instead of the full matrix
+    lsh_min_candidates: int = 2000
+    lsh_bits: int = 12
+    lsh_tables: int = 6
+
+
+@dataclass(frozen=True)
+class ExtractionConfig:
+    # Stage B: retrieval -> LLM extraction -> postprocess -> batched writes, each with its own worker pool.
+    enabled: bool = True
+    retrieval_batch_size: int = 16
+    max_concurrent_retrievals: int = 2
+    max_concurrent_extractions: int = 8
+    max_concurrent_postprocess: int = 2
+    queue_size: int = 32
+    write_batch_size: int = 32
+
+
+@dataclass(frozen=True)
+class BatchRunConfig:
+    # run_many: papers processed at once; while some are loading/writing, others keep the LLM slots busy.
+    max_papers_in_flight: int = 3
 
 
 @dataclass(frozen=True)
@@ -35,11 +95,28 @@ class StorageConfig:
     astra_sections: str = "sections"
     qdrant_blocks: str = "blocks"
     qdrant_items: str = "items"
+    qdrant_upsert_batch_size: int = 64
+    qdrant_upsert_parallel: int = 4
+    qdrant_upsert_wait: bool = False
+    qdrant_upsert_max_retries: int = 3
+
+
+@dataclass(frozen=True)
+class LLMCacheConfig:
+    mode: str = "off"
+    dir_env: str = "LLM_CACHE_DIR"
+    dir_default: str = ".cache/llm"
+    max_bytes: int = 512 * 1024 * 1024
 
 
 @dataclass(frozen=True)
 class BlocksToItemsConfig:
     openai: OpenAIConfig = field(default_factory=OpenAIConfig)
     embedding: EmbeddingConfig = field(default_factory=EmbeddingConfig)
+    prompt_budget: PromptBudgetConfig = field(default_factory=PromptBudgetConfig)
     retrieval: RetrievalConfig = field(default_factory=RetrievalConfig)
+    merge: MergeConfig = field(default_factory=MergeConfig)
+    extraction: ExtractionConfig = field(default_factory=ExtractionConfig)
     storage: StorageConfig = field(default_factory=StorageConfig)
+    llm_cache: LLMCacheConfig = field(default_factory=LLMCacheConfig)
+    batch: BatchRunConfig = field(default_factory=BatchRunConfig)
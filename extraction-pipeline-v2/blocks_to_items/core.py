@@ -1,17 +1,26 @@
 from __future__ import annotations
 
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
-from typing import Dict, List
+from typing import Dict, Iterable, List
 from uuid import uuid4
 
 from .candidate_generator import SectionCandidateGenerator
 from .candidate_merger import CandidateMerger
+from .clients import SharedClients, qdrant_client
 from .config import BlocksToItemsConfig
 from .document_store import AstraDocumentStore
 from .embedder import Embedder
+from .extractor import ItemExtractorLLM
+from .llm_cache import LLMResponseCache
 from .llm_client import LLMClient
 from .models import Candidate
+from .pipeline import ExtractionPipeline
+from .postprocess import ItemPostProcessor
+from .retrieval import HybridEvidenceRetriever
 from .storage import ItemsStorage
+from .vector_index import PaperVectorIndex
 
 
 @dataclass
@@ -19,19 +28,71 @@ class BlocksToItems:
     config: BlocksToItemsConfig = BlocksToItemsConfig()
 
     def __post_init__(self) -> None:
-        self.doc_store = AstraDocumentStore(self.config.storage)
-        self.llm = LLMClient(self.config.openai)
-        self.cand_gen = SectionCandidateGenerator(self.llm, self.config, Embedder(self.config.embedding))
-        self.cand_merge = CandidateMerger(self.llm, self.config)
-        self.store = ItemsStorage(self.config)
+        # Clients, cue vectors and the LLM concurrency budget live on the instance and are
+        # shared by every paper it runs (run_many runs several at once).
+        self.clients = SharedClients()
+        self.doc_store = AstraDocumentStore(self.config.storage, self.clients)
+        cache = None
+        if self.config.llm_cache.mode != "off":
+            cache = LLMResponseCache(self.config.llm_cache)
+        self.llm = LLMClient(self.config.openai, cache=cache)
+        embedder = Embedder(self.config.embedding)
+        self.cand_gen = SectionCandidateGenerator(self.llm, self.config, embedder, self.clients)
+        self.cand_merge = CandidateMerger(self.llm, self.config, embedder)
+        self.store = ItemsStorage(self.config, self.clients)
+        self.stage_b = ExtractionPipeline(
+            self.config,
+            HybridEvidenceRetriever(self.config, embedder, self.clients),
+            ItemExtractorLLM(self.llm, self.config),
+            ItemPostProcessor(),
+            self.store,
+        )
 
     def run(self, paper_id: str) -> Dict[str, object]:
+        try:
+            return self._run(paper_id)
+        finally:
+            self.stage_b.retriever.forget(paper_id)
+
+    def run_many(self, paper_ids: Iterable[str]) -> Dict[str, Dict[str, object]]:
+        # Up to max_papers_in_flight papers at once over the shared clients; LLM calls from all
+        # of them draw on one OpenAIConfig.max_inflight_requests budget, so papers in their
+        # load/write phases leave the slots to the others. A failed paper does not stop the rest.
+        paper_ids = list(dict.fromkeys(paper_ids))
+        start = time.perf_counter()
+        workers = max(1, min(self.config.batch.max_papers_in_flight, len(paper_ids) or 1))
+        results: Dict[str, Dict[str, object]] = {}
+        failed = 0
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="paper") as pool:
+            futures = {pool.submit(self.run, pid): pid for pid in paper_ids}
+            for fut in as_completed(futures):
+                pid = futures[fut]
+                try:
+                    results[pid] = fut.result()
+                except Exception as exc:
+                    failed += 1
+                    print(f"[blocks_to_items] failed paper_id={pid} error={exc!r}")
+                    results[pid] = {"paper_id": pid, "error": repr(exc)}
+                print(f"[blocks_to_items] progress {len(results)}/{len(paper_ids)}")
+        print(
+            f"[blocks_to_items] run_many papers={len(paper_ids)} ok={len(paper_ids) - failed} failed={failed} "
+            f"in_flight={workers} seconds={time.perf_counter() - start:.2f}"
+        )
+        return {pid: results[pid] for pid in paper_ids}
+
+    def close(self) -> None:
+        self.clients.close()
+
+    def _run(self, paper_id: str) -> Dict[str, object]:
         print(f"[blocks_to_items] start paper_id={paper_id}")
         sections = self.doc_store.load_sections(paper_id)
         print(f"[blocks_to_items] sections={len(sections)}")
         
+        index = self._load_index(paper_id)
+        block_store = self.doc_store.load_block_store(paper_id)
+
         print("[blocks_to_items] stage A: candidates per section")
-        candidates = self.cand_gen.generate(paper_id, sections)
+        candidates = self.cand_gen.generate(paper_id, sections, index=index, block_store=block_store)
         print(f"[blocks_to_items] candidates={len(candidates)}")
         if candidates:
             print("[blocks_to_items] stage A: merge")
@@ -39,16 +100,37 @@ class BlocksToItems:
             print(f"[blocks_to_items] merged_candidates={len(candidates)}")
         
         items: List[Dict[str, object]] = []
-        for idx, cand in enumerate(candidates, start=1):
-            cid = cand.candidate_id
-            print(f"[blocks_to_items] candidate {idx}/{len(candidates)}: {cid}")
-            items.append(_candidate_to_item(cand))
+        if self.config.extraction.enabled:
+            print("[blocks_to_items] stage B: retrieve + extract + postprocess")
+            items = self.stage_b.run(paper_id, iter(candidates), index=index, block_store=block_store)
+        else:
+            for idx, cand in enumerate(candidates, start=1):
+                cid = cand.candidate_id
+                print(f"[blocks_to_items] candidate {idx}/{len(candidates)}: {cid}")
+                items.append(_candidate_to_item(cand))
+            self.store.store(paper_id, items)
 
         print(f"[blocks_to_items] items={len(items)}")
-        self.store.store(paper_id, items)
         print("[blocks_to_items] stored items")
+        # The LLM client (and its cache) is shared by every paper in flight under run_many,
+        # so these counters are process totals, not this paper's calls.
+        stats = self.llm.snapshot()
+        print(
+            f"[blocks_to_items] llm_json scope=process calls={stats['calls']} direct={stats['direct']} "
+            f"salvaged={stats['salvaged']} retries={stats['retries']} failed={stats['failed']} "
+            f"retry_rate={self.llm.retry_rate():.2f}"
+        )
+        if self.llm.cache is not None:
+            print(f"[blocks_to_items] llm_cache scope=process hits={self.llm.cache.hits} misses={self.llm.cache.misses}")
         return {"paper_id": paper_id, "items": items}
 
+    def _load_index(self, paper_id: str) -> PaperVectorIndex | None:
+        # One scroll of the paper's block vectors; seed and evidence queries then run locally.
+        if not self.config.retrieval.local_index:
+            return None
+        client = qdrant_client(self.clients)
+        return PaperVectorIndex.load(client, self.config.storage.qdrant_blocks, paper_id)
+
 
 def _candidate_to_item(cand: Candidate) -> Dict[str, object]:
     item_id = str(uuid4())
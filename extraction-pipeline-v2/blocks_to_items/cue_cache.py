@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from .config import RetrievalConfig
+from .embedder import Embedder
+
+
+@dataclass
+class CueVectorCache:
+    embedder: Embedder
+    config: RetrievalConfig = RetrievalConfig()
+    _memo: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    def path(self, cues: Sequence[str]) -> Path:
+        root = Path(os.getenv(self.config.cue_cache_dir_env) or self.config.cue_cache_dir_default)
+        model = self.embedder.config.model
+        slug = re.sub(r"[^A-Za-z0-9._-]+", "_", model)
+        return root / f"cues_{slug}_{_cues_key(model, cues)}.npy"
+
+    def load(self, cues: Sequence[str]) -> Optional[np.ndarray]:
+        path = self.path(cues)
+        key = str(path)
+        if key in self._memo:
+            return self._memo[key]
+        if not path.exists():
+            return None
+        try:
+            vectors = np.load(path, allow_pickle=False)
+        except (OSError, ValueError):
+            return None
+        if vectors.ndim != 2 or vectors.shape[0] != len(cues):
+            return None
+        self._memo[key] = vectors
+        print(f"[cue_cache] loaded cues={len(cues)} path={path}")
+        return vectors
+
+    def vectors(self, cues: Sequence[str]) -> np.ndarray:
+        cached = self.load(cues)
+        if cached is not None:
+            return cached
+        # One embed() call for the whole list (a single request at the default batch size).
+        vectors = np.ascontiguousarray(self.embedder.embed(list(cues)), dtype=np.float32)
+        path = self.path(cues)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npy")
+            np.save(tmp, vectors, allow_pickle=False)
+            os.replace(tmp, path)
+            print(f"[cue_cache] stored cues={len(cues)} path={path}")
+        except OSError as exc:
+            print(f"[cue_cache] store failed path={path} error={exc}")
+        self._memo[str(path)] = vectors
+        return vectors
+
+
+def _cues_key(model: str, cues: Sequence[str]) -> str:
+    raw = json.dumps({"model": model, "cues": list(cues)}, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
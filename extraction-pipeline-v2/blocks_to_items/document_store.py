@@ -1,36 +1,81 @@
 from __future__ import annotations
 
+import threading
+import time
 from dataclasses import dataclass
-from typing import List
-
-from storage.astra.client import AstraClientFactory
+from typing import Any, List, Optional
 
+from .block_store import PaperBlockStore
+from .clients import SharedClients, astra_session
 from .config import StorageConfig
-from .models import Block, Section
+from .models import Block, Section, intern_id
 
 
 @dataclass
 class AstraDocumentStore:
     config: StorageConfig
+    clients: Optional[SharedClients] = None
 
     def load_sections(self, paper_id: str) -> List[Section]:
-        cluster, session = AstraClientFactory().create()
-        try:
+        with astra_session(self.clients) as session:
             rows = session.execute(
                 f"SELECT section_id, section_title, summary FROM {self.config.astra_sections} WHERE paper_id = %s",
                 (paper_id,),
             )
-            return [Section(r.section_id, r.section_title, r.summary) for r in rows]
-        finally:
-            cluster.shutdown()
+            return [Section(intern_id(r.section_id), r.section_title, r.summary) for r in rows]
 
     def load_blocks(self, paper_id: str) -> List[Block]:
-        cluster, session = AstraClientFactory().create()
-        try:
+        with astra_session(self.clients) as session:
             rows = session.execute(
                 f"SELECT block_id, section_id, type, text, block_index FROM {self.config.astra_blocks} WHERE paper_id = %s",
                 (paper_id,),
             )
-            return [Block(r.block_id, r.section_id, r.type, r.text, r.block_index) for r in rows]
-        finally:
-            cluster.shutdown()
+            return [Block.from_row(r) for r in rows]
+
+    def load_block_store(self, paper_id: str, *, fetch_size: int = 500) -> PaperBlockStore:
+        from cassandra.query import SimpleStatement
+
+        start = time.perf_counter()
+        with astra_session(self.clients) as session:
+            stmt = SimpleStatement(
+                f"SELECT block_id, section_id, type, text, block_index FROM {self.config.astra_blocks} WHERE paper_id = %s",
+                fetch_size=fetch_size,
+            )
+            rows = _PagedBlockReader(session.execute_async(stmt, (paper_id,))).wait()
+        store = PaperBlockStore.from_rows(paper_id, rows)
+        print(
+            f"[document_store] paper_id={paper_id} blocks={len(store)} sections={store.section_count} "
+            f"seconds={time.perf_counter() - start:.2f}"
+        )
+        return store
+
+
+class _PagedBlockReader:
+    # Driver paging callbacks: the next page is requested before the current one
+    # is collected, so the partition read overlaps with handling the rows.
+    def __init__(self, future) -> None:
+        self.future = future
+        self.rows: List[Any] = []
+        self.error: BaseException | None = None
+        self.done = threading.Event()
+        self._lock = threading.Lock()
+        future.add_callbacks(callback=self._on_page, errback=self._on_error)
+
+    def _on_page(self, rows) -> None:
+        more = self.future.has_more_pages
+        if more:
+            self.future.start_fetching_next_page()
+        with self._lock:
+            self.rows.extend(rows)
+        if not more:
+            self.done.set()
+
+    def _on_error(self, exc: BaseException) -> None:
+        self.error = exc
+        self.done.set()
+
+    def wait(self) -> List[Any]:
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.rows
@@ -1,12 +1,13 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 
 from .config import BlocksToItemsConfig
 from .llm_client import LLMClient
 from .models import Candidate, EvidenceBlock
 from .prompts import extraction_prompt
+from .schemas import ExtractedItem
 
 
 @dataclass
@@ -14,24 +15,74 @@ class ItemExtractorLLM:
     llm: LLMClient
     config: BlocksToItemsConfig
 
-    def extract(self, candidate: Candidate, evidence: list[EvidenceBlock]) -> Optional[dict]:
-        evidence_text = "\n".join([e.text or "" for e in evidence if e.text])
+    def extract(self, candidate: Candidate, evidence: list[EvidenceBlock]) -> Optional[ExtractedItem]:
+        # Block/section ids are UUIDs; the prompt speaks in short b_N / s_N aliases that
+        # are mapped back to real ids on the way out (unknown aliases are dropped).
+        evidence_text, block_ids, section_ids = _evidence_with_aliases(evidence)
+        if not evidence_text:
+            return None
         payload = {
             "candidate_id": candidate.candidate_id,
             "item_kind": candidate.proposed_item_kind,
             "label": candidate.label,
             "summary": candidate.summary,
             "anchors": candidate.anchors,
-            "predicted_source_sections": [candidate.section_id] if candidate.section_id else [],
         }
         prompt = extraction_prompt(payload, evidence_text)
-        data = self.llm.chat_json(
+        item = self.llm.chat_typed(
             model=self.config.openai.model_extract,
             messages=[{"role": "user", "content": prompt}],
+            type_=ExtractedItem,
             temperature=0.2,
         )
-        if not isinstance(data, dict):
-            return None
-        if data.get("drop") is True:
+        if item is None or item.drop:
             return None
-        return data
+        _resolve_aliases(item, block_ids, section_ids)
+        grounding = item.grounding
+        if not grounding.source_section_ids:
+            block_section = {ev.block_id: ev.section_id for ev in evidence}
+            used = [block_section.get(b) for b in grounding.evidence_block_ids]
+            grounding.source_section_ids = list(dict.fromkeys(s for s in used if s))
+        item.candidate_id = candidate.candidate_id
+        return item
+
+
+def _evidence_with_aliases(evidence: List[EvidenceBlock]) -> Tuple[str, Dict[str, str], Dict[str, str]]:
+    block_ids: Dict[str, str] = {}
+    section_ids: Dict[str, str] = {}
+    section_alias: Dict[str, str] = {}
+    parts: List[str] = []
+    for ev in evidence:
+        if not ev.text:
+            continue
+        b_alias = f"b_{len(block_ids) + 1}"
+        block_ids[b_alias] = ev.block_id
+        header = f"[{b_alias}"
+        if ev.section_id:
+            s_alias = section_alias.get(ev.section_id)
+            if s_alias is None:
+                s_alias = f"s_{len(section_ids) + 1}"
+                section_alias[ev.section_id] = s_alias
+                section_ids[s_alias] = ev.section_id
+            header += f" {s_alias}"
+        if ev.type:
+            header += f" {ev.type}"
+        parts.append(f"{header}]\n{ev.text}")
+    return "\n\n".join(parts), block_ids, section_ids
+
+
+def _resolve_aliases(item: ExtractedItem, block_ids: Dict[str, str], section_ids: Dict[str, str]) -> None:
+    for f in item.fields():
+        if f.evidence:
+            f.evidence = _map_ids(f.evidence, block_ids)
+    item.grounding.evidence_block_ids = _map_ids(item.grounding.evidence_block_ids, block_ids)
+    item.grounding.source_section_ids = _map_ids(item.grounding.source_section_ids, section_ids)
+
+
+def _map_ids(values: List[str], aliases: Dict[str, str]) -> List[str]:
+    out: List[str] = []
+    for v in values:
+        real = aliases.get(v.strip())
+        if real and real not in out:
+            out.append(real)
+    return out
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .block_store import PaperBlockStore
+from .models import Block
+from .vector_index import VectorHit
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[.-][a-z0-9]+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    # "S-trap" stays one token; "p < 0.05" keeps "0.05"
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+@dataclass
+class PaperBM25Index:
+    block_ids: List[str]
+    section_ids: List[Optional[str]]
+    types: List[Optional[str]]
+    doc_lens: List[int]
+    postings: Dict[str, List[Tuple[int, int]]]
+    k1: float = 1.5
+    b: float = 0.75
+    _idf: Dict[str, float] = field(default_factory=dict)
+
+    @classmethod
+    def from_blocks(cls, blocks: Iterable[Block], *, k1: float = 1.5, b: float = 0.75) -> "PaperBM25Index":
+        rows = [(blk.block_id, blk.section_id, blk.type, blk.text) for blk in blocks]
+        return cls._build(rows, k1=k1, b=b)
+
+    @classmethod
+    def from_store(cls, store: PaperBlockStore, *, k1: float = 1.5, b: float = 0.75) -> "PaperBM25Index":
+        # straight from the store's columns, no Block objects
+        return cls._build(zip(store.block_ids, store.section_ids, store.types, store.texts), k1=k1, b=b)
+
+    @classmethod
+    def _build(
+        cls, rows: Iterable[Tuple[str, Optional[str], Optional[str], Optional[str]]], *, k1: float, b: float
+    ) -> "PaperBM25Index":
+        block_ids: List[str] = []
+        section_ids: List[Optional[str]] = []
+        types: List[Optional[str]] = []
+        doc_lens: List[int] = []
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        for block_id, section_id, kind, text in rows:
+            terms = tokenize(text)
+            if not terms:
+                continue
+            doc = len(block_ids)
+            block_ids.append(block_id)
+            section_ids.append(section_id)
+            types.append(kind)
+            doc_lens.append(len(terms))
+            for term, tf in Counter(terms).items():
+                postings.setdefault(term, []).append((doc, tf))
+        n = len(block_ids)
+        idf = {t: math.log(1.0 + (n - len(p) + 0.5) / (len(p) + 0.5)) for t, p in postings.items()}
+        return cls(block_ids, section_ids, types, doc_lens, postings, k1, b, idf)
+
+    def __len__(self) -> int:
+        return len(self.block_ids)
+
+    def search(self, query: str, *, limit: int, section_id: str | None = None) -> List[VectorHit]:
+        if not self.block_ids or limit <= 0:
+            return []
+        avgdl = sum(self.doc_lens) / len(self.doc_lens)
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            idf = self._idf.get(term)
+            if idf is None:
+                continue
+            for doc, tf in self.postings[term]:
+                if section_id is not None and self.section_ids[doc] != section_id:
+                    continue
+                norm = tf + self.k1 * (1 - self.b + self.b * self.doc_lens[doc] / avgdl)
+                scores[doc] = scores.get(doc, 0.0) + idf * tf * (self.k1 + 1) / norm
+        ranked = sorted(scores.items(), key=lambda kv: (-kv[1], kv[0]))[:limit]
+        return [VectorHit(self.block_ids[d], self.section_ids[d], self.types[d], s) for d, s in ranked]
+
+
+def rrf_fuse(ranked_lists: Iterable[List[VectorHit]], k: int = 60) -> List[VectorHit]:
+    # Reciprocal rank fusion; the returned hit carries the fused score.
+    fused: Dict[str, float] = {}
+    first: Dict[str, VectorHit] = {}
+    for hits in ranked_lists:
+        for rank, h in enumerate(hits):
+            if not h.block_id:
+                continue
+            fused[h.block_id] = fused.get(h.block_id, 0.0) + 1.0 / (k + rank + 1)
+            first.setdefault(h.block_id, h)
+    order = sorted(fused, key=lambda bid: -fused[bid])
+    return [VectorHit(bid, first[bid].section_id, first[bid].type, fused[bid]) for bid in order]
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from .config import LLMCacheConfig
+from .prompts import PROMPT_VERSION
+
+CACHE_MODES = ("off", "rw", "replay")
+
+
+class LLMCacheMiss(LookupError):
+    pass
+
+
+@dataclass
+class LLMResponseCache:
+    # Raw completion text per (model, messages, temperature, PROMPT_VERSION), one JSON file each.
+    # "rw" reads and writes; "replay" only reads and raises LLMCacheMiss instead of calling the model.
+    config: LLMCacheConfig = LLMCacheConfig()
+
+    def __post_init__(self) -> None:
+        if self.config.mode not in CACHE_MODES:
+            raise ValueError(f"unknown llm cache mode: {self.config.mode}")
+        self.root = Path(os.getenv(self.config.dir_env) or self.config.dir_default)
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def replay(self) -> bool:
+        return self.config.mode == "replay"
+
+    def key(
+        self, model: str, messages: list[dict], temperature: float, response_format: Optional[dict] = None
+    ) -> str:
+        parts = {"v": PROMPT_VERSION, "model": model, "messages": messages, "temperature": temperature}
+        if response_format is not None:
+            parts["response_format"] = response_format
+        raw = json.dumps(parts, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        try:
+            os.utime(path)  # eviction drops least recently used first
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return data.get("content")
+
+    def put(self, key: str, content: str, model: str) -> None:
+        if self.replay:
+            return
+        path = self._path(key)
+        body = json.dumps({"model": model, "prompt_version": PROMPT_VERSION, "content": content}, ensure_ascii=False)
+        try:
+            replaced = path.stat().st_size  # overwriting a key: its old bytes leave the total
+        except OSError:
+            replaced = 0
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_text(body, encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError as exc:
+            print(f"[llm_cache] write failed path={path} error={exc}")
+            return
+        with self._lock:
+            if self._size is None:
+                self._current_size()  # first scan already sees the file just written
+            else:
+                self._size += len(body.encode("utf-8")) - replaced
+            if self._size > self.config.max_bytes:
+                self._evict()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def _current_size(self) -> int:
+        if self._size is None:
+            self._size = sum(p.stat().st_size for p in self.root.glob("*/*.json"))
+        return self._size
+
+    def _evict(self) -> None:
+        # Oldest (by last hit/write) first until the cache is back under 90% of max_bytes.
+        target = int(self.config.max_bytes * 0.9)
+        entries = []
+        for p in self.root.glob("*/*.json"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+        entries.sort()
+        size = sum(e[1] for e in entries)
+        removed = 0
+        for _, nbytes, p in entries:
+            if size <= target:
+                break
+            try:
+                p.unlink()
+            except OSError:
+                continue
+            size -= nbytes
+            removed += 1
+        self._size = size
+        print(f"[llm_cache] evicted entries={removed} bytes={size}")
@@ -1,48 +1,144 @@
 from __future__ import annotations
 
 import json
-from dataclasses import dataclass
-from typing import Any
-
-from openai import OpenAI
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Type
 
+from . import schemas
 from .config import OpenAIConfig
+from .llm_cache import LLMCacheMiss, LLMResponseCache
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+
+_FENCE_RE = re.compile(r"```(?:json|JSON)?\s*(.*?)```", re.DOTALL)
+_JSON_OBJECT = {"type": "json_object"}
+_WRAP_LIST_MSG = 'Respond with a JSON object of the form {"items": [...]} holding the requested array.'
 
 
 @dataclass
 class LLMClient:
     config: OpenAIConfig
+    cache: Optional[LLMResponseCache] = None
+    stats: Dict[str, int] = field(
+        default_factory=lambda: {"calls": 0, "direct": 0, "salvaged": 0, "retries": 0, "failed": 0}
+    )
+
+    def __post_init__(self) -> None:
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max(1, self.config.max_inflight_requests))
+        # flipped off the first time the endpoint rejects response_format
+        self._json_mode = self.config.json_mode
 
     def _client(self) -> OpenAI:
         import os
 
+        from openai import OpenAI
+
         api_key = os.getenv(self.config.api_key_env)
         if not api_key:
             raise ValueError(f"Missing {self.config.api_key_env}")
         base_url = os.getenv(self.config.base_url_env) or self.config.base_url_default
         return OpenAI(api_key=api_key, base_url=base_url, timeout=self.config.timeout_sec)
 
-    def chat_json(self, model: str, messages: list[dict], temperature: float = 0.2) -> Any:
-        client = self._client()
-        resp = client.chat.completions.create(
-            model=model,
-            messages=messages,
-            temperature=temperature,
+    def chat_typed(
+        self, model: str, messages: list[dict], type_: Type[Any], temperature: float = 0.2, *, many: bool = False
+    ) -> Any:
+        # Decoded and validated into `type_` (a schemas struct) straight from the completion
+        # text; only malformed JSON goes through salvage + convert.
+        return self._chat(
+            model,
+            messages,
+            temperature,
+            many,
+            lambda raw: schemas.decode(raw, type_, many=many),
+            lambda raw: schemas.convert(_salvage_json(raw), type_, many=many),
         )
+
+    def _chat(
+        self,
+        model: str,
+        messages: list[dict],
+        temperature: float,
+        many: bool,
+        parse: Callable[[str], Any],
+        salvage: Callable[[str], Any],
+    ) -> Any:
+        # JSON mode only allows objects, so list answers are requested as {"items": [...]} and unwrapped.
+        if self._json_mode and many:
+            messages = messages + [{"role": "system", "content": _WRAP_LIST_MSG}]
+        raw = self._complete(model, messages, temperature)
+        data = parse(raw)
+        outcome = "direct"
+        if data is None:
+            data = salvage(raw)
+            outcome = "salvaged"
+        if data is None:
+            # one retry with explicit instruction
+            retry_msgs = messages + [
+                {"role": "system", "content": "Return STRICT JSON only. No markdown. No prose."}
+            ]
+            raw = self._complete(model, retry_msgs, 0.0)
+            data = parse(raw)
+            if data is None:
+                data = salvage(raw)
+            outcome = "retries" if data is not None else "failed"
+        self._count(outcome)
+        return data
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.stats)
+
+    def retry_rate(self) -> float:
+        with self._lock:
+            calls = self.stats["calls"]
+            return (self.stats["retries"] + self.stats["failed"]) / calls if calls else 0.0
+
+    def _count(self, outcome: str) -> None:
+        with self._lock:
+            self.stats["calls"] += 1
+            self.stats[outcome] += 1
+
+    def _complete(self, model: str, messages: list[dict], temperature: float) -> str:
+        response_format = _JSON_OBJECT if self._json_mode else None
+        key = None
+        if self.cache is not None:
+            key = self.cache.key(model, messages, temperature, response_format)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+            if self.cache.replay:
+                raise LLMCacheMiss(f"no cached response for model={model} key={key[:12]} (replay mode)")
+        client = self._client()
+        kwargs: Dict[str, Any] = {"model": model, "messages": messages, "temperature": temperature}
+        # cache hits above never take a slot; only real completions count against the budget
+        with self._slots:
+            if response_format is not None:
+                try:
+                    resp = client.chat.completions.create(response_format=response_format, **kwargs)
+                except Exception as exc:
+                    if not _is_response_format_error(exc):
+                        raise
+                    print(f"[llm_client] response_format unsupported model={model}, falling back: {exc}")
+                    self._json_mode = False
+                    resp = client.chat.completions.create(**kwargs)
+                    if key is not None:
+                        key = self.cache.key(model, messages, temperature)
+            else:
+                resp = client.chat.completions.create(**kwargs)
         raw = resp.choices[0].message.content or ""
-        data = _safe_json(raw)
-        if data is not None:
-            return data
-        # one retry with explicit instruction
-        retry_msgs = messages + [
-            {"role": "system", "content": "Return STRICT JSON only. No markdown. No prose."}
-        ]
-        resp = client.chat.completions.create(
-            model=model,
-            messages=retry_msgs,
-            temperature=0.0,
-        )
-        return _safe_json(resp.choices[0].message.content or "")
+        if key is not None:
+            self.cache.put(key, raw, model)
+        return raw
+
+
+def _is_response_format_error(exc: Exception) -> bool:
+    status = getattr(exc, "status_code", None)
+    text = str(exc).lower()
+    return status in (400, 422) and ("response_format" in text or "json_object" in text or "json mode" in text)
 
 
 def _safe_json(text: str) -> Any:
@@ -50,3 +146,62 @@ def _safe_json(text: str) -> Any:
         return json.loads(text)
     except Exception:
         return None
+
+
+def _salvage_json(text: str) -> Any:
+    # Local recovery before paying for a retry: fenced blocks, prose around the
+    # JSON, and arrays cut off mid-element (kept up to the last complete one).
+    if not text:
+        return None
+    for block in _FENCE_RE.findall(text):
+        data = _safe_json(block.strip())
+        if data is not None:
+            return data
+    decoder = json.JSONDecoder()
+    starts = [m.start() for m in re.finditer(r"[\[{]", text)][:20]
+    if not starts:
+        return None
+    # the outermost bracket first (complete, then truncated); later ones only for
+    # stray brackets in leading prose
+    try:
+        return decoder.raw_decode(text, starts[0])[0]
+    except ValueError:
+        pass
+    data = _close_truncated(text[starts[0]:])
+    if data is not None:
+        return data
+    for i in starts[1:]:
+        try:
+            return decoder.raw_decode(text, i)[0]
+        except ValueError:
+            continue
+    return None
+
+
+def _close_truncated(text: str) -> Any:
+    stack: list[str] = []
+    in_str = escape = False
+    cut: Optional[tuple[int, list[str]]] = None
+    for i, ch in enumerate(text):
+        if in_str:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_str = False
+            continue
+        if ch == '"':
+            in_str = True
+        elif ch in "[{":
+            stack.append("]" if ch == "[" else "}")
+        elif ch in "]}":
+            if not stack:
+                break
+            stack.pop()
+            if stack and stack[-1] == "]":
+                cut = (i + 1, list(stack))
+    if cut is None:
+        return None
+    end, open_brackets = cut
+    return _safe_json(text[:end] + "".join(reversed(open_brackets)))
@@ -1,10 +1,19 @@
 from __future__ import annotations
 
+import sys
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Any, List, Optional
 
+# Slotted models: thousands of blocks per paper (more with run_many) are held at once,
+# and a per-instance __dict__ costs more than the fields. Ids and block types are
+# interned, so every copy of the same id (store, indexes, evidence) is one string.
 
-@dataclass
+
+def intern_id(value: Any) -> Any:
+    return sys.intern(value) if type(value) is str else value
+
+
+@dataclass(frozen=True, slots=True)
 class Block:
     block_id: str
     section_id: str
@@ -12,16 +21,21 @@ class Block:
     text: str
     block_index: int
 
+    @classmethod
+    def from_row(cls, r: Any) -> "Block":
+        return cls(intern_id(r.block_id), intern_id(r.section_id), intern_id(r.type), r.text, r.block_index)
+
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Section:
     section_id: str
     title: str
     summary: Optional[str]
 
 
-@dataclass
+@dataclass(slots=True)
 class Candidate:
+    # not frozen: the merger folds duplicates into the surviving candidate
     candidate_id: str
     section_id: Optional[str]
     label: Optional[str]
@@ -33,7 +47,7 @@ class Candidate:
     confidence: float
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class EvidenceBlock:
     block_id: str
     section_id: Optional[str]
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .block_store import PaperBlockStore
+from .config import BlocksToItemsConfig
+from .extractor import ItemExtractorLLM
+from .models import Candidate
+from .postprocess import ItemPostProcessor
+from .retrieval import HybridEvidenceRetriever
+from .storage import ItemsStorage
+from .vector_index import PaperVectorIndex
+
+_DONE = object()
+_POLL_SEC = 0.2
+
+
+@dataclass
+class ExtractionPipeline:
+    # Stage B as producer/consumer: candidate batches -> evidence retrieval -> LLM extraction
+    # -> postprocess -> batched writes. Stages are linked by bounded queues and each has its
+    # own worker count (ExtractionConfig), so a slow LLM call holds one slot, not the paper.
+    config: BlocksToItemsConfig
+    retriever: HybridEvidenceRetriever
+    extractor: ItemExtractorLLM
+    postprocessor: ItemPostProcessor
+    storage: ItemsStorage
+
+    def run(
+        self,
+        paper_id: str,
+        candidates: Iterable[Candidate],
+        index: Optional[PaperVectorIndex] = None,
+        block_store: Optional[PaperBlockStore] = None,
+    ) -> List[Dict[str, object]]:
+        cfg = self.config.extraction
+        start = time.perf_counter()
+        abort = threading.Event()
+        errors: List[BaseException] = []
+        counts = {"candidates": 0, "extracted": 0, "dropped_llm": 0, "dropped_post": 0}
+        lock = threading.Lock()
+
+        def bump(key: str, n: int = 1) -> None:
+            with lock:
+                counts[key] += n
+
+        def batches() -> Iterator[List[Tuple[int, Candidate]]]:
+            batch: List[Tuple[int, Candidate]] = []
+            for pos, cand in enumerate(candidates):
+                batch.append((pos, cand))
+                if len(batch) >= cfg.retrieval_batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+
+        def retrieve(batch: List[Tuple[int, Candidate]]) -> Iterator[Any]:
+            bump("candidates", len(batch))
+            evidence = self.retriever.retrieve_many(
+                paper_id, [c for _, c in batch], index=index, block_store=block_store
+            )
+            yield from ((pos, cand, ev) for (pos, cand), ev in zip(batch, evidence))
+
+        def extract(job: Tuple[int, Candidate, list]) -> Iterator[Any]:
+            pos, cand, evidence = job
+            t0 = time.perf_counter()
+            data = self.extractor.extract(cand, evidence)
+            print(
+                f"[pipeline] candidate_id={cand.candidate_id} evidence={len(evidence)} "
+                f"kept={data is not None} seconds={time.perf_counter() - t0:.2f}"
+            )
+            if data is None:
+                bump("dropped_llm")
+                return
+            bump("extracted")
+            yield pos, data
+
+        def postprocess(job: Tuple[int, Dict[str, object]]) -> Iterator[Any]:
+            pos, data = job
+            kept = self.postprocessor.normalize_and_filter([data])
+            if not kept:
+                bump("dropped_post")
+            yield from ((pos, it) for it in kept)
+
+        q_retrieve: queue.Queue = queue.Queue(maxsize=cfg.queue_size)
+        q_extract: queue.Queue = queue.Queue(maxsize=cfg.queue_size)
+        q_post: queue.Queue = queue.Queue(maxsize=cfg.queue_size)
+        q_write: queue.Queue = queue.Queue(maxsize=cfg.queue_size)
+        threads = [threading.Thread(target=_feed, args=(batches, q_retrieve, abort, errors), name="stageb-feed")]
+        threads += _stage("retrieve", cfg.max_concurrent_retrievals, retrieve, q_retrieve, q_extract, abort, errors)
+        threads += _stage("extract", cfg.max_concurrent_extractions, extract, q_extract, q_post, abort, errors)
+        threads += _stage("post", cfg.max_concurrent_postprocess, postprocess, q_post, q_write, abort, errors)
+        for t in threads:
+            t.start()
+
+        items: List[Tuple[int, Dict[str, object]]] = []
+        try:
+            with self.storage.writer(paper_id) as writer:
+                pending: List[Dict[str, object]] = []
+                while True:
+                    job = _get(q_write, abort)
+                    if job is _DONE:
+                        break
+                    items.append(job)
+                    pending.append(job[1])
+                    if len(pending) >= cfg.write_batch_size:
+                        writer.write(pending)
+                        pending = []
+                if not abort.is_set():
+                    writer.write(pending)
+        except BaseException as exc:
+            errors.append(exc)
+            abort.set()
+        for t in threads:
+            t.join()
+        if errors:
+            print(f"[pipeline] aborted written={len(items)} error={errors[0]!r}")
+            raise errors[0]
+
+        print(
+            f"[pipeline] candidates={counts['candidates']} extracted={counts['extracted']} "
+            f"dropped_llm={counts['dropped_llm']} dropped_post={counts['dropped_post']} items={len(items)} "
+            f"seconds={time.perf_counter() - start:.2f}"
+        )
+        items.sort(key=lambda x: x[0])
+        return [it for _, it in items]
+
+
+def _feed(
+    source: Callable[[], Iterable[Any]], outbox: queue.Queue, abort: threading.Event, errors: List[BaseException]
+) -> None:
+    try:
+        for job in source():
+            if not _put(outbox, job, abort):
+                return
+    except BaseException as exc:
+        errors.append(exc)
+        abort.set()
+        return
+    _put(outbox, _DONE, abort)
+
+
+def _stage(
+    name: str,
+    workers: int,
+    fn: Callable[[Any], Iterable[Any]],
+    inbox: queue.Queue,
+    outbox: queue.Queue,
+    abort: threading.Event,
+    errors: List[BaseException],
+) -> List[threading.Thread]:
+    # Workers stop on _DONE (re-queued for their siblings); the last one to exit
+    # passes _DONE downstream. Any error aborts every stage.
+    workers = max(1, workers)
+    remaining = [workers]
+    lock = threading.Lock()
+
+    def loop() -> None:
+        try:
+            while not abort.is_set():
+                job = _get(inbox, abort)
+                if job is _DONE:
+                    _put(inbox, _DONE, abort)
+                    break
+                for out in fn(job):
+                    if not _put(outbox, out, abort):
+                        return
+        except BaseException as exc:
+            errors.append(exc)
+            abort.set()
+        finally:
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last and not abort.is_set():
+                _put(outbox, _DONE, abort)
+
+    return [threading.Thread(target=loop, name=f"stageb-{name}-{i}", daemon=True) for i in range(workers)]
+
+
+def _put(q: queue.Queue, item: Any, abort: threading.Event) -> bool:
+    while not abort.is_set():
+        try:
+            q.put(item, timeout=_POLL_SEC)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get(q: queue.Queue, abort: threading.Event) -> Any:
+    while not abort.is_set():
+        try:
+            return q.get(timeout=_POLL_SEC)
+        except queue.Empty:
+            continue
+    return _DONE
@@ -4,35 +4,31 @@ import uuid
 from dataclasses import dataclass
 from typing import Dict, List
 
+from .schemas import ExtractedItem
 from .validator import enforce_evidence_ids
 
 
 @dataclass
 class ItemPostProcessor:
-    def normalize_and_filter(self, items: List[Dict[str, object]]) -> List[Dict[str, object]]:
+    def normalize_and_filter(self, items: List[ExtractedItem]) -> List[Dict[str, object]]:
         out: List[Dict[str, object]] = []
         for it in items:
-            if not isinstance(it, dict):
+            if not isinstance(it, ExtractedItem) or it.drop:
                 continue
-            it["item_id"] = _ensure_uuid(it.get("item_id"))
-
             cleaned, drop = enforce_evidence_ids(it)
             if drop:
                 continue
+            cleaned.item_id = _ensure_uuid(cleaned.item_id)
 
-            kind = cleaned.get("item_kind") or "claim"
+            kind = cleaned.item_kind or "claim"
             missing = _missing_for_kind(cleaned, kind)
             coverage = _coverage_from_missing(kind, missing)
-            cleaned.setdefault("grounding", {})
-            cleaned["grounding"]["coverage_level"] = coverage
-            cleaned["grounding"].setdefault("source_section_ids", cleaned.get("grounding", {}).get("source_section_ids") or [])
-
-            if missing:
-                cleaned["grounding"]["missing_critical"] = missing
+            cleaned.grounding.coverage_level = coverage
+            cleaned.grounding.missing_critical = missing
 
             if coverage == "L0_candidate":
                 continue
-            out.append(cleaned)
+            out.append(cleaned.to_dict())
         return out
 
 
@@ -45,13 +41,13 @@ def _ensure_uuid(value: object) -> str:
     return str(uuid.uuid4())
 
 
-def _missing_for_kind(item: Dict[str, object], kind: str) -> List[str]:
+def _missing_for_kind(item: ExtractedItem, kind: str) -> List[str]:
     missing = []
-    if not _has_evidence(item.get("label")):
+    if not item.label.supported:
         missing.append("label")
 
     if kind == "experiment":
-        if not _has_any(item, ["entities.samples", "entities.assays", "results.metrics"]):
+        if not _has_readout(item):
             missing.append("assay_or_readout")
         if not _has_results(item):
             missing.append("results")
@@ -59,13 +55,13 @@ def _missing_for_kind(item: Dict[str, object], kind: str) -> List[str]:
         if not _has_protocol(item):
             missing.append("protocol")
     elif kind == "claim":
-        if not _has_evidence(item.get("summary")):
+        if not item.summary.supported:
             missing.append("summary")
     elif kind == "dataset":
-        if not _has_evidence(item.get("label")):
+        if not item.label.supported:
             missing.append("dataset")
     elif kind == "resource":
-        if not _has_evidence(item.get("label")):
+        if not item.label.supported:
             missing.append("resource")
     elif kind == "negative_result":
         if not _has_results(item):
@@ -86,41 +82,19 @@ def _coverage_from_missing(kind: str, missing: List[str]) -> str:
     return "L1_protocol"
 
 
-def _has_evidence(field: object) -> bool:
-    return isinstance(field, dict) and bool(field.get("evidence"))
-
-
-def _has_protocol(item: Dict[str, object]) -> bool:
-    steps = ((item.get("protocol") or {}).get("steps")) or []
-    for s in steps:
-        if isinstance(s, dict) and _has_evidence(s.get("text")):
-            return True
-    return False
-
-
-def _has_results(item: Dict[str, object]) -> bool:
-    results = item.get("results") or {}
-    metrics = results.get("metrics") or []
-    has_metric = any(isinstance(m, dict) and _has_evidence(m.get("name")) for m in metrics)
-    has_takeaway = _has_evidence(results.get("takeaway"))
-    return has_metric or has_takeaway
+def _has_protocol(item: ExtractedItem) -> bool:
+    return any(s.text.supported for s in item.protocol.steps)
 
 
-def _get_path(item: Dict[str, object], path: str) -> object:
-    cur: object = item
-    for p in path.split("."):
-        if not isinstance(cur, dict):
-            return None
-        cur = cur.get(p)
-    return cur
+def _has_results(item: ExtractedItem) -> bool:
+    results = item.results
+    return any(m.name.supported for m in results.metrics) or results.takeaway.supported
 
 
-def _has_any(item: Dict[str, object], paths: List[str]) -> bool:
-    for p in paths:
-        val = _get_path(item, p)
-        if isinstance(val, list):
-            if any(isinstance(v, dict) and _has_evidence(v) for v in val):
-                return True
-        if _has_evidence(val):
-            return True
-    return False
+def _has_readout(item: ExtractedItem) -> bool:
+    e = item.entities
+    return (
+        any(f.supported for f in e.samples)
+        or any(f.supported for f in e.assays)
+        or any(m.name.supported for m in item.results.metrics)
+    )
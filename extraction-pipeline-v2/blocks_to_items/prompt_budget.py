@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import json
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import PromptBudgetConfig
+from .models import Block
+from .prompts import section_items_prompt
+
+_ELLIPSIS = " …"
+
+
+@dataclass
+class PromptStats:
+    prompt_tokens: int
+    blocks_in: int
+    blocks_out: int
+    truncated: int
+    # ids of the blocks that made it into BLOCKS_JSON, in prompt order
+    block_ids: List[str] = field(default_factory=list)
+
+
+@dataclass
+class TokenCounter:
+    # tiktoken when installed; otherwise a chars-per-token estimate (logged as tokenizer=estimate).
+    config: PromptBudgetConfig
+
+    def __post_init__(self) -> None:
+        self._lock = threading.Lock()
+        self._encoding: Any = None
+        self._loaded = False
+
+    @property
+    def name(self) -> str:
+        return self.config.tokenizer_encoding if self._enc() is not None else "estimate"
+
+    def count(self, text: str) -> int:
+        enc = self._enc()
+        if enc is not None:
+            return len(enc.encode(text, disallowed_special=()))
+        return int(len(text) / self.config.chars_per_token) + 1
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        if max_tokens <= 0:
+            return ""
+        enc = self._enc()
+        if enc is not None:
+            ids = enc.encode(text, disallowed_special=())
+            return text if len(ids) <= max_tokens else enc.decode(ids[:max_tokens])
+        max_chars = int(max_tokens * self.config.chars_per_token)
+        return text if len(text) <= max_chars else text[:max_chars]
+
+    def _enc(self) -> Any:
+        with self._lock:
+            if not self._loaded:
+                self._loaded = True
+                try:
+                    import tiktoken
+
+                    self._encoding = tiktoken.get_encoding(self.config.tokenizer_encoding)
+                except Exception as exc:
+                    print(f"[prompt_budget] tokenizer unavailable, estimating tokens: {exc}")
+            return self._encoding
+
+
+@dataclass
+class SectionPromptBuilder:
+    config: PromptBudgetConfig
+    counter: Optional[TokenCounter] = None
+
+    def __post_init__(self) -> None:
+        if self.counter is None:
+            self.counter = TokenCounter(self.config)
+
+    def build(self, model: str, section_id: str, section_title: str, blocks: List[Block]) -> Tuple[str, PromptStats]:
+        # Blocks arrive in priority order (retrieval hits, then high-signal context). The
+        # instruction prefix from prompts.py is untouched; only BLOCKS_JSON is budgeted.
+        # A block that does not fit is skipped and smaller ones further down still get in.
+        empty = section_items_prompt(section_id=section_id, section_title=section_title, blocks_json="")
+        budget = self.max_prompt_tokens(model) - self.counter.count(empty)
+        entries: List[Dict[str, Any]] = []
+        truncated = 0
+        used = 2  # "[" + "]"
+        for b in blocks:
+            entry, cost = self._fit(b, budget - used)
+            if entry is None:
+                continue
+            truncated += entry["text"] != (b.text or "")
+            used += cost
+            entries.append(entry)
+        blocks_json = _compact(entries)
+        prompt = section_items_prompt(section_id=section_id, section_title=section_title, blocks_json=blocks_json)
+        stats = PromptStats(
+            prompt_tokens=self.counter.count(prompt),
+            blocks_in=len(blocks),
+            blocks_out=len(entries),
+            truncated=truncated,
+            block_ids=[e["block_id"] for e in entries],
+        )
+        return prompt, stats
+
+    def max_prompt_tokens(self, model: str) -> int:
+        for name, tokens in self.config.model_max_prompt_tokens:
+            if name == model:
+                return tokens
+        return self.config.max_prompt_tokens
+
+    def _fit(self, b: Block, remaining: int) -> Tuple[Optional[Dict[str, Any]], int]:
+        # Truncate the text to what is left; JSON escaping (quotes, CSV newlines) can make
+        # the entry cost more than its text, so shrink by the overshoot and retry.
+        text = b.text or ""
+        overhead = self.counter.count(_compact({"block_id": b.block_id, "type": b.type, "text": ""})) + 1
+        limit = min(self.config.block_max_tokens, remaining - overhead)
+        for _ in range(3):
+            if limit < self.config.block_min_tokens:
+                return None, 0
+            cut = self.counter.truncate(text, limit)
+            if cut != text:
+                cut = cut.rstrip() + _ELLIPSIS
+            entry = {"block_id": b.block_id, "type": b.type, "text": cut}
+            cost = self.counter.count(_compact(entry)) + 1
+            if cost <= remaining:
+                return entry, cost
+            limit -= cost - remaining
+        return None, 0
+
+
+def _compact(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
@@ -2,6 +2,9 @@ from __future__ import annotations
 
 import json
 
+# Part of the LLM response cache key; bump when prompt semantics change.
+PROMPT_VERSION = "2.3.0"
+
 
 def section_items_prompt(section_id: str, section_title: str, blocks_json: str) -> str:
     """
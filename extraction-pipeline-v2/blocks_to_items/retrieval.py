@@ -1,175 +1,216 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Dict, List
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
 
-from qdrant_client.models import FieldCondition, Filter, MatchValue
-
-from storage.astra.client import AstraClientFactory
-from storage.qdrant.client import QdrantClientFactory
+import numpy as np
 
+from .block_store import PaperBlockStore
+from .clients import SharedClients, qdrant_client
 from .config import BlocksToItemsConfig
+from .document_store import AstraDocumentStore
 from .embedder import Embedder
-from .models import Block, Candidate, EvidenceBlock
+from .lexical_index import PaperBM25Index, rrf_fuse, tokenize
+from .models import Candidate, EvidenceBlock
+from .vector_index import PaperVectorIndex, VectorHit
+
+_DenseKey = Tuple[str, Optional[str]]  # (query text, section_id)
 
 
 @dataclass
 class HybridEvidenceRetriever:
     config: BlocksToItemsConfig
     embedder: Embedder
-
-    def retrieve(self, paper_id: str, candidate: Candidate) -> List[EvidenceBlock]:
-        queries = [q for q in (candidate.evidence_hints or []) if q]
-        base = " ".join([str(candidate.label or ""), str(candidate.summary or "")]).strip()
-        if base:
-            queries.append(base)
-        if not queries:
+    clients: Optional[SharedClients] = None
+    _lexical: Dict[str, PaperBM25Index] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        self._lock = threading.Lock()
+
+    def retrieve(
+        self,
+        paper_id: str,
+        candidate: Candidate,
+        index: Optional[PaperVectorIndex] = None,
+        block_store: Optional[PaperBlockStore] = None,
+    ) -> List[EvidenceBlock]:
+        return self.retrieve_many(paper_id, [candidate], index=index, block_store=block_store)[0]
+
+    def retrieve_many(
+        self,
+        paper_id: str,
+        candidates: List[Candidate],
+        index: Optional[PaperVectorIndex] = None,
+        block_store: Optional[PaperBlockStore] = None,
+    ) -> List[List[EvidenceBlock]]:
+        # All candidates of a paper in one pass: one embed() call for every dense query,
+        # one batched search, one block hydration (the paper's block store).
+        if not candidates:
             return []
-
-        out: Dict[str, EvidenceBlock] = {}
-        hit_block_ids: List[str] = []
-
-        for q in queries:
-            vector = self.embedder.embed([q])[0]
-            hits = self._query_qdrant(vector, candidate.section_id)
-            for p in hits:
-                payload = p.payload or {}
-                block_id = payload.get("block_id")
-                if not block_id:
+        start = time.perf_counter()
+        cfg = self.config.retrieval
+        if block_store is None:
+            block_store = AstraDocumentStore(self.config.storage, self.clients).load_block_store(paper_id)
+        lexical = self._lexical_index(paper_id, block_store) if cfg.lexical else None
+
+        queries_by_cand = [_candidate_queries(c) for c in candidates]
+        dense_keys: List[_DenseKey] = []
+        seen = set()
+        for cand, queries in zip(candidates, queries_by_cand):
+            for q in queries:
+                # Short keyword hints are matched lexically only; longer queries go dense + lexical.
+                if lexical is not None and len(tokenize(q)) <= cfg.lexical_max_terms:
                     continue
-                hit_block_ids.append(block_id)
-                out.setdefault(
-                    block_id,
-                    EvidenceBlock(
-                        block_id=block_id,
-                        section_id=payload.get("section_id"),
-                        type=payload.get("type"),
-                        text=None,
-                    ),
-                )
-
-        if hit_block_ids:
-            fetched = self._fetch_blocks_by_ids(paper_id, hit_block_ids)
-            for b in fetched:
-                ev = out.get(b.block_id)
-                if not ev:
-                    out[b.block_id] = EvidenceBlock(
-                        block_id=b.block_id,
-                        section_id=b.section_id,
-                        type=b.type,
-                        text=b.text,
-                    )
+                key = (q, cand.section_id)
+                if key not in seen:
+                    seen.add(key)
+                    dense_keys.append(key)
+        dense = self._dense_hits(paper_id, dense_keys, index)
+
+        results: List[List[EvidenceBlock]] = []
+        for cand, queries in zip(candidates, queries_by_cand):
+            hit_lists = [dense[(q, cand.section_id)] for q in queries if (q, cand.section_id) in dense]
+            if lexical is not None:
+                hit_lists.extend(self._query_lexical(lexical, queries, cand.section_id))
+            out: Dict[str, EvidenceBlock] = {}
+            for h in rrf_fuse(hit_lists, cfg.rrf_k):
+                b = block_store.get(h.block_id)
+                if b is not None:
+                    out[h.block_id] = EvidenceBlock(b.block_id, b.section_id, b.type, b.text)
                 else:
-                    ev.section_id = ev.section_id or b.section_id
-                    ev.type = ev.type or b.type
-                    ev.text = ev.text or b.text
-
-        expanded = self._expand_neighbors(paper_id, list(out.values()))
-        return expanded
-
-    def _query_qdrant(self, vector: list[float], section_id: str | None) -> list:
-        client = QdrantClientFactory().create()
-        flt = None
-        if section_id:
-            flt = Filter(must=[FieldCondition(key="section_id", match=MatchValue(value=section_id))])
-        res = client.query_points(
-            collection_name=self.config.storage.qdrant_blocks,
-            query=vector,
-            limit=self.config.retrieval.top_k,
-            with_payload=True,
-            query_filter=flt,
+                    out[h.block_id] = EvidenceBlock(h.block_id, h.section_id, h.type, None)
+            results.append(_expand_from_store(block_store, list(out.values())))
+
+        print(
+            f"[retrieval] candidates={len(candidates)} dense_queries={len(dense_keys)} "
+            f"lexical_queries={sum(len(q) for q in queries_by_cand) if lexical else 0} "
+            f"seconds={time.perf_counter() - start:.2f}"
         )
-        if section_id and len(res.points) < max(3, self.config.retrieval.top_k // 2):
-            # fallback global if section-local is too small
-            res = client.query_points(
-                collection_name=self.config.storage.qdrant_blocks,
-                query=vector,
-                limit=self.config.retrieval.top_k,
-                with_payload=True,
+        return results
+
+    def _dense_hits(
+        self, paper_id: str, keys: List[_DenseKey], index: Optional[PaperVectorIndex]
+    ) -> Dict[_DenseKey, List[VectorHit]]:
+        if not keys:
+            return {}
+        texts = list(dict.fromkeys(q for q, _ in keys))
+        vectors = self.embedder.embed(texts)
+        row = {t: i for i, t in enumerate(texts)}
+        if index is not None and len(index):
+            return self._query_index(index, keys, vectors, row)
+        return self._query_qdrant(paper_id, keys, vectors, row)
+
+    def _query_index(
+        self, index: PaperVectorIndex, keys: List[_DenseKey], vectors: np.ndarray, row: Dict[str, int]
+    ) -> Dict[_DenseKey, List[VectorHit]]:
+        top_k = self.config.retrieval.top_k
+        groups: Dict[Optional[str], List[_DenseKey]] = {}
+        for key in keys:
+            section_id = key[1]
+            if not section_id or index.section_size(section_id) < max(3, top_k // 2):
+                # fallback paper-wide if section-local is too small
+                section_id = None
+            groups.setdefault(section_id, []).append(key)
+        out: Dict[_DenseKey, List[VectorHit]] = {}
+        for section_id, group in groups.items():
+            mat = vectors[[row[q] for q, _ in group]]
+            for key, hits in zip(group, index.search_many(mat, limit=top_k, section_id=section_id)):
+                out[key] = hits
+        return out
+
+    def _query_qdrant(
+        self, paper_id: str, keys: List[_DenseKey], vectors: np.ndarray, row: Dict[str, int]
+    ) -> Dict[_DenseKey, List[VectorHit]]:
+        from qdrant_client.models import FieldCondition, Filter, MatchValue, QueryRequest
+
+        # One query_batch_points call: each sectioned query is sent both section-filtered
+        # and paper-wide, so the small-section fallback needs no second round-trip.
+        top_k = self.config.retrieval.top_k
+        paper_cond = FieldCondition(key="paper_id", match=MatchValue(value=paper_id))
+        requests: List[QueryRequest] = []
+        slots: List[Tuple[_DenseKey, Optional[int], int]] = []
+        for key in keys:
+            vector = vectors[row[key[0]]].tolist()
+            section_slot = None
+            if key[1]:
+                section_slot = len(requests)
+                flt = Filter(must=[paper_cond, FieldCondition(key="section_id", match=MatchValue(value=key[1]))])
+                requests.append(QueryRequest(query=vector, filter=flt, limit=top_k, with_payload=True))
+            paper_slot = len(requests)
+            requests.append(
+                QueryRequest(query=vector, filter=Filter(must=[paper_cond]), limit=top_k, with_payload=True)
             )
-        return res.points
-
-    def _fetch_blocks_by_ids(self, paper_id: str, block_ids: List[str]) -> List[Block]:
-        if not block_ids:
-            return []
-        cluster, session = AstraClientFactory().create()
-        blocks: List[Block] = []
-        try:
-            for chunk in _chunk(block_ids, 50):
-                placeholders = ", ".join(["%s"] * len(chunk))
-                query = (
-                    "SELECT block_id, section_id, type, text, block_index "
-                    f"FROM blocks WHERE paper_id = %s AND block_id IN ({placeholders})"
-                )
-                params = [paper_id] + list(chunk)
-                rows = session.execute(query, params)
-                for r in rows:
-                    blocks.append(
-                        Block(
-                            block_id=r.block_id,
-                            section_id=r.section_id,
-                            type=r.type,
-                            text=r.text,
-                            block_index=r.block_index,
-                        )
-                    )
-        finally:
-            cluster.shutdown()
-        return blocks
-
-    def _expand_neighbors(self, paper_id: str, evidence_blocks: List[EvidenceBlock]) -> List[EvidenceBlock]:
-        if not evidence_blocks:
-            return []
-        by_section: Dict[str, List[Block]] = {}
-        cluster, session = AstraClientFactory().create()
-        try:
-            for ev in evidence_blocks:
-                if not ev.section_id or ev.section_id in by_section:
-                    continue
-                rows = session.execute(
-                    "SELECT block_id, section_id, type, text, block_index FROM blocks WHERE paper_id = ? AND section_id = ? ALLOW FILTERING",
-                    (paper_id, ev.section_id),
+            slots.append((key, section_slot, paper_slot))
+
+        client = qdrant_client(self.clients)
+        responses = client.query_batch_points(collection_name=self.config.storage.qdrant_blocks, requests=requests)
+        out: Dict[_DenseKey, List[VectorHit]] = {}
+        for key, section_slot, paper_slot in slots:
+            points = responses[paper_slot].points
+            if section_slot is not None and len(responses[section_slot].points) >= max(3, top_k // 2):
+                points = responses[section_slot].points
+            out[key] = [
+                VectorHit(
+                    block_id=(p.payload or {}).get("block_id"),
+                    section_id=(p.payload or {}).get("section_id"),
+                    type=(p.payload or {}).get("type"),
+                    score=p.score or 0.0,
                 )
-                blist = [
-                    Block(
-                        block_id=r.block_id,
-                        section_id=r.section_id,
-                        type=r.type,
-                        text=r.text,
-                        block_index=r.block_index,
-                    )
-                    for r in rows
-                ]
-                by_section[ev.section_id] = sorted(blist, key=lambda b: b.block_index)
-        finally:
-            cluster.shutdown()
-
-        expanded: Dict[str, EvidenceBlock] = {b.block_id: b for b in evidence_blocks if b.block_id}
-        for ev in evidence_blocks:
-            if not ev.section_id:
-                continue
-            blist = by_section.get(ev.section_id, [])
-            if not blist:
-                continue
-            idx_map = {b.block_id: i for i, b in enumerate(blist)}
-            i = idx_map.get(ev.block_id)
-            if i is None:
-                continue
-            for offset in (-1, 1):
-                j = i + offset
-                if 0 <= j < len(blist):
-                    nb = blist[j]
-                    expanded.setdefault(
-                        nb.block_id,
-                        EvidenceBlock(
-                            block_id=nb.block_id,
-                            section_id=nb.section_id,
-                            type=nb.type,
-                            text=nb.text,
-                        ),
-                    )
-        return list(expanded.values())
-
-
-def _chunk(items: List[str], size: int) -> List[List[str]]:
-    return [items[i : i + size] for i in range(0, len(items), size)]
+                for p in points
+            ]
+        return out
+
+    def _lexical_index(self, paper_id: str, block_store: Optional[PaperBlockStore]) -> Optional[PaperBM25Index]:
+        if block_store is None or not len(block_store):
+            return None
+        with self._lock:
+            lexical = self._lexical.get(paper_id)
+            if lexical is None:
+                cfg = self.config.retrieval
+                lexical = PaperBM25Index.from_store(block_store, k1=cfg.bm25_k1, b=cfg.bm25_b)
+                self._lexical[paper_id] = lexical
+            return lexical
+
+    def forget(self, paper_id: str) -> None:
+        # drop per-paper state once the paper is done (several papers may be in flight)
+        with self._lock:
+            self._lexical.pop(paper_id, None)
+
+    def _query_lexical(
+        self, lexical: PaperBM25Index, queries: List[str], section_id: str | None
+    ) -> List[List[VectorHit]]:
+        top_k = self.config.retrieval.top_k
+        out: List[List[VectorHit]] = []
+        for q in queries:
+            hits = lexical.search(q, limit=top_k, section_id=section_id) if section_id else []
+            if len(hits) < max(3, top_k // 2):
+                # fallback paper-wide if section-local is too small
+                hits = lexical.search(q, limit=top_k)
+            out.append(hits)
+        return out
+
+
+def _candidate_queries(candidate: Candidate) -> List[str]:
+    queries = [q for q in (candidate.evidence_hints or []) if q]
+    base = " ".join([str(candidate.label or ""), str(candidate.summary or "")]).strip()
+    if base:
+        queries.append(base)
+    return queries
+
+
+def _expand_from_store(store: PaperBlockStore, evidence_blocks: List[EvidenceBlock]) -> List[EvidenceBlock]:
+    expanded: Dict[str, EvidenceBlock] = {b.block_id: b for b in evidence_blocks if b.block_id}
+    for ev in evidence_blocks:
+        for nb in store.neighbors(ev.block_id):
+            expanded.setdefault(
+                nb.block_id,
+                EvidenceBlock(
+                    block_id=nb.block_id,
+                    section_id=nb.section_id,
+                    type=nb.type,
+                    text=nb.text,
+                ),
+            )
+    return list(expanded.values())
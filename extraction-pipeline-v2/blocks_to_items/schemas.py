@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+from typing import Any, Generic, Iterator, List, Optional, Type, TypeVar, Union
+
+import msgspec
+
+# Wire schemas for LLM output, decoded straight from the completion text with msgspec
+# (lax mode: "0.8" -> 0.8). The prompts allow null anywhere, so every list or nested
+# object is Optional and normalized in __post_init__: null lists -> [], null objects ->
+# empty structs.
+
+T = TypeVar("T")
+
+
+class CandidateOut(msgspec.Struct):
+    # candidate_items_v1 (stage A section prompt)
+    item_id: Optional[str] = None
+    proposed_item_kind: Optional[str] = None
+    label: Optional[str] = None
+    summary: Optional[str] = None
+    anchors: Optional[List[str]] = None
+    predicted_source_sections: Optional[List[str]] = None
+    evidence_block_ids: Optional[List[str]] = None
+    evidence_hints: Optional[List[str]] = None
+    confidence: Optional[float] = None
+
+    def __post_init__(self) -> None:
+        self.anchors = self.anchors or []
+        self.predicted_source_sections = self.predicted_source_sections or []
+        self.evidence_block_ids = self.evidence_block_ids or []
+        self.evidence_hints = self.evidence_hints or []
+        self.confidence = self.confidence or 0.0
+
+
+class Field(msgspec.Struct):
+    value: Union[str, float, None] = None
+    evidence: Optional[List[str]] = None
+    confidence: Optional[float] = None
+
+    def __post_init__(self) -> None:
+        self.evidence = self.evidence or []
+        self.confidence = self.confidence or 0.0
+
+    @property
+    def supported(self) -> bool:
+        return bool(self.evidence)
+
+
+class Entities(msgspec.Struct):
+    samples: Optional[List[Field]] = None
+    assays: Optional[List[Field]] = None
+    proteins_or_targets: Optional[List[Field]] = None
+    chemicals_or_reagents: Optional[List[Field]] = None
+    instruments: Optional[List[Field]] = None
+    software: Optional[List[Field]] = None
+
+    def __post_init__(self) -> None:
+        self.samples = self.samples or []
+        self.assays = self.assays or []
+        self.proteins_or_targets = self.proteins_or_targets or []
+        self.chemicals_or_reagents = self.chemicals_or_reagents or []
+        self.instruments = self.instruments or []
+        self.software = self.software or []
+
+
+class Comparison(msgspec.Struct):
+    a: Optional[Field] = None
+    b: Optional[Field] = None
+
+    def __post_init__(self) -> None:
+        self.a = self.a or Field()
+        self.b = self.b or Field()
+
+
+class Variable(msgspec.Struct):
+    name: Optional[Field] = None
+    levels: Optional[List[Field]] = None
+
+    def __post_init__(self) -> None:
+        self.name = self.name or Field()
+        self.levels = self.levels or []
+
+
+class Design(msgspec.Struct):
+    design_type: Optional[str] = None
+    comparisons: Optional[List[Comparison]] = None
+    variables: Optional[List[Variable]] = None
+
+    def __post_init__(self) -> None:
+        self.comparisons = self.comparisons or []
+        self.variables = self.variables or []
+
+
+class Parameter(msgspec.Struct):
+    name: Optional[Field] = None
+    value: Optional[Field] = None
+    unit: Optional[Field] = None
+
+    def __post_init__(self) -> None:
+        self.name = self.name or Field()
+        self.value = self.value or Field()
+        self.unit = self.unit or Field()
+
+
+class Step(msgspec.Struct):
+    text: Optional[Field] = None
+    parameters: Optional[List[Parameter]] = None
+
+    def __post_init__(self) -> None:
+        self.text = self.text or Field()
+        self.parameters = self.parameters or []
+
+
+class Protocol(msgspec.Struct):
+    steps: Optional[List[Step]] = None
+
+    def __post_init__(self) -> None:
+        self.steps = self.steps or []
+
+
+class Metric(msgspec.Struct):
+    name: Optional[Field] = None
+    value: Optional[Field] = None
+    unit: Optional[Field] = None
+    direction: Optional[str] = None
+    conditions: Optional[Field] = None
+
+    def __post_init__(self) -> None:
+        self.name = self.name or Field()
+        self.value = self.value or Field()
+        self.unit = self.unit or Field()
+        self.conditions = self.conditions or Field()
+
+
+class Results(msgspec.Struct):
+    metrics: Optional[List[Metric]] = None
+    takeaway: Optional[Field] = None
+
+    def __post_init__(self) -> None:
+        self.metrics = self.metrics or []
+        self.takeaway = self.takeaway or Field()
+
+
+class Grounding(msgspec.Struct):
+    evidence_block_ids: Optional[List[str]] = None
+    source_section_ids: Optional[List[str]] = None
+    anchors: Optional[List[str]] = None
+    coverage_level: Optional[str] = None
+    missing_critical: Optional[List[str]] = None
+
+    def __post_init__(self) -> None:
+        self.evidence_block_ids = self.evidence_block_ids or []
+        self.source_section_ids = self.source_section_ids or []
+        self.anchors = self.anchors or []
+        self.missing_critical = self.missing_critical or []
+
+
+class ExtractedItem(msgspec.Struct):
+    # bioitems_v2 compact (stage B extraction prompt); {"drop": true, ...} decodes with drop=True
+    item_id: Optional[str] = None
+    item_kind: Optional[str] = None
+    label: Optional[Field] = None
+    summary: Optional[Field] = None
+    entities: Optional[Entities] = None
+    design: Optional[Design] = None
+    protocol: Optional[Protocol] = None
+    results: Optional[Results] = None
+    grounding: Optional[Grounding] = None
+    confidence_overall: Optional[float] = None
+    candidate_id: Optional[str] = None
+    drop: Optional[bool] = None
+    drop_reason: Optional[str] = None
+
+    def __post_init__(self) -> None:
+        self.label = self.label or Field()
+        self.summary = self.summary or Field()
+        self.entities = self.entities or Entities()
+        self.design = self.design or Design()
+        self.protocol = self.protocol or Protocol()
+        self.results = self.results or Results()
+        self.grounding = self.grounding or Grounding()
+        self.drop = bool(self.drop)
+
+    def fields(self) -> Iterator[Field]:
+        yield self.label
+        yield self.summary
+        e = self.entities
+        for group in (e.samples, e.assays, e.proteins_or_targets, e.chemicals_or_reagents, e.instruments, e.software):
+            yield from group
+        for c in self.design.comparisons:
+            yield c.a
+            yield c.b
+        for v in self.design.variables:
+            yield v.name
+            yield from v.levels
+        for s in self.protocol.steps:
+            yield s.text
+            for p in s.parameters:
+                yield p.name
+                yield p.value
+                yield p.unit
+        for m in self.results.metrics:
+            yield m.name
+            yield m.value
+            yield m.unit
+            yield m.conditions
+        yield self.results.takeaway
+
+    def to_dict(self) -> dict:
+        out = msgspec.to_builtins(self)
+        out.pop("drop", None)
+        out.pop("drop_reason", None)
+        if not out["grounding"]["missing_critical"]:
+            del out["grounding"]["missing_critical"]
+        return out
+
+
+class _Items(msgspec.Struct, Generic[T]):
+    # JSON mode only allows objects: list answers come back as {"items": [...]}
+    items: List[T] = []
+
+
+def decode(raw: Union[str, bytes], type_: Type[T], *, many: bool = False) -> Any:
+    """
+    Decode + validate a completion in one msgspec pass. Returns None when the text is not
+    valid JSON (callers fall back to salvage). With many=True, an element that fails
+    validation is dropped instead of failing the whole answer.
+    """
+    target: Any = Union[List[type_], _Items[type_]] if many else type_
+    try:
+        data = msgspec.json.decode(raw, type=target, strict=False)
+    except msgspec.ValidationError:
+        try:
+            return convert(msgspec.json.decode(raw), type_, many=many)
+        except msgspec.DecodeError:
+            return None
+    except msgspec.DecodeError:
+        return None
+    return data.items if isinstance(data, _Items) else data
+
+
+def convert(data: Any, type_: Type[T], *, many: bool = False) -> Any:
+    # Same validation for already-parsed JSON (salvaged text).
+    if data is None:
+        return None
+    if not many:
+        try:
+            return msgspec.convert(data, type_, strict=False)
+        except msgspec.ValidationError:
+            return None
+    if isinstance(data, dict):
+        data = data.get("items")
+    if not isinstance(data, list):
+        return None
+    out = []
+    for d in data:
+        try:
+            out.append(msgspec.convert(d, type_, strict=False))
+        except msgspec.ValidationError:
+            continue
+    return out
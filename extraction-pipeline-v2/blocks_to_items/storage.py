@@ -2,13 +2,12 @@ from __future__ import annotations
 
 import json
 from dataclasses import dataclass
-from typing import Dict, List
-
-from qdrant_client.models import PointStruct
+from typing import Dict, List, Optional, Tuple
 
 from storage.astra.client import AstraClientFactory
-from storage.qdrant.client import QdrantClientFactory
+from storage.qdrant.bulk import BulkWriteConfig, QdrantBulkWriter
 
+from .clients import SharedClients, qdrant_client
 from .config import BlocksToItemsConfig
 from .embedder import Embedder
 
@@ -16,63 +15,115 @@ from .embedder import Embedder
 @dataclass
 class ItemsStorage:
     config: BlocksToItemsConfig = BlocksToItemsConfig()
+    clients: Optional[SharedClients] = None
 
     def store(self, paper_id: str, items: List[Dict[str, object]]) -> None:
-        self._store_astra(paper_id, items)
-        self._store_qdrant(paper_id, items)
+        with self.writer(paper_id) as writer:
+            writer.write(items)
+
+    def writer(self, paper_id: str) -> ItemsWriter:
+        return ItemsWriter(self.config, paper_id, self.clients)
 
-    def _store_astra(self, paper_id: str, items: List[Dict[str, object]]) -> None:
+
+@dataclass
+class ItemsWriter:
+    # One Astra session, Qdrant client and embedder per paper; write() is called once
+    # per batch of finished items instead of reconnecting for every store().
+    config: BlocksToItemsConfig
+    paper_id: str
+    clients: Optional[SharedClients] = None
+
+    def __post_init__(self) -> None:
         cfg = self.config.storage
-        cluster, session = AstraClientFactory().create()
-        try:
-            for it in items:
-                item_id = str(it.get("item_id"))
-                item_kind = it.get("item_kind")
-                label = (it.get("label") or {}).get("value") if isinstance(it.get("label"), dict) else it.get("label")
-                summary = (it.get("summary") or {}).get("value") if isinstance(it.get("summary"), dict) else it.get("summary")
-                confidence = it.get("confidence_overall")
-                session.execute(
-                    f"INSERT INTO {cfg.astra_items} (paper_id, item_id, item_kind, label, summary, confidence_overall, item_json) "
-                    "VALUES (%s,%s,%s,%s,%s,%s,%s)",
+        self.written = 0
+        self._cluster = None
+        if self.clients is not None:
+            self._session = self.clients.astra()
+        else:
+            self._cluster, self._session = AstraClientFactory().create()
+        self._insert = self._session.prepare(
+            f"INSERT INTO {cfg.astra_items} (paper_id, item_id, item_kind, label, summary, confidence_overall, item_json) "
+            "VALUES (?,?,?,?,?,?,?)"
+        )
+        self._qdrant = QdrantBulkWriter(
+            qdrant_client(self.clients),
+            BulkWriteConfig(
+                batch_size=cfg.qdrant_upsert_batch_size,
+                parallel=cfg.qdrant_upsert_parallel,
+                wait=cfg.qdrant_upsert_wait,
+                max_retries=cfg.qdrant_upsert_max_retries,
+            ),
+        )
+        self._embedder = Embedder(self.config.embedding)
+
+    def write(self, items: List[Dict[str, object]]) -> None:
+        if not items:
+            return
+        self._store_astra(items)
+        self._store_qdrant(items)
+        self.written += len(items)
+
+    def close(self) -> None:
+        if self._cluster is not None:
+            self._cluster.shutdown()
+
+    def __enter__(self) -> ItemsWriter:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def _store_astra(self, items: List[Dict[str, object]]) -> None:
+        futures = []
+        for it in items:
+            label, summary = _label_summary(it)
+            futures.append(
+                self._session.execute_async(
+                    self._insert,
                     (
-                        paper_id,
-                        item_id,
-                        item_kind,
+                        self.paper_id,
+                        str(it.get("item_id")),
+                        it.get("item_kind"),
                         label,
                         summary,
-                        confidence,
+                        it.get("confidence_overall"),
                         json.dumps(it),
                     ),
                 )
-        finally:
-            cluster.shutdown()
+            )
+        for fut in futures:
+            fut.result()
 
-    def _store_qdrant(self, paper_id: str, items: List[Dict[str, object]]) -> None:
-        cfg = self.config.storage
-        client = QdrantClientFactory().create()
-        embedder = Embedder(self.config.embedding)
+    def _store_qdrant(self, items: List[Dict[str, object]]) -> None:
+        from qdrant_client.models import PointStruct
 
         texts = []
         rows = []
         for it in items:
-            label = (it.get("label") or {}).get("value") if isinstance(it.get("label"), dict) else it.get("label")
-            summary = (it.get("summary") or {}).get("value") if isinstance(it.get("summary"), dict) else it.get("summary")
+            label, summary = _label_summary(it)
             text = " ".join([str(label or ""), str(summary or "")]).strip()
             if not text:
                 continue
             texts.append(text)
-            rows.append((it, text))
+            rows.append(it)
+        if not texts:
+            return
 
-        vectors = embedder.embed(texts) if texts else []
+        vectors = self._embedder.embed(texts)
         points = []
-        for (it, text), v in zip(rows, vectors):
+        for it, v in zip(rows, vectors):
             item_id = str(it.get("item_id"))
             payload = {
-                "paper_id": paper_id,
+                "paper_id": self.paper_id,
                 "item_id": item_id,
                 "item_kind": it.get("item_kind"),
             }
-            points.append(PointStruct(id=item_id, vector=v, payload=payload))
+            points.append(PointStruct(id=item_id, vector=v.tolist(), payload=payload))
+
+        self._qdrant.upsert(self.config.storage.qdrant_items, points)
+
 
-        if points:
-            client.upsert(collection_name=cfg.qdrant_items, points=points)
+def _label_summary(it: Dict[str, object]) -> Tuple[object, object]:
+    label = (it.get("label") or {}).get("value") if isinstance(it.get("label"), dict) else it.get("label")
+    summary = (it.get("summary") or {}).get("value") if isinstance(it.get("summary"), dict) else it.get("summary")
+    return label, summary
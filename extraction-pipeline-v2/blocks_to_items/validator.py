@@ -1,44 +1,41 @@
 from __future__ import annotations
 
 import re
-from typing import Any, Dict, List, Tuple
+from typing import List, Set, Tuple
 
-_EVIDENCE_RE = re.compile(r"^b_[0-9a-f]+$|^b_\\d+$")
+from .schemas import ExtractedItem
 
+_EVIDENCE_RE = re.compile(
+    r"^b_[0-9a-f]+$|^b_\d+$|^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$"
+)
 
-def enforce_evidence_ids(item: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+
+def enforce_evidence_ids(item: ExtractedItem) -> Tuple[ExtractedItem, bool]:
     """
-    Filters evidence arrays to only valid block ids.
+    Filters evidence arrays to only valid block ids (in place; lists that are already
+    clean are left as they are).
     Returns (item, drop) where drop is True if required evidence is missing.
     """
-    drop = False
-
-    def walk(obj: Any) -> Any:
-        nonlocal drop
-        if isinstance(obj, dict):
-            if _is_field_str(obj):
-                ev = obj.get("evidence") or []
-                if isinstance(ev, list):
-                    ev = [e for e in ev if isinstance(e, str) and _EVIDENCE_RE.match(e)]
-                else:
-                    ev = []
-                obj["evidence"] = ev
-                return obj
-            for k, v in list(obj.items()):
-                obj[k] = walk(v)
-            return obj
-        if isinstance(obj, list):
-            return [walk(v) for v in obj]
-        return obj
-
-    cleaned = walk(item)
-
-    grounding = cleaned.get("grounding") if isinstance(cleaned, dict) else None
-    ev_ids = grounding.get("evidence_block_ids") if isinstance(grounding, dict) else []
-    if not ev_ids:
-        drop = True
-    return cleaned, drop
-
-
-def _is_field_str(obj: Dict[str, Any]) -> bool:
-    return "value" in obj and "evidence" in obj and "confidence" in obj
+    if not item.grounding.evidence_block_ids:
+        return item, True
+    # The same few block ids are cited across fields; match each distinct id once.
+    valid: Set[str] = set()
+    for f in item.fields():
+        ev = f.evidence
+        if not ev:
+            continue
+        clean = _valid_ids(ev, valid)
+        if len(clean) != len(ev):
+            f.evidence = clean
+    return item, False
+
+
+def _valid_ids(ids: List[str], valid: Set[str]) -> List[str]:
+    out: List[str] = []
+    for e in ids:
+        if e not in valid:
+            if not _EVIDENCE_RE.match(e):
+                continue
+            valid.add(e)
+        out.append(e)
+    return out
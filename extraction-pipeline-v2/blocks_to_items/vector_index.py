@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .models import intern_id
+
+
+@dataclass
+class VectorHit:
+    block_id: str
+    section_id: Optional[str]
+    type: Optional[str]
+    score: float
+
+
+@dataclass
+class PaperVectorIndex:
+    # Rows are sorted by block so chunk points of one block are contiguous;
+    # block scores are the max over their rows (np.maximum.reduceat).
+    paper_id: str
+    matrix: np.ndarray
+    block_ids: List[str]
+    section_ids: List[Optional[str]]
+    types: List[Optional[str]]
+    block_starts: np.ndarray
+    _section_blocks: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, client, collection_name: str, paper_id: str, *, page_size: int = 256) -> "PaperVectorIndex":
+        from qdrant_client.models import FieldCondition, Filter, MatchValue
+
+        start = time.perf_counter()
+        flt = Filter(must=[FieldCondition(key="paper_id", match=MatchValue(value=paper_id))])
+        rows: List[tuple] = []
+        offset = None
+        while True:
+            records, offset = client.scroll(
+                collection_name=collection_name,
+                scroll_filter=flt,
+                limit=page_size,
+                offset=offset,
+                with_payload=["block_id", "section_id", "type"],
+                with_vectors=True,
+            )
+            for r in records:
+                payload = r.payload or {}
+                block_id = payload.get("block_id")
+                if not block_id or r.vector is None:
+                    continue
+                rows.append((str(block_id), payload.get("section_id"), payload.get("type"), r.vector))
+            if offset is None:
+                break
+        index = cls.from_rows(paper_id, rows)
+        print(
+            f"[vector_index] paper_id={paper_id} points={index.matrix.shape[0]} blocks={len(index.block_ids)} "
+            f"seconds={time.perf_counter() - start:.2f}"
+        )
+        return index
+
+    @classmethod
+    def from_rows(cls, paper_id: str, rows: List[tuple]) -> "PaperVectorIndex":
+        rows = sorted(rows, key=lambda r: r[0])
+        if not rows:
+            return cls(paper_id, np.empty((0, 0), dtype=np.float32), [], [], [], np.empty(0, dtype=np.intp))
+        matrix = np.asarray([r[3] for r in rows], dtype=np.float32)
+        _normalize_rows(matrix)
+
+        block_ids: List[str] = []
+        section_ids: List[Optional[str]] = []
+        types: List[Optional[str]] = []
+        starts: List[int] = []
+        for i, (block_id, section_id, kind, _) in enumerate(rows):
+            if block_ids and block_ids[-1] == block_id:
+                continue
+            # same string objects as the block store's ids
+            block_ids.append(intern_id(block_id))
+            section_ids.append(intern_id(section_id))
+            types.append(intern_id(kind))
+            starts.append(i)
+
+        by_section: Dict[str, List[int]] = {}
+        for b, section_id in enumerate(section_ids):
+            if section_id:
+                by_section.setdefault(section_id, []).append(b)
+        return cls(
+            paper_id=paper_id,
+            matrix=matrix,
+            block_ids=block_ids,
+            section_ids=section_ids,
+            types=types,
+            block_starts=np.asarray(starts, dtype=np.intp),
+            _section_blocks={k: np.asarray(v, dtype=np.intp) for k, v in by_section.items()},
+        )
+
+    def __len__(self) -> int:
+        return len(self.block_ids)
+
+    def section_size(self, section_id: str) -> int:
+        return len(self._section_blocks.get(section_id, ()))
+
+    def search(self, vector: np.ndarray, *, limit: int, section_id: str | None = None) -> List[VectorHit]:
+        return self.search_many(np.asarray(vector, dtype=np.float32)[None, :], limit=limit, section_id=section_id)[0]
+
+    def search_many(
+        self, vectors: np.ndarray, *, limit: int, section_id: str | None = None
+    ) -> List[List[VectorHit]]:
+        queries = np.array(vectors, dtype=np.float32, ndmin=2)
+        if not len(self) or not queries.size or limit <= 0:
+            return [[] for _ in range(queries.shape[0])]
+        _normalize_rows(queries)
+        # (q, points) cosine scores -> (q, blocks) best chunk per block
+        scores = np.maximum.reduceat(queries @ self.matrix.T, self.block_starts, axis=1)
+
+        candidates: Optional[np.ndarray] = None
+        if section_id is not None:
+            candidates = self._section_blocks.get(section_id, np.empty(0, dtype=np.intp))
+            scores = scores[:, candidates]
+        k = min(limit, scores.shape[1])
+        if k == 0:
+            return [[] for _ in range(queries.shape[0])]
+
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        out: List[List[VectorHit]] = []
+        for cols, vals in zip(top, top_scores):
+            hits: List[VectorHit] = []
+            for c, score in zip(cols, vals):
+                b = int(candidates[c]) if candidates is not None else int(c)
+                hits.append(VectorHit(self.block_ids[b], self.section_ids[b], self.types[b], float(score)))
+            out.append(hits)
+        return out
+
+
+def _normalize_rows(matrix: np.ndarray) -> None:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix /= norms
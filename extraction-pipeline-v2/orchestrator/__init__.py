@@ -0,0 +1,6 @@
+from __future__ import annotations
+
+from .core import Orchestrator
+from .queue import PaperQueue
+
+__all__ = ["Orchestrator", "PaperQueue"]
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import argparse
+from dataclasses import replace
+from pathlib import Path
+
+from .config import OrchestratorConfig, QueueConfig, ReportConfig, StructureConfig, WorkerConfig
+from .core import Orchestrator
+from .env import load_env
+load_env()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Batch papers through pdf_to_infra, structure_to_blocks and blocks_to_items.")
+    parser.add_argument("--db", default=QueueConfig.db_path, help="SQLite queue path")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    enq = sub.add_parser("enqueue", help="Add papers to the queue")
+    enq.add_argument("--pdf", nargs="*", default=[], help="PDF files or directories (start at ingest)")
+    enq.add_argument("--hash", nargs="*", default=[], help="Already ingested paper hashes")
+    enq.add_argument("--hashes-file", help="File with one paper hash per line")
+    enq.add_argument("--from-stage", default="structure", choices=["structure", "items"], help="Start stage for hashes")
+
+    run = sub.add_parser("run", help="Process the queue until it drains")
+    run.add_argument("--ingest-workers", type=int, default=WorkerConfig.ingest)
+    run.add_argument("--structure-workers", type=int, default=WorkerConfig.structure)
+    run.add_argument("--items-workers", type=int, default=WorkerConfig.items)
+    run.add_argument("--max-attempts", type=int, default=QueueConfig.max_attempts)
+    run.add_argument("--report-every", type=float, default=ReportConfig.interval_sec, help="Seconds between reports")
+    run.add_argument("--no-astra", action="store_true", help="structure_to_blocks: skip Astra storage")
+    run.add_argument("--no-qdrant", action="store_true", help="structure_to_blocks: skip Qdrant storage")
+    run.add_argument("--incremental", action="store_true", help="structure_to_blocks: incremental re-index")
+    run.add_argument("--async", dest="run_async", action="store_true", help="structure_to_blocks: run_async")
+
+    sub.add_parser("status", help="Show per-stage counts and dead-lettered papers")
+
+    retry = sub.add_parser("retry-dead", help="Move dead-lettered tasks back to pending")
+    retry.add_argument("--stage", choices=["ingest", "structure", "items"])
+    args = parser.parse_args()
+
+    config = OrchestratorConfig(queue=QueueConfig(db_path=args.db))
+    if args.command == "run":
+        config = replace(
+            config,
+            queue=replace(config.queue, max_attempts=args.max_attempts),
+            workers=WorkerConfig(
+                ingest=args.ingest_workers, structure=args.structure_workers, items=args.items_workers
+            ),
+            structure=StructureConfig(
+                store_astra=not args.no_astra,
+                store_qdrant=not args.no_qdrant,
+                incremental=args.incremental,
+                run_async=args.run_async,
+            ),
+            report=ReportConfig(interval_sec=args.report_every),
+        )
+    orch = Orchestrator(config)
+
+    if args.command == "enqueue":
+        orch.enqueue_pdfs(args.pdf)
+        hashes = list(args.hash)
+        if args.hashes_file:
+            hashes += [line.strip() for line in Path(args.hashes_file).read_text(encoding="utf-8").splitlines()]
+        orch.enqueue_hashes(hashes, stage=args.from_stage)
+    elif args.command == "run":
+        orch.run()
+    elif args.command == "status":
+        orch.report()
+        for row in orch.queue.dead():
+            print(f"[orchestrator] dead paper={row['paper_hash']} stage={row['stage']} "
+                  f"attempts={row['attempts']} error={row['last_error']}")
+    elif args.command == "retry-dead":
+        n = orch.queue.retry_dead(args.stage)
+        print(f"[orchestrator] requeued={n}")
+
+
+if __name__ == "__main__":
+    main()
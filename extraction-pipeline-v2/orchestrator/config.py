@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True)
+class QueueConfig:
+    db_path: str = "orchestrator.sqlite3"
+    max_attempts: int = 3
+    retry_backoff_sec: float = 30.0
+    poll_interval_sec: float = 1.0
+
+
+@dataclass(frozen=True)
+class WorkerConfig:
+    ingest: int = 2
+    structure: int = 2
+    items: int = 2
+
+
+@dataclass(frozen=True)
+class IngestConfig:
+    api_url_env: str = "PDF_TO_INFRA_URL"
+    api_url_default: str = "http://127.0.0.1:4020"
+    timeout_sec: int = 900
+
+
+@dataclass(frozen=True)
+class StructureConfig:
+    store_astra: bool = True
+    store_qdrant: bool = True
+    incremental: bool = False
+    run_async: bool = False
+
+
+@dataclass(frozen=True)
+class ReportConfig:
+    interval_sec: float = 30.0
+
+
+@dataclass(frozen=True)
+class OrchestratorConfig:
+    queue: QueueConfig = field(default_factory=QueueConfig)
+    workers: WorkerConfig = field(default_factory=WorkerConfig)
+    ingest: IngestConfig = field(default_factory=IngestConfig)
+    structure: StructureConfig = field(default_factory=StructureConfig)
+    report: ReportConfig = field(default_factory=ReportConfig)
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+from .config import OrchestratorConfig
+from .queue import DEAD, DONE, PENDING, RUNNING, STAGES, PaperQueue
+from .stages import build_stage
+
+
+@dataclass
+class Orchestrator:
+    config: OrchestratorConfig = OrchestratorConfig()
+
+    def __post_init__(self) -> None:
+        self.queue = PaperQueue(self.config.queue)
+
+    def enqueue_pdfs(self, paths: Iterable[str]) -> int:
+        added = 0
+        for path in _expand_pdfs(paths):
+            # Same key pdf_to_infra derives (sha256 of the bytes), so the queue is keyed by paper hash up front.
+            paper_hash = hashlib.sha256(path.read_bytes()).hexdigest()
+            if self.queue.enqueue(paper_hash, stage="ingest", pdf_path=str(path.resolve())):
+                added += 1
+        print(f"[orchestrator] enqueued pdfs={added}")
+        return added
+
+    def enqueue_hashes(self, hashes: Iterable[str], *, stage: str = "structure") -> int:
+        added = sum(1 for h in hashes if h and self.queue.enqueue(h, stage=stage))
+        print(f"[orchestrator] enqueued hashes={added} stage={stage}")
+        return added
+
+    def run(self) -> Dict[str, object]:
+        workers = {stage: max(0, getattr(self.config.workers, stage)) for stage in STAGES}
+        active = [stage for stage in STAGES if workers[stage]]
+        if not active:
+            raise ValueError("no stage has workers")
+        recovered = self.queue.recover()
+        print(f"[orchestrator] start workers={workers} recovered={recovered}")
+
+        started = time.time()
+        stop = threading.Event()
+        threads: List[threading.Thread] = []
+        for stage in active:
+            for idx in range(workers[stage]):
+                t = threading.Thread(
+                    target=self._worker, args=(stage, idx, active, stop), name=f"{stage}-{idx}", daemon=True
+                )
+                t.start()
+                threads.append(t)
+
+        done = threading.Event()
+        reporter = threading.Thread(target=self._reporter, args=(started, active, done), daemon=True)
+        reporter.start()
+        try:
+            for t in threads:
+                while t.is_alive():
+                    t.join(timeout=1.0)
+        except KeyboardInterrupt:
+            print("[orchestrator] interrupted, letting running tasks finish")
+            stop.set()
+            for t in threads:
+                t.join()
+        finally:
+            done.set()
+            reporter.join()
+        return self.report(started, active)
+
+    def report(self, started: float | None = None, stages: List[str] | None = None) -> Dict[str, object]:
+        stages = stages or list(STAGES)
+        final = stages[-1]
+        counts = self.queue.counts()
+        seconds = self.queue.stage_seconds()
+        for stage in stages:
+            c = counts[stage]
+            print(
+                f"[orchestrator] {stage} pending={c[PENDING]} running={c[RUNNING]} done={c[DONE]} "
+                f"dead={c[DEAD]} avg_sec={seconds.get(stage, 0.0):.1f}"
+            )
+
+        papers = self.queue.paper_count()
+        dead = self.queue.dead_paper_count()
+        remaining = max(0, papers - counts[final][DONE] - dead)
+        out: Dict[str, object] = {"papers": papers, "done": counts[final][DONE], "dead": dead, "remaining": remaining}
+        if started is not None:
+            elapsed = max(1e-6, time.time() - started)
+            finished = self.queue.done_since(final, started)
+            rate = finished / elapsed
+            eta = remaining / rate if rate else None
+            out.update({"elapsed_sec": elapsed, "papers_per_min": rate * 60, "eta_sec": eta})
+            print(
+                f"[orchestrator] throughput={rate * 60:.2f} papers/min finished={finished} "
+                f"remaining={remaining} dead={dead} elapsed={_fmt_duration(elapsed)} eta={_fmt_duration(eta)}"
+            )
+        return out
+
+    def _worker(self, stage: str, idx: int, active: List[str], stop: threading.Event) -> None:
+        runner = None
+        while not stop.is_set():
+            task = self.queue.claim(stage)
+            if task is None:
+                if not self.queue.has_active(active):
+                    return
+                stop.wait(self.config.queue.poll_interval_sec)
+                continue
+            t0 = time.perf_counter()
+            try:
+                if runner is None:
+                    runner = build_stage(stage, self.config)
+                runner.run(task)
+            except Exception as exc:
+                state = self.queue.fail(task, f"{type(exc).__name__}: {exc}")
+                print(
+                    f"[orchestrator] {stage}-{idx} failed paper={task.paper_hash} attempt={task.attempts} "
+                    f"state={state} error={type(exc).__name__}: {exc}"
+                )
+                continue
+            self.queue.complete(task)
+            print(f"[orchestrator] {stage}-{idx} done paper={task.paper_hash} sec={time.perf_counter() - t0:.1f}")
+
+    def _reporter(self, started: float, active: List[str], done: threading.Event) -> None:
+        while not done.wait(self.config.report.interval_sec):
+            self.report(started, active)
+
+
+def _expand_pdfs(paths: Iterable[str]) -> List[Path]:
+    out: List[Path] = []
+    for raw in paths:
+        path = Path(raw)
+        if path.is_dir():
+            out.extend(sorted(p for p in path.rglob("*.pdf") if p.is_file()))
+        elif path.is_file():
+            out.append(path)
+        else:
+            print(f"[orchestrator] skip missing path={raw}")
+    return out
+
+
+def _fmt_duration(seconds: float | None) -> str:
+    if seconds is None:
+        return "n/a"
+    seconds = int(seconds)
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    return f"{h}h{m:02d}m{s:02d}s" if h else f"{m}m{s:02d}s"
@@ -0,0 +1,23 @@
+﻿from __future__ import annotations
+
+import os
+from pathlib import Path
+
+
+def load_env(override: bool = True) -> None:
+    root = Path(__file__).resolve().parents[1]
+    env_path = root / ".env"
+    if not env_path.exists():
+        return
+
+    for line in env_path.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if "=" not in line:
+            continue
+        key, value = line.split("=", 1)
+        key = key.strip()
+        value = value.strip().strip("'\"")
+        if override or key not in os.environ:
+            os.environ[key] = value
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List
+
+from .config import QueueConfig
+
+STAGES = ("ingest", "structure", "items")
+NEXT_STAGE = {"ingest": "structure", "structure": "items", "items": None}
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+DEAD = "dead"
+STATES = (PENDING, RUNNING, DONE, DEAD)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    paper_hash TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    state TEXT NOT NULL,
+    pdf_path TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    available_at REAL NOT NULL DEFAULT 0,
+    started_at REAL,
+    finished_at REAL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (paper_hash, stage)
+);
+CREATE INDEX IF NOT EXISTS tasks_claim ON tasks (stage, state, available_at);
+"""
+
+
+@dataclass
+class Task:
+    paper_hash: str
+    stage: str
+    attempts: int
+    pdf_path: str | None = None
+
+
+@dataclass
+class PaperQueue:
+    config: QueueConfig = QueueConfig()
+
+    def __post_init__(self) -> None:
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.config.db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def enqueue(self, paper_hash: str, *, stage: str = "ingest", pdf_path: str | None = None) -> bool:
+        if stage not in STAGES:
+            raise ValueError(f"unknown stage: {stage}")
+        with self._lock:
+            known = self._conn.execute(
+                "SELECT 1 FROM tasks WHERE paper_hash = ? LIMIT 1", (paper_hash,)
+            ).fetchone()
+            if known:
+                return False
+            self._conn.execute(
+                "INSERT INTO tasks (paper_hash, stage, state, pdf_path, created_at) VALUES (?, ?, ?, ?, ?)",
+                (paper_hash, stage, PENDING, pdf_path, time.time()),
+            )
+            return True
+
+    def recover(self) -> int:
+        # Tasks left running by a crashed run go back to pending; the crash is not charged as an attempt.
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE tasks SET state = ?, attempts = MAX(attempts - 1, 0), started_at = NULL WHERE state = ?",
+                (PENDING, RUNNING),
+            )
+            return cur.rowcount
+
+    def claim(self, stage: str) -> Task | None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT paper_hash, attempts, pdf_path FROM tasks "
+                    "WHERE stage = ? AND state = ? AND available_at <= ? "
+                    "ORDER BY available_at, created_at LIMIT 1",
+                    (stage, PENDING, now),
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                self._conn.execute(
+                    "UPDATE tasks SET state = ?, attempts = attempts + 1, started_at = ? "
+                    "WHERE paper_hash = ? AND stage = ?",
+                    (RUNNING, now, row[0], stage),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return Task(paper_hash=row[0], stage=stage, attempts=row[1] + 1, pdf_path=row[2])
+
+    def complete(self, task: Task) -> None:
+        now = time.time()
+        nxt = NEXT_STAGE[task.stage]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "UPDATE tasks SET state = ?, finished_at = ?, last_error = NULL "
+                    "WHERE paper_hash = ? AND stage = ?",
+                    (DONE, now, task.paper_hash, task.stage),
+                )
+                if nxt:
+                    self._conn.execute(
+                        "INSERT INTO tasks (paper_hash, stage, state, pdf_path, created_at) VALUES (?, ?, ?, ?, ?) "
+                        "ON CONFLICT (paper_hash, stage) DO UPDATE SET state = excluded.state, attempts = 0, "
+                        "available_at = 0, last_error = NULL",
+                        (task.paper_hash, nxt, PENDING, task.pdf_path, now),
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def fail(self, task: Task, error: str) -> str:
+        now = time.time()
+        if task.attempts >= self.config.max_attempts:
+            state, available_at = DEAD, 0.0
+        else:
+            state = PENDING
+            available_at = now + self.config.retry_backoff_sec * (2 ** (task.attempts - 1))
+        with self._lock:
+            self._conn.execute(
+                "UPDATE tasks SET state = ?, last_error = ?, available_at = ?, finished_at = ? "
+                "WHERE paper_hash = ? AND stage = ?",
+                (state, error[:2000], available_at, now, task.paper_hash, task.stage),
+            )
+        return state
+
+    def retry_dead(self, stage: str | None = None) -> int:
+        sql = "UPDATE tasks SET state = ?, attempts = 0, available_at = 0 WHERE state = ?"
+        params: List[object] = [PENDING, DEAD]
+        if stage:
+            sql += " AND stage = ?"
+            params.append(stage)
+        with self._lock:
+            return self._conn.execute(sql, params).rowcount
+
+    def has_active(self, stages: Iterable[str] = STAGES) -> bool:
+        stages = list(stages)
+        if not stages:
+            return False
+        marks = ", ".join("?" for _ in stages)
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT 1 FROM tasks WHERE state IN (?, ?) AND stage IN ({marks}) LIMIT 1",
+                (PENDING, RUNNING, *stages),
+            ).fetchone()
+        return row is not None
+
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        out = {stage: {state: 0 for state in STATES} for stage in STAGES}
+        with self._lock:
+            rows = self._conn.execute("SELECT stage, state, COUNT(*) FROM tasks GROUP BY stage, state").fetchall()
+        for stage, state, n in rows:
+            out.setdefault(stage, {s: 0 for s in STATES})[state] = n
+        return out
+
+    def stage_seconds(self) -> Dict[str, float]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT stage, AVG(finished_at - started_at) FROM tasks "
+                "WHERE state = ? AND started_at IS NOT NULL GROUP BY stage",
+                (DONE,),
+            ).fetchall()
+        return {stage: float(avg or 0.0) for stage, avg in rows}
+
+    def paper_count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(DISTINCT paper_hash) FROM tasks").fetchone()[0]
+
+    def dead_paper_count(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(DISTINCT paper_hash) FROM tasks WHERE state = ?", (DEAD,)
+            ).fetchone()[0]
+
+    def done_since(self, stage: str, since: float) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM tasks WHERE stage = ? AND state = ? AND finished_at >= ?",
+                (stage, DONE, since),
+            ).fetchone()[0]
+
+    def dead(self) -> List[Dict[str, object]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT paper_hash, stage, attempts, last_error FROM tasks WHERE state = ? ORDER BY finished_at",
+                (DEAD,),
+            ).fetchall()
+        return [
+            {"paper_hash": h, "stage": stage, "attempts": attempts, "last_error": err}
+            for h, stage, attempts, err in rows
+        ]
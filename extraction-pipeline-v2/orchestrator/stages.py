@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+from .config import IngestConfig, OrchestratorConfig, StructureConfig
+from .queue import Task
+
+
+@dataclass
+class IngestStage:
+    config: IngestConfig = IngestConfig()
+
+    def __post_init__(self) -> None:
+        import requests
+
+        self.url = os.getenv(self.config.api_url_env, self.config.api_url_default).rstrip("/")
+        self.session = requests.Session()
+
+    def run(self, task: Task) -> None:
+        if not task.pdf_path:
+            raise ValueError("ingest task without pdf_path")
+        path = Path(task.pdf_path)
+        with path.open("rb") as f:
+            resp = self.session.post(
+                f"{self.url}/process",
+                files={"file": (path.name, f, "application/pdf")},
+                timeout=self.config.timeout_sec,
+            )
+        resp.raise_for_status()
+        paper_hash = resp.json().get("hash")
+        if paper_hash != task.paper_hash:
+            raise RuntimeError(f"pdf_to_infra returned hash={paper_hash} expected={task.paper_hash}")
+
+
+@dataclass
+class StructureStage:
+    config: StructureConfig = StructureConfig()
+
+    def __post_init__(self) -> None:
+        from structure_to_blocks.core import StructureToBlocks
+
+        self.runner = StructureToBlocks()
+
+    def run(self, task: Task) -> None:
+        kwargs = {
+            "store_astra": self.config.store_astra,
+            "store_qdrant": self.config.store_qdrant,
+            "incremental": self.config.incremental,
+        }
+        if self.config.run_async:
+            asyncio.run(self.runner.run_async(task.paper_hash, **kwargs))
+        else:
+            self.runner.run(task.paper_hash, **kwargs)
+
+
+@dataclass
+class ItemsStage:
+    def __post_init__(self) -> None:
+        from blocks_to_items.core import BlocksToItems
+
+        self.runner = BlocksToItems()
+
+    def run(self, task: Task) -> None:
+        self.runner.run(task.paper_hash)
+
+
+def build_stage(stage: str, config: OrchestratorConfig):
+    # One runner per worker thread, so clients/models load once per worker instead of once per paper.
+    if stage == "ingest":
+        return IngestStage(config.ingest)
+    if stage == "structure":
+        return StructureStage(config.structure)
+    if stage == "items":
+        return ItemsStage()
+    raise ValueError(f"unknown stage: {stage}")
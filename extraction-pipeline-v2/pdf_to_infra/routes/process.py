@@ -111,12 +111,13 @@ def process_pdf():
             }
         )
 
-        for name, rows in tables:
+        for name, ref, rows in tables:
             csv_bytes = rows_to_csv_bytes(rows)
             uploads.append(
                 {
                     "path": f"[{hash_key}]{name}",
                     "url": upload_file(hash_key, f"[{hash_key}]{name}", csv_bytes, "text/csv"),
+                    "ref": ref,
                 }
             )
 
@@ -1,9 +1,9 @@
 from __future__ import annotations
 
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 
-def extract_tables(docling_json: Dict[str, object]) -> List[Tuple[str, List[List[str]]]]:
+def extract_tables(docling_json: Dict[str, object]) -> List[Tuple[str, Optional[str], List[List[str]]]]:
     tables = []
     raw_tables = docling_json.get("tables") if isinstance(docling_json, dict) else None
     if not isinstance(raw_tables, list):
@@ -14,7 +14,7 @@ def extract_tables(docling_json: Dict[str, object]) -> List[Tuple[str, List[List
             continue
         rows = _rows_from_docling_table(t)
         if rows:
-            tables.append((f"table_{i:03d}.csv", rows))
+            tables.append((f"table_{i:03d}.csv", t.get("self_ref"), rows))
     print(f"[pdf_to_infra] extracted tables={len(tables)}")
     return tables
 
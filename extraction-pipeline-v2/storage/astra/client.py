@@ -6,9 +6,6 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional
 
-from cassandra.cluster import Cluster
-from cassandra.auth import PlainTextAuthProvider
-
 
 
 @dataclass(frozen=True)
@@ -50,6 +47,9 @@ class AstraClientFactory:
             if not client_id or not client_secret:
                 raise ValueError("Token JSON missing clientId/secret")
 
+        from cassandra.auth import PlainTextAuthProvider
+        from cassandra.cluster import Cluster
+
         auth = PlainTextAuthProvider(client_id, client_secret)
         cluster = Cluster(
             cloud={"secure_connect_bundle": bundle},
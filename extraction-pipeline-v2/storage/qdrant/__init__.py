@@ -1,5 +1,6 @@
 ﻿from __future__ import annotations
 
+from .bulk import BulkWriteConfig, BulkWriteStats, QdrantBulkWriter
 from .client import QdrantClientFactory, QdrantConfig
 
-__all__ = ["QdrantClientFactory", "QdrantConfig"]
+__all__ = ["BulkWriteConfig", "BulkWriteStats", "QdrantBulkWriter", "QdrantClientFactory", "QdrantConfig"]
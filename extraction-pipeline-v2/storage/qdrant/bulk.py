@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, List, Optional, Sequence
+
+if TYPE_CHECKING:
+    from qdrant_client import QdrantClient
+    from qdrant_client.models import PointStruct
+
+
+@dataclass(frozen=True)
+class BulkWriteConfig:
+    batch_size: int = 64
+    parallel: int = 4
+    wait: bool = False
+    max_retries: int = 3
+    retry_backoff_sec: float = 1.0
+
+
+@dataclass
+class BulkWriteStats:
+    collection: str
+    points: int = 0
+    batches: int = 0
+    retried_batches: int = 0
+    seconds: float = 0.0
+
+    @property
+    def points_per_sec(self) -> float:
+        return self.points / self.seconds if self.seconds > 0 else 0.0
+
+
+class QdrantBulkWriter:
+    def __init__(self, client: QdrantClient, config: Optional[BulkWriteConfig] = None) -> None:
+        self.client = client
+        self.config = config or BulkWriteConfig()
+
+    def upsert(self, collection_name: str, points: Sequence[PointStruct]) -> BulkWriteStats:
+        stats = BulkWriteStats(collection=collection_name, points=len(points))
+        if not points:
+            return stats
+
+        size = max(1, int(self.config.batch_size))
+        batches = [list(points[i : i + size]) for i in range(0, len(points), size)]
+        stats.batches = len(batches)
+        start = time.perf_counter()
+
+        if self.config.wait:
+            self._write_all(collection_name, batches, list(range(len(batches))), True, stats)
+        else:
+            # Fire every batch without waiting for indexing, then wait on a barrier.
+            self._write_all(collection_name, batches, list(range(len(batches))), False, stats)
+            self._barrier(collection_name)
+
+        stats.seconds = time.perf_counter() - start
+        print(
+            f"[qdrant_bulk] collection={collection_name} points={stats.points} batches={stats.batches} "
+            f"retried={stats.retried_batches} seconds={stats.seconds:.2f} rate={stats.points_per_sec:.1f}/s"
+        )
+        return stats
+
+    def _barrier(self, collection_name: str) -> None:
+        from qdrant_client.models import Filter, FilterSelector, HasIdCondition
+
+        # A filter-based delete that matches nothing is sent to every shard, and each
+        # shard applies its updates in order, so once it returns with wait=True all
+        # acknowledged batches are applied on every shard (a wait=True upsert only
+        # covers the shards its own points land on).
+        selector = FilterSelector(filter=Filter(must=[HasIdCondition(has_id=[])]))
+        attempt = 0
+        while True:
+            try:
+                self.client.delete(collection_name=collection_name, points_selector=selector, wait=True)
+                return
+            except Exception as exc:
+                attempt += 1
+                if attempt > self.config.max_retries:
+                    raise RuntimeError(
+                        f"Qdrant write barrier on {collection_name} failed "
+                        f"after {self.config.max_retries} retries: {exc!r}"
+                    ) from exc
+                time.sleep(self.config.retry_backoff_sec * (2 ** (attempt - 1)))
+
+    def _write_all(
+        self,
+        collection_name: str,
+        batches: List[List[PointStruct]],
+        indexes: List[int],
+        wait: bool,
+        stats: BulkWriteStats,
+    ) -> None:
+        pending = indexes
+        attempt = 0
+        while pending:
+            failed = self._write_round(collection_name, batches, pending, wait)
+            if not failed:
+                return
+            attempt += 1
+            if attempt > self.config.max_retries:
+                raise RuntimeError(
+                    f"Qdrant upsert to {collection_name} failed for {len(failed)} batch(es) "
+                    f"after {self.config.max_retries} retries: {failed[0][1]!r}"
+                )
+            stats.retried_batches += len(failed)
+            time.sleep(self.config.retry_backoff_sec * (2 ** (attempt - 1)))
+            pending = [i for i, _ in failed]
+
+    def _write_round(
+        self,
+        collection_name: str,
+        batches: List[List[PointStruct]],
+        indexes: List[int],
+        wait: bool,
+    ) -> List[tuple[int, Exception]]:
+        def send(i: int) -> Optional[Exception]:
+            try:
+                self.client.upsert(collection_name=collection_name, points=batches[i], wait=wait)
+            except Exception as exc:
+                return exc
+            return None
+
+        workers = max(1, min(int(self.config.parallel), len(indexes)))
+        if workers == 1:
+            results = [send(i) for i in indexes]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(send, indexes))
+        return [(i, exc) for i, exc in zip(indexes, results) if exc is not None]
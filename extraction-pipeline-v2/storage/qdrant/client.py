@@ -2,9 +2,10 @@
 
 import os
 from dataclasses import dataclass
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
-from qdrant_client import QdrantClient
+if TYPE_CHECKING:
+    from qdrant_client import QdrantClient
 
 
 @dataclass(frozen=True)
@@ -36,6 +37,8 @@ class QdrantClientFactory:
             except ValueError:
                 pass
 
+        from qdrant_client import QdrantClient
+
         return QdrantClient(
             url=url,
             api_key=api_key,
@@ -1,5 +1,12 @@
 from __future__ import annotations
 
-from .core import StructureToBlocks
-
 __all__ = ["StructureToBlocks"]
+
+
+def __getattr__(name: str):
+    # Resolved on first access so `python -m structure_to_blocks --help` does not import core.
+    if name == "StructureToBlocks":
+        from .core import StructureToBlocks
+
+        return StructureToBlocks
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,9 +1,9 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
 import json
 
-from .core import StructureToBlocks
 from .env import load_env
 load_env()
 
@@ -12,14 +12,32 @@ def main() -> None:
     parser.add_argument("--hash", required=True, help="paper hash key")
     parser.add_argument("--no-astra", action="store_true", help="Skip Astra storage")
     parser.add_argument("--no-qdrant", action="store_true", help="Skip Qdrant storage")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only re-embed changed blocks (rows are always rewritten), reuse unchanged summaries, delete stale rows",
+    )
+    parser.add_argument(
+        "--async",
+        dest="run_async",
+        action="store_true",
+        help="Overlap block embedding/upserts, Astra block writes and section summarization",
+    )
     parser.add_argument("--out", help="Optional path to write normalized JSON")
     args = parser.parse_args()
 
-    out = StructureToBlocks().run(
-        args.hash,
-        store_astra=not args.no_astra,
-        store_qdrant=not args.no_qdrant,
-    )
+    from .core import StructureToBlocks
+
+    runner = StructureToBlocks()
+    kwargs = {
+        "store_astra": not args.no_astra,
+        "store_qdrant": not args.no_qdrant,
+        "incremental": args.incremental,
+    }
+    if args.run_async:
+        out = asyncio.run(runner.run_async(args.hash, **kwargs))
+    else:
+        out = runner.run(args.hash, **kwargs)
     if args.out:
         with open(args.out, "w", encoding="utf-8") as f:
             json.dump(out, f, ensure_ascii=False, indent=2)
@@ -10,6 +10,7 @@ class EmbeddingConfig:
     base_url_default: str = "https://openrouter.ai/api/v1"
     model: str = "baai/bge-m3"
     batch_size: int = 16
+    encoding_format: str = "base64"
     timeout_sec: int = 120
 
 
@@ -32,7 +33,15 @@ class StorageConfig:
     qdrant_block_chunking: bool = False
     qdrant_block_max_chars: int = 1200
     qdrant_block_overlap_sentences: int = 1
+    qdrant_block_chunk_batch_size: int = 64
+    qdrant_block_chunk_processes: int = 1
+    qdrant_table_serialization: bool = True
+    qdrant_table_max_chars: int = 1200
+    qdrant_table_rows_per_chunk: int = 20
     qdrant_upsert_batch_size: int = 64
+    qdrant_upsert_parallel: int = 4
+    qdrant_upsert_wait: bool = False
+    qdrant_upsert_max_retries: int = 3
 
 
 @dataclass(frozen=True)
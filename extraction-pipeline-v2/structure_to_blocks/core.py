@@ -1,23 +1,29 @@
 from __future__ import annotations
 
+import asyncio
 import json
+import sys
+import time
 import uuid
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
-
-import requests
-import spacy
-from qdrant_client.models import PointStruct
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
 from storage.astra.client import AstraClientFactory
+from storage.qdrant.bulk import BulkWriteConfig, QdrantBulkWriter
 from storage.qdrant.client import QdrantClientFactory
 from storage.papers_data import fetch_paper_data
 
 from structure_to_blocks.config import StructureToBlocksConfig
 from structure_to_blocks.embedder import Embedder
-from structure_to_blocks.hashing import text_hash
+from structure_to_blocks.hashing import text_hash, vector_id
 from structure_to_blocks.summarizer import SectionSummarizer
+from structure_to_blocks.tables import TableIndex, table_text_chunks
+
+if TYPE_CHECKING:
+    from qdrant_client.models import PointStruct
 
+# spacy, requests and qdrant_client.models dominate import time; they are
+# imported inside the functions that need them.
 
 _NLP = None
 
@@ -25,6 +31,8 @@ _NLP = None
 def _get_nlp():
     global _NLP
     if _NLP is None:
+        import spacy
+
         nlp = spacy.blank("en")
         nlp.add_pipe("sentencizer")
         _NLP = nlp
@@ -32,17 +40,36 @@ def _get_nlp():
 
 
 def _chunk_sentences(text: str, max_chars: int, overlap_sentences: int) -> List[str]:
-    if not text:
-        return []
+    return _chunk_texts([text], max_chars, overlap_sentences)[0]
+
+
+def _chunk_texts(
+    texts: List[str],
+    max_chars: int,
+    overlap_sentences: int,
+    *,
+    batch_size: int = 64,
+    n_process: int = 1,
+) -> List[List[str]]:
     if max_chars <= 0:
-        return [text]
+        return [[t] if t else [] for t in texts]
 
+    # Only oversized texts need sentence splitting; they go through nlp.pipe
+    # together so spaCy can batch (and optionally fan out to processes).
+    out: List[List[str]] = [[t] if t else [] for t in texts]
+    oversized = [i for i, t in enumerate(texts) if t and len(t) > max_chars]
+    if not oversized:
+        return out
     nlp = _get_nlp()
-    doc = nlp(text)
-    sentences = [s.text.strip() for s in doc.sents if s.text.strip()]
-    if not sentences:
-        return [text]
+    docs = nlp.pipe((texts[i] for i in oversized), batch_size=max(1, batch_size), n_process=max(1, n_process))
+    for i, doc in zip(oversized, docs):
+        sentences = [s.text.strip() for s in doc.sents if s.text.strip()]
+        if sentences:
+            out[i] = _pack_sentences(sentences, max_chars, overlap_sentences)
+    return out
 
+
+def _pack_sentences(sentences: List[str], max_chars: int, overlap_sentences: int) -> List[str]:
     chunks: List[str] = []
     current: List[str] = []
     current_len = 0
@@ -66,12 +93,176 @@ def _chunk_sentences(text: str, max_chars: int, overlap_sentences: int) -> List[
     return chunks
 
 
+@dataclass
+class _PriorState:
+    block_hashes: Dict[str, str]
+    sections: Dict[str, Dict[str, object]]
+
+
+@dataclass
+class _QdrantState:
+    block_hashes: Dict[str, str]
+    section_hashes: Dict[str, str]
+    # block_id -> stored (section_id, type, block_index), to refresh payloads of unchanged text
+    block_payloads: Dict[str, Tuple[object, ...]]
+    # block_id -> layout fingerprint its points were written with ("" for older points)
+    block_layouts: Dict[str, str]
+
+
+@dataclass
+class _EmbedUnit:
+    block: Dict[str, object]
+    text: str
+    chunk_index: int
+    chunk_count: int
+
+
+@dataclass
+class _Prepared:
+    paper_uuid: str
+    metadata: Dict[str, object]
+    sections: List[Dict[str, object]]
+    blocks: List[Dict[str, object]]
+    prior: Optional[_PriorState]
+
+
 @dataclass
 class StructureToBlocks:
     config: StructureToBlocksConfig = StructureToBlocksConfig()
 
-    def run(self, paper_hash: str, *, store_astra: bool = True, store_qdrant: bool = True) -> Dict[str, object]:
+    def run(
+        self,
+        paper_hash: str,
+        *,
+        store_astra: bool = True,
+        store_qdrant: bool = True,
+        incremental: bool = False,
+    ) -> Dict[str, object]:
         print(f"[structure_to_blocks] start paper_hash={paper_hash}")
+        prep = self._prepare(paper_hash, incremental=incremental)
+
+        print("[structure_to_blocks] summarizing sections")
+        sections = _attach_section_summaries(prep.sections, self._summarize(prep))
+
+        print("[structure_to_blocks] building paper summary (abstract)")
+        paper = _build_paper_summary(paper_hash, prep.paper_uuid, sections, prep.blocks, prep.metadata)
+        out = {
+            "paper": paper,
+            "sections": sections,
+            "blocks": prep.blocks,
+        }
+
+        if store_astra:
+            print("[structure_to_blocks] storing to Astra")
+            self._store_astra(paper_hash, paper, sections, prep.blocks, prior=prep.prior)
+        if store_qdrant:
+            print("[structure_to_blocks] storing to Qdrant")
+            self._store_qdrant(paper_hash, paper, sections, prep.blocks, incremental=incremental)
+        print("[structure_to_blocks] done")
+        return out
+
+    async def run_async(
+        self,
+        paper_hash: str,
+        *,
+        store_astra: bool = True,
+        store_qdrant: bool = True,
+        incremental: bool = False,
+    ) -> Dict[str, object]:
+        # Same result as run(), but block embedding/upserts, Astra block writes and
+        # section summarization run as concurrent branches. Sections and the paper
+        # row are written once the summaries land.
+        print(f"[structure_to_blocks] start (async) paper_hash={paper_hash}")
+        start = time.perf_counter()
+        prep = await asyncio.to_thread(self._prepare, paper_hash, incremental=incremental)
+        blocks = prep.blocks
+
+        cluster = session = None
+        client = writer = qdrant_state = None
+        embedder = Embedder(self.config.embedding)
+        if store_astra:
+            cluster, session = await asyncio.to_thread(AstraClientFactory().create)
+        if store_qdrant:
+            client = QdrantClientFactory().create()
+            writer = self._bulk_writer(client)
+            if incremental:
+                qdrant_state = await asyncio.to_thread(self._load_qdrant_state, client, paper_hash)
+
+        async def timed(name: str, coro):
+            t0 = time.perf_counter()
+            result = await coro
+            print(f"[structure_to_blocks] branch={name} seconds={time.perf_counter() - t0:.2f}")
+            return result
+
+        async def qdrant_blocks() -> None:
+            layout = self._layout_fingerprint()
+            to_embed = _blocks_to_embed(blocks, qdrant_state, layout)
+            units = await asyncio.to_thread(self._embedding_units, to_embed)
+            step = max(1, self.config.embedding.batch_size * max(1, self.config.storage.qdrant_upsert_parallel))
+            upserts = []
+            written: List[PointStruct] = []
+            try:
+                for i in range(0, len(units), step):
+                    part = units[i : i + step]
+                    vectors = await asyncio.to_thread(embedder.embed, [u.text for u in part])
+                    points = _block_points(paper_hash, part, vectors, layout)
+                    written.extend(points)
+                    # upsert this slice while the next one is being embedded
+                    upsert = asyncio.to_thread(writer.upsert, self.config.storage.qdrant_blocks, points)
+                    upserts.append(asyncio.create_task(upsert))
+            except BaseException:
+                # upserts already started still run in their threads; let them finish first
+                await asyncio.gather(*upserts, return_exceptions=True)
+                raise
+            await _gather_all(*upserts)
+            if self._splits_blocks() or qdrant_state:
+                await asyncio.to_thread(self._delete_superseded_points, client, paper_hash, written)
+            if qdrant_state:
+                await asyncio.to_thread(self._refresh_block_payloads, client, paper_hash, blocks, qdrant_state)
+
+        async def sections_and_paper() -> Dict[str, object]:
+            summaries = await asyncio.to_thread(self._summarize, prep)
+            sections = _attach_section_summaries(prep.sections, summaries)
+            paper = _build_paper_summary(paper_hash, prep.paper_uuid, sections, blocks, prep.metadata)
+            writes = []
+            if store_astra:
+                writes.append(asyncio.to_thread(self._write_astra_sections, session, paper_hash, sections))
+                writes.append(asyncio.to_thread(self._write_astra_paper, session, paper_hash, paper))
+            if store_qdrant:
+                writes.append(
+                    asyncio.to_thread(self._write_qdrant_sections, writer, embedder, paper_hash, sections, qdrant_state)
+                )
+                writes.append(asyncio.to_thread(self._write_qdrant_paper, writer, embedder, paper_hash, paper))
+            await _gather_all(*writes)
+            return {"paper": paper, "sections": sections}
+
+        try:
+            branches = [timed("sections", sections_and_paper())]
+            if store_astra:
+                astra_blocks = asyncio.to_thread(self._write_astra_blocks, session, paper_hash, blocks)
+                branches.append(timed("astra_blocks", astra_blocks))
+            if store_qdrant:
+                branches.append(timed("qdrant_blocks", qdrant_blocks()))
+            # every branch runs to completion before the session can be shut down below
+            results = await _gather_all(*branches)
+            done = results[0]
+
+            if store_astra and prep.prior:
+                await asyncio.to_thread(
+                    self._delete_astra_stale, session, paper_hash, done["sections"], blocks, prep.prior
+                )
+            if store_qdrant and qdrant_state:
+                await asyncio.to_thread(
+                    self._delete_qdrant_stale, client, paper_hash, done["sections"], blocks, qdrant_state
+                )
+        finally:
+            if cluster is not None:
+                cluster.shutdown()
+
+        print(f"[structure_to_blocks] done seconds={time.perf_counter() - start:.2f}")
+        return {"paper": done["paper"], "sections": done["sections"], "blocks": blocks}
+
+    def _prepare(self, paper_hash: str, *, incremental: bool = False) -> _Prepared:
         paper_data = fetch_paper_data(paper_hash)
         if not paper_data:
             raise ValueError("paper_hash not found in papers_data")
@@ -95,32 +286,51 @@ class StructureToBlocks:
         paper_uuid = _paper_uuid(paper_hash)
         print(f"[structure_to_blocks] paper_uuid={paper_uuid}")
         print("[structure_to_blocks] building blocks/sections from structure")
-        table_texts = _load_table_texts(uploads, paper_hash)
-        sections, blocks = _build_blocks_from_structure(structure, paper_hash, table_texts)
+        tables = TableIndex.from_uploads(uploads, paper_hash)
+        sections, blocks = _build_blocks_from_structure(structure, paper_hash, tables)
+        print(f"[structure_to_blocks] tables available={len(tables.urls)} downloaded={tables.downloaded}")
         print(f"[structure_to_blocks] built sections={len(sections)} blocks={len(blocks)}")
-        print("[structure_to_blocks] summarizing sections")
-        section_summary_map = SectionSummarizer(self.config).summarize(blocks, sections)
-        if sections:
-            pct = (len(section_summary_map) / max(1, len(sections))) * 100.0
-            print(f"[structure_to_blocks] summaries={len(section_summary_map)} ({pct:.1f}%)")
-        sections = _attach_section_summaries(sections, section_summary_map)
 
-        print("[structure_to_blocks] building paper summary (abstract)")
-        paper = _build_paper_summary(paper_hash, paper_uuid, sections, blocks, metadata)
-        out = {
-            "paper": paper,
-            "sections": sections,
-            "blocks": blocks,
-        }
+        prior = None
+        if incremental:
+            print("[structure_to_blocks] loading existing blocks/sections (incremental)")
+            prior = self._load_prior_state(paper_hash)
+            print(
+                f"[structure_to_blocks] existing blocks={len(prior.block_hashes)} "
+                f"sections={len(prior.sections)}"
+            )
+        return _Prepared(paper_uuid=paper_uuid, metadata=metadata, sections=sections, blocks=blocks, prior=prior)
+
+    def _summarize(self, prep: _Prepared) -> Dict[str, str]:
+        sections = prep.sections
+        summaries = _reusable_summaries(sections, prep.blocks, prep.prior) if prep.prior else {}
+        pending = [s for s in sections if s.get("section_id") not in summaries]
+        if prep.prior:
+            print(f"[structure_to_blocks] reused summaries={len(summaries)} pending={len(pending)}")
+        if pending:
+            summaries.update(SectionSummarizer(self.config).summarize(prep.blocks, pending))
+        if sections:
+            pct = (len(summaries) / max(1, len(sections))) * 100.0
+            print(f"[structure_to_blocks] summaries={len(summaries)} ({pct:.1f}%)")
+        return summaries
 
-        if store_astra:
-            print("[structure_to_blocks] storing to Astra")
-            self._store_astra(paper_hash, paper, sections, blocks)
-        if store_qdrant:
-            print("[structure_to_blocks] storing to Qdrant")
-            self._store_qdrant(paper_hash, paper, sections, blocks)
-        print("[structure_to_blocks] done")
-        return out
+    def _load_prior_state(self, paper_id: str) -> _PriorState:
+        cfg = self.config.storage
+        cluster, session = AstraClientFactory().create()
+        try:
+            rows = session.execute(
+                f"SELECT block_id, text_hash FROM {cfg.astra_blocks} WHERE paper_id = %s",
+                (paper_id,),
+            )
+            block_hashes = {r.block_id: r.text_hash for r in rows}
+            rows = session.execute(
+                f"SELECT section_id, summary, block_ids FROM {cfg.astra_sections} WHERE paper_id = %s",
+                (paper_id,),
+            )
+            sections = {r.section_id: {"summary": r.summary, "block_ids": list(r.block_ids or [])} for r in rows}
+        finally:
+            cluster.shutdown()
+        return _PriorState(block_hashes=block_hashes, sections=sections)
 
     def _store_astra(
         self,
@@ -128,115 +338,310 @@ class StructureToBlocks:
         paper: Dict[str, object],
         sections: List[Dict[str, object]],
         blocks: List[Dict[str, object]],
+        *,
+        prior: Optional[_PriorState] = None,
     ) -> None:
-        cfg = self.config.storage
         cluster, session = AstraClientFactory().create()
         try:
-            for b in blocks:
-                block_id = str(b.get("block_id"))
-                section_id = str(b.get("section_id"))
-                text = str(b.get("text") or "")
-                session.execute(
-                    f"INSERT INTO {cfg.astra_blocks} "
-                    "(paper_id, block_id, section_id, type, section_path, text, text_hash, source, "
-                    "block_index, section_index, flags) VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)",
-                    (
-                        paper_id,
-                        block_id,
-                        section_id,
-                        b.get("type"),
-                        b.get("section_path") or [],
-                        text,
-                        text_hash(text),
-                        json.dumps(b.get("source") or {}),
-                        b.get("block_index"),
-                        b.get("section_index"),
-                        json.dumps(b.get("flags") or {}),
-                    ),
-                )
-
-            for s in sections:
-                section_id = str(s.get("section_id"))
-                section_title = s.get("title") or s.get("section_title")
-                summary = s.get("summary") or ""
-                session.execute(
-                    f"INSERT INTO {cfg.astra_sections} "
-                    "(paper_id, section_id, section_title, summary, summary_chars, source_block_count, block_ids) "
-                    "VALUES (%s,%s,%s,%s,%s,%s,%s)",
-                    (
-                        paper_id,
-                        section_id,
-                        section_title,
-                        summary,
-                        len(summary),
-                        s.get("source_block_count"),
-                        s.get("block_ids") or [],
-                    ),
-                )
-
-            if paper:
-                summary = paper.get("summary") or ""
-                session.execute(
-                    f"INSERT INTO {cfg.astra_papers} "
-                    "(paper_id, paper_uuid, title, authors, summary, summary_chars, source_section_count, metadata) "
-                    "VALUES (%s,%s,%s,%s,%s,%s,%s,%s)",
-                    (
-                        paper_id,
-                        paper.get("paper_uuid"),
-                        paper.get("title"),
-                        paper.get("authors") or [],
-                        summary,
-                        len(summary),
-                        paper.get("source_section_count"),
-                        json.dumps(paper.get("metadata") or {}),
-                    ),
-                )
+            self._write_astra_blocks(session, paper_id, blocks)
+            self._write_astra_sections(session, paper_id, sections)
+            self._write_astra_paper(session, paper_id, paper)
+            if prior:
+                self._delete_astra_stale(session, paper_id, sections, blocks, prior)
         finally:
             cluster.shutdown()
 
+    def _write_astra_blocks(self, session, paper_id: str, blocks: List[Dict[str, object]]) -> None:
+        # Rows are always rewritten, also on incremental runs: type, section_path, source
+        # and indexes can change without the text changing. Only embedding is skipped by hash.
+        cfg = self.config.storage
+        for b in blocks:
+            block_id = str(b.get("block_id"))
+            section_id = str(b.get("section_id"))
+            text = str(b.get("text") or "")
+            b_hash = str(b.get("text_hash") or text_hash(text))
+            session.execute(
+                f"INSERT INTO {cfg.astra_blocks} "
+                "(paper_id, block_id, section_id, type, section_path, text, text_hash, source, "
+                "block_index, section_index, flags) VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)",
+                (
+                    paper_id,
+                    block_id,
+                    section_id,
+                    b.get("type"),
+                    b.get("section_path") or [],
+                    text,
+                    b_hash,
+                    json.dumps(b.get("source") or {}),
+                    b.get("block_index"),
+                    b.get("section_index"),
+                    json.dumps(b.get("flags") or {}),
+                ),
+            )
+
+    def _write_astra_sections(self, session, paper_id: str, sections: List[Dict[str, object]]) -> None:
+        cfg = self.config.storage
+        for s in sections:
+            section_id = str(s.get("section_id"))
+            section_title = s.get("title") or s.get("section_title")
+            summary = s.get("summary") or ""
+            session.execute(
+                f"INSERT INTO {cfg.astra_sections} "
+                "(paper_id, section_id, section_title, summary, summary_chars, source_block_count, block_ids) "
+                "VALUES (%s,%s,%s,%s,%s,%s,%s)",
+                (
+                    paper_id,
+                    section_id,
+                    section_title,
+                    summary,
+                    len(summary),
+                    s.get("source_block_count"),
+                    s.get("block_ids") or [],
+                ),
+            )
+
+    def _write_astra_paper(self, session, paper_id: str, paper: Dict[str, object]) -> None:
+        if not paper:
+            return
+        cfg = self.config.storage
+        summary = paper.get("summary") or ""
+        session.execute(
+            f"INSERT INTO {cfg.astra_papers} "
+            "(paper_id, paper_uuid, title, authors, summary, summary_chars, source_section_count, metadata) "
+            "VALUES (%s,%s,%s,%s,%s,%s,%s,%s)",
+            (
+                paper_id,
+                paper.get("paper_uuid"),
+                paper.get("title"),
+                paper.get("authors") or [],
+                summary,
+                len(summary),
+                paper.get("source_section_count"),
+                json.dumps(paper.get("metadata") or {}),
+            ),
+        )
+
+    def _delete_astra_stale(
+        self,
+        session,
+        paper_id: str,
+        sections: List[Dict[str, object]],
+        blocks: List[Dict[str, object]],
+        prior: _PriorState,
+    ) -> None:
+        cfg = self.config.storage
+        stale_blocks = set(prior.block_hashes) - {str(b.get("block_id")) for b in blocks}
+        stale_sections = set(prior.sections) - {str(s.get("section_id")) for s in sections}
+        for chunk in _chunk(sorted(stale_blocks), 50):
+            placeholders = ", ".join(["%s"] * len(chunk))
+            session.execute(
+                f"DELETE FROM {cfg.astra_blocks} WHERE paper_id = %s AND block_id IN ({placeholders})",
+                [paper_id] + chunk,
+            )
+        for chunk in _chunk(sorted(stale_sections), 50):
+            placeholders = ", ".join(["%s"] * len(chunk))
+            session.execute(
+                f"DELETE FROM {cfg.astra_sections} WHERE paper_id = %s AND section_id IN ({placeholders})",
+                [paper_id] + chunk,
+            )
+        print(f"[structure_to_blocks] astra deleted stale blocks={len(stale_blocks)} sections={len(stale_sections)}")
+
+    def _bulk_writer(self, client) -> QdrantBulkWriter:
+        cfg = self.config.storage
+        return QdrantBulkWriter(
+            client,
+            BulkWriteConfig(
+                batch_size=cfg.qdrant_upsert_batch_size,
+                parallel=cfg.qdrant_upsert_parallel,
+                wait=cfg.qdrant_upsert_wait,
+                max_retries=cfg.qdrant_upsert_max_retries,
+            ),
+        )
+
     def _store_qdrant(
         self,
         paper_id: str,
         paper: Dict[str, object],
         sections: List[Dict[str, object]],
         blocks: List[Dict[str, object]],
+        *,
+        incremental: bool = False,
     ) -> None:
-        cfg = self.config.storage
         client = QdrantClientFactory().create()
+        writer = self._bulk_writer(client)
         embedder = Embedder(self.config.embedding)
+        state = self._load_qdrant_state(client, paper_id) if incremental else None
+
+        layout = self._layout_fingerprint()
+        units = self._embedding_units(_blocks_to_embed(blocks, state, layout))
+        vectors = embedder.embed([u.text for u in units])
+        points = _block_points(paper_id, units, vectors, layout)
+        writer.upsert(self.config.storage.qdrant_blocks, points)
+        if self._splits_blocks() or state:
+            self._delete_superseded_points(client, paper_id, points)
+        if state:
+            self._refresh_block_payloads(client, paper_id, blocks, state)
+        self._write_qdrant_sections(writer, embedder, paper_id, sections, state)
+        self._write_qdrant_paper(writer, embedder, paper_id, paper)
+        if state:
+            self._delete_qdrant_stale(client, paper_id, sections, blocks, state)
+
+    def _embedding_units(self, blocks: List[Dict[str, object]]) -> List[_EmbedUnit]:
+        cfg = self.config.storage
+        start = time.perf_counter()
+        chunked: List[List[str]] = [[str(b.get("text") or "")] for b in blocks]
+
+        if cfg.qdrant_table_serialization:
+            for i, b in enumerate(blocks):
+                if b.get("type") == "table":
+                    chunked[i] = table_text_chunks(
+                        chunked[i][0], cfg.qdrant_table_max_chars, cfg.qdrant_table_rows_per_chunk
+                    )
+
+        if cfg.qdrant_block_chunking:
+            idx = [i for i, b in enumerate(blocks) if b.get("type") != "table"]
+            split = _chunk_texts(
+                [chunked[i][0] for i in idx],
+                cfg.qdrant_block_max_chars,
+                cfg.qdrant_block_overlap_sentences,
+                batch_size=cfg.qdrant_block_chunk_batch_size,
+                n_process=cfg.qdrant_block_chunk_processes,
+            )
+            for i, chunks in zip(idx, split):
+                chunked[i] = chunks
+
+        units: List[_EmbedUnit] = []
+        for b, chunks in zip(blocks, chunked):
+            for i, chunk in enumerate(chunks):
+                units.append(_EmbedUnit(block=b, text=chunk, chunk_index=i, chunk_count=len(chunks)))
+        if self._splits_blocks():
+            split_count = sum(1 for c in chunked if len(c) > 1)
+            print(
+                f"[structure_to_blocks] chunked blocks={len(blocks)} split={split_count} points={len(units)} "
+                f"seconds={time.perf_counter() - start:.2f}"
+            )
+        return units
+
+    def _splits_blocks(self) -> bool:
+        cfg = self.config.storage
+        return cfg.qdrant_block_chunking or cfg.qdrant_table_serialization
+
+    def _layout_fingerprint(self) -> str:
+        # Settings that decide which points a block gets and what text they embed;
+        # batch size / process count only change how the chunking runs.
+        cfg = self.config.storage
+        parts = [
+            f"chunking={cfg.qdrant_block_chunking}",
+            f"table_serialization={cfg.qdrant_table_serialization}",
+            f"table_max_chars={cfg.qdrant_table_max_chars}",
+            f"table_rows_per_chunk={cfg.qdrant_table_rows_per_chunk}",
+        ]
+        if cfg.qdrant_block_chunking:
+            parts += [
+                f"block_max_chars={cfg.qdrant_block_max_chars}",
+                f"block_overlap_sentences={cfg.qdrant_block_overlap_sentences}",
+            ]
+        return text_hash(";".join(parts))[:16]
+
+    def _delete_superseded_points(self, client, paper_id: str, points: List[PointStruct]) -> None:
+        from qdrant_client.models import FieldCondition, Filter, FilterSelector, HasIdCondition, MatchAny, MatchValue
+
+        # Rewritten blocks may have had a different number of chunk points before;
+        # drop any point of those blocks that was not part of this write.
+        ids_by_block: Dict[str, List[str]] = {}
+        for p in points:
+            ids_by_block.setdefault(str(p.payload["block_id"]), []).append(str(p.id))
+        block_ids = sorted(ids_by_block)
+        for chunk in _chunk(block_ids, 256):
+            client.delete(
+                collection_name=self.config.storage.qdrant_blocks,
+                points_selector=FilterSelector(
+                    filter=Filter(
+                        must=[
+                            FieldCondition(key="paper_id", match=MatchValue(value=paper_id)),
+                            FieldCondition(key="block_id", match=MatchAny(any=chunk)),
+                        ],
+                        must_not=[HasIdCondition(has_id=[pid for bid in chunk for pid in ids_by_block[bid]])],
+                    )
+                ),
+            )
+
+    def _load_qdrant_state(self, client, paper_id: str) -> _QdrantState:
+        cfg = self.config.storage
+        block_hashes: Dict[str, str] = {}
+        section_hashes: Dict[str, str] = {}
+        block_payloads: Dict[str, Tuple[object, ...]] = {}
+        block_layouts: Dict[str, str] = {}
+        fields = ["block_id", "text_hash", "layout", *_PAYLOAD_FIELDS]
+        for r in _scroll_paper_payloads(client, cfg.qdrant_blocks, paper_id, fields):
+            payload = r.payload or {}
+            if payload.get("block_id"):
+                block_id = str(payload["block_id"])
+                block_hashes[block_id] = str(payload.get("text_hash") or "")
+                block_payloads[block_id] = tuple(payload.get(k) for k in _PAYLOAD_FIELDS)
+                block_layouts[block_id] = str(payload.get("layout") or "")
+        for r in _scroll_paper_payloads(client, cfg.qdrant_sections, paper_id, ["section_id", "summary_hash"]):
+            payload = r.payload or {}
+            if payload.get("section_id"):
+                section_hashes[str(payload["section_id"])] = str(payload.get("summary_hash") or "")
+        return _QdrantState(
+            block_hashes=block_hashes,
+            section_hashes=section_hashes,
+            block_payloads=block_payloads,
+            block_layouts=block_layouts,
+        )
+
+    def _refresh_block_payloads(self, client, paper_id: str, blocks: List[Dict[str, object]], state: _QdrantState) -> None:
+        from qdrant_client.models import FieldCondition, Filter, FilterSelector, MatchValue
 
-        texts: List[str] = []
-        block_meta = []
+        # Unchanged text keeps its vectors; only the payload of every chunk point is updated.
+        updated = 0
+        layout = self._layout_fingerprint()
         for b in blocks:
-            text = str(b.get("text") or "")
-            if not text:
+            block_id = str(b.get("block_id"))
+            stored = state.block_payloads.get(block_id)
+            if stored is None or state.block_hashes.get(block_id) != _block_hash(b):
                 continue
-            texts.append(text)
-            block_meta.append(b)
+            if state.block_layouts.get(block_id) != layout:
+                continue  # re-embedded, so its points already carry the new payload
+            payload = _block_payload_fields(b)
+            if stored == tuple(payload[k] for k in _PAYLOAD_FIELDS):
+                continue
+            client.set_payload(
+                collection_name=self.config.storage.qdrant_blocks,
+                payload=payload,
+                points=FilterSelector(
+                    filter=Filter(
+                        must=[
+                            FieldCondition(key="paper_id", match=MatchValue(value=paper_id)),
+                            FieldCondition(key="block_id", match=MatchValue(value=block_id)),
+                        ]
+                    )
+                ),
+            )
+            updated += 1
+        print(f"[structure_to_blocks] qdrant block payloads refreshed={updated}")
+
+    def _write_qdrant_sections(
+        self,
+        writer: QdrantBulkWriter,
+        embedder: Embedder,
+        paper_id: str,
+        sections: List[Dict[str, object]],
+        state: Optional[_QdrantState] = None,
+    ) -> None:
+        from qdrant_client.models import PointStruct
 
-        vectors = embedder.embed(texts) if texts else []
-        points = []
-        for b, v in zip(block_meta, vectors):
-            block_id = str(b.get("block_id"))
-            section_id = str(b.get("section_id"))
-            payload = {
-                "block_id": block_id,
-                "paper_id": paper_id,
-                "section_id": section_id,
-                "type": b.get("type"),
-                "text_hash": text_hash(b.get("text") or ""),
-                "block_index": b.get("block_index"),
-            }
-            pid = block_id
-            points.append(PointStruct(id=pid, vector=v, payload=payload))
-        if points:
-            batch = max(1, int(cfg.qdrant_upsert_batch_size))
-            for i in range(0, len(points), batch):
-                client.upsert(collection_name=cfg.qdrant_blocks, points=points[i : i + batch])
-
-        section_texts = [str(s.get("summary") or "") for s in sections if s.get("summary")]
-        sections_with_summary = [s for s in sections if s.get("summary")]
-        vectors = embedder.embed(section_texts) if section_texts else []
+        sections_with_summary = []
+        for s in sections:
+            summary = str(s.get("summary") or "")
+            if not summary:
+                continue
+            if state and state.section_hashes.get(str(s.get("section_id"))) == text_hash(summary):
+                continue
+            sections_with_summary.append(s)
+        section_texts = [str(s.get("summary") or "") for s in sections_with_summary]
+        vectors = embedder.embed(section_texts)
         points = []
         for s, v in zip(sections_with_summary, vectors):
             section_id = str(s.get("section_id"))
@@ -246,25 +651,132 @@ class StructureToBlocks:
                 "paper_id": paper_id,
                 "section_title": s.get("title") or s.get("section_title"),
                 "summary_chars": len(summary),
+                "summary_hash": text_hash(summary),
             }
             pid = section_id
-            points.append(PointStruct(id=pid, vector=v, payload=payload))
-        if points:
-            client.upsert(collection_name=cfg.qdrant_sections, points=points)
-
-        if paper and paper.get("summary"):
-            summary = str(paper.get("summary") or "")
-            title = str(paper.get("title") or "")
-            paper_text = f"{title}\n\n{summary}".strip()
-            vector = embedder.embed([paper_text])[0]
-            payload = {
-                "paper_id": paper_id,
-                "paper_uuid": paper.get("paper_uuid"),
-                "title": paper.get("title"),
-                "summary_chars": len(summary),
-            }
-            pid = str(paper.get("paper_uuid"))
-            client.upsert(collection_name=cfg.qdrant_papers, points=[PointStruct(id=pid, vector=vector, payload=payload)])
+            points.append(PointStruct(id=pid, vector=v.tolist(), payload=payload))
+        writer.upsert(self.config.storage.qdrant_sections, points)
+
+    def _write_qdrant_paper(
+        self, writer: QdrantBulkWriter, embedder: Embedder, paper_id: str, paper: Dict[str, object]
+    ) -> None:
+        from qdrant_client.models import PointStruct
+
+        if not paper or not paper.get("summary"):
+            return
+        summary = str(paper.get("summary") or "")
+        title = str(paper.get("title") or "")
+        paper_text = f"{title}\n\n{summary}".strip()
+        vector = embedder.embed([paper_text])[0]
+        payload = {
+            "paper_id": paper_id,
+            "paper_uuid": paper.get("paper_uuid"),
+            "title": paper.get("title"),
+            "summary_chars": len(summary),
+        }
+        pid = str(paper.get("paper_uuid"))
+        writer.upsert(self.config.storage.qdrant_papers, [PointStruct(id=pid, vector=vector.tolist(), payload=payload)])
+
+    def _delete_qdrant_stale(
+        self,
+        client,
+        paper_id: str,
+        sections: List[Dict[str, object]],
+        blocks: List[Dict[str, object]],
+        state: _QdrantState,
+    ) -> None:
+        from qdrant_client.models import FieldCondition, Filter, FilterSelector, MatchAny, MatchValue, PointIdsList
+
+        cfg = self.config.storage
+        stale_blocks = set(state.block_hashes) - {str(b.get("block_id")) for b in blocks}
+        stale_sections = set(state.section_hashes) - {str(s.get("section_id")) for s in sections}
+        if stale_blocks:
+            client.delete(
+                collection_name=cfg.qdrant_blocks,
+                points_selector=FilterSelector(
+                    filter=Filter(
+                        must=[
+                            FieldCondition(key="paper_id", match=MatchValue(value=paper_id)),
+                            FieldCondition(key="block_id", match=MatchAny(any=sorted(stale_blocks))),
+                        ]
+                    )
+                ),
+            )
+        if stale_sections:
+            client.delete(
+                collection_name=cfg.qdrant_sections,
+                points_selector=PointIdsList(points=sorted(stale_sections)),
+            )
+        print(f"[structure_to_blocks] qdrant deleted stale blocks={len(stale_blocks)} sections={len(stale_sections)}")
+
+
+# block payload fields that can change while the text (and so the vector) does not
+_PAYLOAD_FIELDS = ("section_id", "type", "block_index")
+
+
+def _block_payload_fields(b: Dict[str, object]) -> Dict[str, object]:
+    return {"section_id": str(b.get("section_id")), "type": b.get("type"), "block_index": b.get("block_index")}
+
+
+def _block_hash(b: Dict[str, object]) -> str:
+    return str(b.get("text_hash") or text_hash(str(b.get("text") or "")))
+
+
+async def _gather_all(*aws) -> list:
+    # Like gather(), but waits for every awaitable even when one fails (worker threads
+    # cannot be cancelled), then raises the first error.
+    results = await asyncio.gather(*aws, return_exceptions=True)
+    for r in results:
+        if isinstance(r, BaseException):
+            raise r
+    return results
+
+
+def _blocks_to_embed(
+    blocks: List[Dict[str, object]], state: Optional[_QdrantState] = None, layout: str = ""
+) -> List[Dict[str, object]]:
+    out: List[Dict[str, object]] = []
+    relaid = 0
+    for b in blocks:
+        text = str(b.get("text") or "")
+        if not text:
+            continue
+        block_id = str(b.get("block_id"))
+        if state and state.block_hashes.get(block_id) == _block_hash(b):
+            # same text, but written with other chunking/serialization settings
+            if state.block_layouts.get(block_id) == layout:
+                continue
+            relaid += 1
+        out.append(b)
+    if state:
+        print(
+            f"[structure_to_blocks] qdrant blocks to embed={len(out)} unchanged={len(blocks) - len(out)} "
+            f"layout_changed={relaid}"
+        )
+    return out
+
+
+def _block_points(paper_id: str, units: List[_EmbedUnit], vectors, layout: str) -> List[PointStruct]:
+    from qdrant_client.models import PointStruct
+
+    points = []
+    for u, v in zip(units, vectors):
+        b = u.block
+        block_id = str(b.get("block_id"))
+        payload = {
+            "block_id": block_id,
+            "paper_id": paper_id,
+            "text_hash": _block_hash(b),
+            "layout": layout,
+            **_block_payload_fields(b),
+        }
+        pid = block_id
+        if u.chunk_count > 1:
+            payload["chunk_index"] = u.chunk_index
+            payload["chunk_count"] = u.chunk_count
+            pid = vector_id(block_id, "chunk", str(u.chunk_index))
+        points.append(PointStruct(id=pid, vector=v.tolist(), payload=payload))
+    return points
 
 
 def _find_upload_url(uploads: List[Dict[str, object]], name: str) -> Optional[str]:
@@ -277,13 +789,15 @@ def _find_upload_url(uploads: List[Dict[str, object]], name: str) -> Optional[st
 
 
 def _download_json(url: str) -> Dict[str, object]:
+    import requests
+
     resp = requests.get(url, timeout=None)
     resp.raise_for_status()
     return resp.json()
 
 
 def _build_blocks_from_structure(
-    structure: Dict[str, object], paper_id: str, table_texts: List[str]
+    structure: Dict[str, object], paper_id: str, tables: TableIndex
 ) -> Tuple[List[Dict[str, object]], List[Dict[str, object]]]:
     sections_out: List[Dict[str, object]] = []
     blocks_out: List[Dict[str, object]] = []
@@ -297,6 +811,8 @@ def _build_blocks_from_structure(
             continue
         title = sec.get("title") or sec.get("section_title") or ""
         section_id = _stable_uuid(paper_id, f"section::{s_idx}::{title}")
+        # one section_path list per section, shared by its blocks (read-only downstream)
+        section_path = [title] if title else []
         block_ids: List[str] = []
         blocks = sec.get("blocks") or []
         block_index = 0
@@ -305,17 +821,18 @@ def _build_blocks_from_structure(
                 continue
             block_index += 1
             block_id = _stable_uuid(paper_id, f"{section_id}::block::{block_index}")
-            kind = b.get("kind")
-            label = b.get("label")
-            text = _extract_block_text(b, kind=kind, label=label, table_texts=table_texts)
+            kind = _intern(b.get("kind"))
+            label = _intern(b.get("label"))
+            text = _extract_block_text(b, kind=kind, label=label, tables=tables)
             if not text:
                 continue
             block = {
                 "block_id": block_id,
                 "section_id": section_id,
-                "section_path": [title] if title else [],
+                "section_path": section_path,
                 "type": _map_block_type(kind, label),
                 "text": text,
+                "text_hash": text_hash(text),
                 "block_index": block_index,
                 "section_index": s_idx,
                 "source": {"kind": kind, "label": label, "prov": b.get("prov"), "ref": b.get("ref")},
@@ -328,7 +845,7 @@ def _build_blocks_from_structure(
             {
                 "section_id": section_id,
                 "title": title,
-                "section_path": [title] if title else [],
+                "section_path": section_path,
                 "source_block_count": len(block_ids),
                 "block_ids": block_ids,
             }
@@ -337,17 +854,20 @@ def _build_blocks_from_structure(
     return sections_out, blocks_out
 
 
+def _intern(value: object) -> object:
+    # docling kinds/labels repeat on every block; keep one copy of each
+    return sys.intern(value) if type(value) is str else value
+
+
 def _extract_block_text(
     block: Dict[str, object],
     *,
     kind: Optional[str],
     label: Optional[str],
-    table_texts: List[str],
+    tables: TableIndex,
 ) -> str:
     if kind == "table":
-        if table_texts:
-            return table_texts.pop(0)
-        return ""
+        return tables.text(block.get("ref"))
     if kind == "picture":
         caption = block.get("caption")
         if isinstance(caption, list):
@@ -369,26 +889,21 @@ def _map_block_type(kind: Optional[str], label: Optional[str]) -> str:
     return "text"
 
 
-def _load_table_texts(uploads: List[Dict[str, object]], paper_hash: str) -> List[str]:
-    table_entries = []
-    for u in uploads:
-        if not isinstance(u, dict):
+def _reusable_summaries(
+    sections: List[Dict[str, object]], blocks: List[Dict[str, object]], prior: _PriorState
+) -> Dict[str, str]:
+    hashes = {str(b.get("block_id")): b.get("text_hash") for b in blocks}
+    out: Dict[str, str] = {}
+    for s in sections:
+        sid = str(s.get("section_id"))
+        old = prior.sections.get(sid)
+        if not old or not old.get("summary"):
             continue
-        path = str(u.get("path") or "")
-        url = u.get("url")
-        if not url:
+        block_ids = [str(bid) for bid in (s.get("block_ids") or [])]
+        if block_ids != old.get("block_ids"):
             continue
-        if path.startswith(f"[{paper_hash}]table_") and path.endswith(".csv"):
-            table_entries.append((path, url))
-    table_entries.sort(key=lambda x: x[0])
-    out: List[str] = []
-    for _, url in table_entries:
-        try:
-            resp = requests.get(url, timeout=None)
-            resp.raise_for_status()
-            out.append(resp.text)
-        except Exception:
-            out.append("")
+        if all(prior.block_hashes.get(bid) == hashes.get(bid) for bid in block_ids):
+            out[sid] = str(old["summary"])
     return out
 
 
@@ -460,3 +975,27 @@ def _stable_uuid(paper_id: str, seed: str) -> str:
 
 def _paper_uuid(paper_id: str) -> str:
     return str(uuid.uuid5(uuid.NAMESPACE_DNS, f"paper::{paper_id}"))
+
+
+def _scroll_paper_payloads(client, collection_name: str, paper_id: str, fields: List[str]) -> list:
+    from qdrant_client.models import FieldCondition, Filter, MatchValue
+
+    flt = Filter(must=[FieldCondition(key="paper_id", match=MatchValue(value=paper_id))])
+    out = []
+    offset = None
+    while True:
+        records, offset = client.scroll(
+            collection_name=collection_name,
+            scroll_filter=flt,
+            limit=1024,
+            offset=offset,
+            with_payload=fields,
+            with_vectors=False,
+        )
+        out.extend(records)
+        if offset is None:
+            return out
+
+
+def _chunk(items: List[str], size: int) -> List[List[str]]:
+    return [items[i : i + size] for i in range(0, len(items), size)]
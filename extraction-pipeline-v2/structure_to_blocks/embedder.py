@@ -1,10 +1,11 @@
 from __future__ import annotations
 
+import base64
 import os
 from dataclasses import dataclass
-from typing import Iterable, List
+from typing import Iterable
 
-from openai import OpenAI
+import numpy as np
 
 from .config import EmbeddingConfig
 
@@ -13,21 +14,51 @@ from .config import EmbeddingConfig
 class Embedder:
     config: EmbeddingConfig = EmbeddingConfig()
 
-    def embed(self, texts: Iterable[str]) -> List[List[float]]:
+    def embed(self, texts: Iterable[str]) -> np.ndarray:
         items = list(texts)
         if not items:
-            return []
+            return np.empty((0, 0), dtype=np.float32)
 
         api_key = os.getenv(self.config.api_key_env)
         if not api_key:
             raise ValueError(f"Missing {self.config.api_key_env}")
         base_url = os.getenv(self.config.base_url_env) or self.config.base_url_default
+        from openai import OpenAI
+
         client = OpenAI(api_key=api_key, base_url=base_url, timeout=None)
 
-        out: List[List[float]] = []
+        out: np.ndarray | None = None
         for i in range(0, len(items), self.config.batch_size):
             batch = items[i : i + self.config.batch_size]
-            resp = client.embeddings.create(model=self.config.model, input=batch)
-            data = sorted(resp.data, key=lambda d: d.index)
-            out.extend([list(d.embedding) for d in data])
+            resp = client.embeddings.create(
+                model=self.config.model,
+                input=batch,
+                encoding_format=self.config.encoding_format,
+            )
+            filled = np.zeros(len(batch), dtype=bool)
+            for d in resp.data or []:
+                if not 0 <= d.index < len(batch) or filled[d.index]:
+                    raise ValueError(
+                        f"embedding response index={d.index} out of range or repeated for batch of {len(batch)}"
+                    )
+                vec = _decode_embedding(d.embedding)
+                if out is None:
+                    out = np.zeros((len(items), vec.shape[0]), dtype=np.float32)
+                elif vec.shape[0] != out.shape[1]:
+                    raise ValueError(f"embedding dim={vec.shape[0]} differs from dim={out.shape[1]}")
+                out[i + d.index] = vec
+                filled[d.index] = True
+            if not filled.all():
+                missing = [i + j for j in np.flatnonzero(~filled).tolist()]
+                raise ValueError(
+                    f"embedding response returned {int(filled.sum())}/{len(batch)} vectors; missing inputs {missing[:10]}"
+                )
         return out
+
+
+def _decode_embedding(embedding: object) -> np.ndarray:
+    # base64 payloads are little-endian float32; providers that ignore
+    # encoding_format still send plain float lists.
+    if isinstance(embedding, str):
+        return np.frombuffer(base64.b64decode(embedding), dtype="<f4")
+    return np.asarray(embedding, dtype=np.float32)
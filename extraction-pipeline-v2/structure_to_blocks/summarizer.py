@@ -5,8 +5,6 @@ from dataclasses import dataclass
 from time import sleep
 from typing import Dict, List
 
-from openai import OpenAI
-
 from .config import StructureToBlocksConfig
 
 
@@ -88,6 +86,8 @@ class SectionSummarizer:
         api_key = os.getenv(cfg.api_key_env)
         if not api_key:
             raise ValueError(f"Missing {cfg.api_key_env}")
+        from openai import OpenAI
+
         client = OpenAI(api_key=api_key, base_url=cfg.base_url, timeout=None)
 
         prompt = (
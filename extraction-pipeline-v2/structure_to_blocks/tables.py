@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import csv
+import io
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+_TABLE_NAME_RE = re.compile(r"table_(\d+)\.csv$")
+_WS_RE = re.compile(r"\s+")
+
+
+@dataclass
+class TableIndex:
+    urls: Dict[str, str]
+    _texts: Dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def from_uploads(cls, uploads: List[Dict[str, object]], paper_hash: str) -> "TableIndex":
+        urls: Dict[str, str] = {}
+        prefix = f"[{paper_hash}]table_"
+        for u in uploads:
+            if not isinstance(u, dict):
+                continue
+            path = str(u.get("path") or "")
+            url = u.get("url")
+            if not url or not path.startswith(prefix) or not path.endswith(".csv"):
+                continue
+            ref = u.get("ref") or _ref_from_table_name(path)
+            if ref:
+                urls[str(ref)] = str(url)
+        return cls(urls=urls)
+
+    def text(self, ref: Optional[str]) -> str:
+        if not ref:
+            return ""
+        ref = str(ref)
+        if ref in self._texts:
+            return self._texts[ref]
+        url = self.urls.get(ref)
+        text = ""
+        if url:
+            import requests
+
+            try:
+                resp = requests.get(url, timeout=None)
+                resp.raise_for_status()
+                text = resp.text
+            except Exception:
+                text = ""
+        self._texts[ref] = text
+        return text
+
+    @property
+    def downloaded(self) -> int:
+        return len(self._texts)
+
+
+def _ref_from_table_name(path: str) -> Optional[str]:
+    # Uploads written before refs were recorded: pdf_to_infra names tables
+    # table_{i:03d}.csv after their 1-based position in docling `tables`.
+    m = _TABLE_NAME_RE.search(path)
+    if not m:
+        return None
+    return f"#/tables/{int(m.group(1)) - 1}"
+
+
+def parse_table_csv(csv_text: str) -> List[List[str]]:
+    rows: List[List[str]] = []
+    for row in csv.reader(io.StringIO(csv_text or "")):
+        cells = [_WS_RE.sub(" ", c).strip() for c in row]
+        while cells and not cells[-1]:
+            cells.pop()
+        if any(cells):
+            rows.append(cells)
+    return rows
+
+
+def table_text_chunks(csv_text: str, max_chars: int, max_rows: int) -> List[str]:
+    """
+    Serializes a table CSV as `header | ...` lines for embedding. Tables longer
+    than max_chars/max_rows are split into row groups that each repeat the header.
+    """
+    rows = parse_table_csv(csv_text)
+    if not rows:
+        return [csv_text] if csv_text and csv_text.strip() else []
+    header = " | ".join(rows[0])
+    lines = [" | ".join(r) for r in rows[1:]]
+    if not lines:
+        return [header]
+
+    chunks: List[str] = []
+    current: List[str] = []
+    current_len = len(header)
+    for line in lines:
+        too_long = max_chars > 0 and current_len + len(line) + 1 > max_chars
+        too_many = max_rows > 0 and len(current) >= max_rows
+        if current and (too_long or too_many):
+            chunks.append("\n".join([header] + current))
+            current = []
+            current_len = len(header)
+        current.append(line)
+        current_len += len(line) + 1
+    if current:
+        chunks.append("\n".join([header] + current))
+    return chunks
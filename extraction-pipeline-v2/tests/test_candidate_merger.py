@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from typing import Iterable, List
+
+import numpy as np
+
+from blocks_to_items.candidate_merger import CandidateMerger
+from blocks_to_items.config import BlocksToItemsConfig, MergeConfig
+from blocks_to_items.models import Candidate
+
+_TERMS = ["western", "blot", "p53", "elisa", "il-6"]
+
+
+class _StubEmbedder:
+    # bag of term substrings: "Western blot of p53" and "p53 western blotting" embed alike
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def embed(self, texts: Iterable[str]) -> np.ndarray:
+        self.calls += 1
+        return np.asarray([[float(t in s.lower()) for t in _TERMS] for s in texts], dtype=np.float32)
+
+
+def _cand(cid: str, label: str, section: str, confidence: float, kind: str = "experiment") -> Candidate:
+    return Candidate(
+        candidate_id=cid,
+        section_id=section,
+        label=label,
+        summary=None,
+        evidence_hints=[f"hint {cid}"],
+        proposed_item_kind=kind,
+        anchors=["p53"],
+        source_block_ids=[f"b_{cid}"],
+        confidence=confidence,
+    )
+
+
+def _merger(mode: str, embedder: _StubEmbedder) -> CandidateMerger:
+    return CandidateMerger(llm=None, config=BlocksToItemsConfig(merge=MergeConfig(mode=mode)), embedder=embedder)
+
+
+def _candidates() -> List[Candidate]:
+    return [
+        _cand("c1", "Western blot of p53", "s1", 0.6),
+        _cand("c2", "p53 western blotting", "s2", 0.9),
+        _cand("c3", "ELISA of IL-6", "s1", 0.8),
+        _cand("c4", "Western blot of p53", "s3", 0.5, kind="method"),
+    ]
+
+
+def test_embedding_mode_merges_near_duplicates() -> None:
+    embedder = _StubEmbedder()
+    merged = _merger("embedding", embedder).merge(_candidates())
+    assert embedder.calls == 1
+    assert [c.candidate_id for c in merged] == ["c1", "c3", "c4"]
+    first = merged[0]
+    assert first.label == "Western blot of p53" and first.section_id == "s1"
+    assert first.confidence == 0.9
+    assert first.evidence_hints == ["hint c1", "hint c2"]
+    assert first.source_block_ids == ["b_c1", "b_c2"]
+
+
+def test_exact_mode_is_default_and_skips_embedding() -> None:
+    embedder = _StubEmbedder()
+    merger = CandidateMerger(llm=None, config=BlocksToItemsConfig(), embedder=embedder)
+    merged = merger.merge(_candidates())
+    assert embedder.calls == 0
+    assert [c.candidate_id for c in merged] == ["c1", "c2", "c3", "c4"]
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import pytest
+
+from blocks_to_items import schemas
+from blocks_to_items.postprocess import ItemPostProcessor
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        '{"label":{"value":"x"},"summary":null}',
+        '{"label":{"value":"x"},"design":null}',
+        '{"label":{"value":"x"},"entities":{"samples":null}}',
+        '{"label":{"value":"x"},"results":{"metrics":null}}',
+        '{"label":{"value":"x"},"protocol":{"steps":null}}',
+        '{"label":null,"grounding":null,"design":{"comparisons":[{"a":null}],"variables":[{"levels":null}]}}',
+        '{"label":{"value":"x"},"protocol":{"steps":[{"text":null,"parameters":[{"unit":null}]}]}}',
+        '{"label":{"value":"x"},"results":{"metrics":[{"name":null,"conditions":null}],"takeaway":null}}',
+    ],
+)
+def test_null_nested_values_decode(raw: str) -> None:
+    item = schemas.decode(raw, schemas.ExtractedItem)
+    assert item is not None
+    assert all(isinstance(f, schemas.Field) for f in item.fields())
+    assert isinstance(item.grounding.evidence_block_ids, list)
+    assert not item.drop
+
+
+def test_null_lists_in_candidates() -> None:
+    raw = '{"items":[{"label":"a","anchors":null,"evidence_hints":null,"confidence":"0.7"},{"label":1}]}'
+    out = schemas.decode(raw, schemas.CandidateOut, many=True)
+    assert [c.label for c in out] == ["a"]
+    assert out[0].anchors == [] and out[0].evidence_hints == [] and out[0].confidence == 0.7
+
+
+def test_drop_and_not_json() -> None:
+    assert schemas.decode('{"drop": true, "drop_reason": "no support"}', schemas.ExtractedItem).drop
+    assert schemas.decode("not json", schemas.ExtractedItem) is None
+
+
+def test_postprocess_keeps_supported_item() -> None:
+    block = "0f8fad5b-d9cb-469f-a165-70867728950e"
+    raw = (
+        '{"item_kind":"claim","label":{"value":"x","evidence":["%s","Figure 2"]},'
+        '"summary":{"value":"y","evidence":["%s"]},"design":null,"grounding":{"evidence_block_ids":["%s"]}}'
+    ) % (block, block, block)
+    (out,) = ItemPostProcessor().normalize_and_filter([schemas.decode(raw, schemas.ExtractedItem)])
+    assert out["label"]["evidence"] == [block]
+    assert out["grounding"]["coverage_level"]
+    assert "missing_critical" not in out["grounding"]